@@ -0,0 +1,119 @@
+"""Import-time budget for CLI start-up.
+
+Runs each command below under `python -X importtime`, sums the import time
+spent after interpreter start-up (everything past `site`), and fails when a
+command goes over its budget or imports a module it should never need.
+
+    python scripts/check_startup.py [--runs 7] [--verbose]
+
+The best of several runs is compared, since a cold file cache or a busy
+machine only ever makes a run slower.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# Milliseconds of imports allowed per command. Cache commands should start
+# well under 100 ms: typer and diskcache take ~45 ms here, and only
+# `cache list` (a rich table) and `cache get` of a found value load rich.
+# --help renders with rich and imports every command module.
+BUDGET_MS = {
+    ("cache", "stats"): 80,
+    ("cache", "exists", "missing:key"): 80,
+    ("cache", "get", "missing:key"): 80,
+    ("cache", "list"): 90,
+    ("--help",): 200,
+}
+
+# Provider SDKs and heavy CLI modules that the cache commands must not load.
+FORBIDDEN = {
+    "cache": (
+        "openai",
+        "elevenlabs",
+        "dotenv",
+        "http.client",
+        "http.server",
+        "asyncio",
+        "src.cli.video",
+        "src.cli.pipeline",
+    ),
+}
+
+
+def _measure(
+    argv: tuple[str, ...],
+) -> tuple[float, float, dict[str, float], set[str]]:
+    env = dict(os.environ, PMEDIA_DAEMON="off")
+    # Cache commands must work without provider keys.
+    env.pop("ELEVENLABS_API_KEY", None)
+    env.pop("OPENAI_API_KEY", None)
+    started = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-m", "src.main", *argv],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    # Includes interpreter start-up and -X importtime's own overhead.
+    wall_ms = (time.perf_counter() - started) * 1000
+    if proc.returncode not in (0, 1):
+        raise RuntimeError(
+            f"{' '.join(argv)} exited {proc.returncode}:\n{proc.stderr}"
+        )
+
+    after_site = False
+    top_level: dict[str, float] = {}
+    modules: set[str] = set()
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|", 2)
+        if not cumulative.strip().isdigit():
+            continue  # header row
+        module = name.strip()
+        modules.add(module)
+        if module == "site":
+            after_site = True
+            continue
+        # Top-level entries have no indentation beyond the separator's space.
+        if after_site and not name[1:].startswith(" "):
+            top_level[module] = int(cumulative) / 1000
+    return sum(top_level.values()), wall_ms, top_level, modules
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=7)
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    failed = False
+    for argv, budget in BUDGET_MS.items():
+        runs = [_measure(argv) for _ in range(args.runs)]
+        best_ms, wall_ms, top_level, modules = min(runs, key=lambda run: run[0])
+        leaked = [m for m in FORBIDDEN.get(argv[0], ()) if m in modules]
+        ok = best_ms <= budget and not leaked
+        failed |= not ok
+        status = "ok  " if ok else "FAIL"
+        print(
+            f"{status} {' '.join(argv):<24} imports {best_ms:6.1f} ms "
+            f"(budget {budget} ms), wall {wall_ms:6.1f} ms"
+        )
+        if leaked:
+            print(f"     imports {', '.join(leaked)}")
+        if args.verbose or not ok:
+            slowest = sorted(top_level.items(), key=lambda item: -item[1])
+            for module, ms in slowest[:8]:
+                print(f"     {ms:6.1f} ms  {module}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,94 @@
+import hashlib
+import os
+import shutil
+import threading
+from pathlib import Path
+from typing import Any, Iterable, Optional
+
+
+def file_digest(path: Path, chunk_size: int = 1 << 20) -> str:
+    """Return the SHA-256 hex digest of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(chunk_size):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ArtifactStore:
+    """Content-addressed file store with a least-recently-used size cap."""
+
+    def __init__(self, directory: str, max_bytes: Optional[int] = None) -> None:
+        self._dir = Path(directory)
+        self._dir.mkdir(parents=True, exist_ok=True)
+        self._max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(*parts: Any) -> str:
+        payload = "\x1f".join(str(part) for part in parts)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str, suffix: str) -> Path:
+        return self._dir / key[:2] / f"{key}{suffix}"
+
+    def get(self, key: str, suffix: str = "") -> Optional[Path]:
+        path = self._path(key, suffix)
+        try:
+            # Touch on read so eviction order follows last use, not creation.
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return path
+
+    def put(self, key: str, src: Path, suffix: str = "") -> Path:
+        """Move `src` into the store and return its stored path."""
+        dest = self._path(key, suffix)
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        staging = dest.with_name(
+            f"{dest.name}.{os.getpid()}.{threading.get_ident()}.tmp"
+        )
+        shutil.move(src, staging)
+        os.replace(staging, dest)
+        return dest
+
+    def _entries(self) -> list[tuple[float, int, Path]]:
+        entries = []
+        for path in self._dir.glob("*/*"):
+            if path.suffix == ".tmp" or not path.is_file():
+                continue
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def size(self) -> int:
+        return sum(size for _, size, _ in self._entries())
+
+    def evict(self, keep: Iterable[Path] = ()) -> int:
+        """Delete least recently used files until the store fits its cap.
+
+        Paths in `keep` are never deleted; returns the number of bytes freed.
+        """
+        if self._max_bytes is None:
+            return 0
+
+        protected = {Path(p) for p in keep}
+        with self._lock:
+            entries = sorted(self._entries())
+            total = sum(size for _, size, _ in entries)
+            freed = 0
+            for _, size, path in entries:
+                if total <= self._max_bytes:
+                    break
+                if path in protected:
+                    continue
+                try:
+                    path.unlink()
+                except FileNotFoundError:
+                    pass
+                total -= size
+                freed += size
+            return freed
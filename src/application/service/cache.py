@@ -1,5 +1,5 @@
 import hashlib
-from typing import Any, Optional
+from typing import Any, Iterator, Optional
 
 from diskcache import Cache
 
@@ -30,8 +30,19 @@ class DiskCache:
     def delete(self, key: str) -> None:
         self._cache.delete(key)
 
-    def clear(self) -> None:
-        self._cache.clear()
+    def keys(self, prefix: str = "") -> Iterator[str]:
+        for key in self._cache.iterkeys():
+            if str(key).startswith(prefix):
+                yield key
+
+    def clear(self, keep_prefixes: tuple[str, ...] = ()) -> int:
+        """Remove entries, except keys starting with one of `keep_prefixes`."""
+        if not keep_prefixes:
+            return self._cache.clear()
+        doomed = [key for key in self.keys() if not str(key).startswith(keep_prefixes)]
+        for key in doomed:
+            self._cache.delete(key)
+        return len(doomed)
 
     def close(self) -> None:
         self._cache.close()
@@ -0,0 +1,194 @@
+import os
+import socket
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Iterable, Optional
+
+from src.application.service.ffmpeg import FFmpegRunner
+
+# Slowest last: at equal CRF a slower preset compresses better.
+X264_PRESETS = [
+    "ultrafast",
+    "superfast",
+    "veryfast",
+    "faster",
+    "fast",
+    "medium",
+    "slow",
+]
+
+
+@dataclass(frozen=True)
+class EncoderTrial:
+    preset: str
+    crf: int
+    threads: int
+    fps: float
+    speed: float
+    kbps: float
+    wall_s: float
+
+    @property
+    def quality_rank(self) -> tuple[int, int]:
+        """Higher is better: lower CRF first, then a slower preset."""
+        return -self.crf, X264_PRESETS.index(self.preset)
+
+
+@dataclass
+class Calibration:
+    host: str
+    cpu_count: int
+    width: int
+    height: int
+    fps: int
+    duration: float
+    measured_at: float
+    trials: list[EncoderTrial] = field(default_factory=list)
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "Calibration":
+        trials = [EncoderTrial(**t) for t in data.get("trials", [])]
+        return cls(**{**data, "trials": trials})
+
+    def pick(
+        self, target_speed: float, cost: float = 1.0, max_threads: Optional[int] = None
+    ) -> tuple[Optional[EncoderTrial], float]:
+        """Best-quality trial whose speed, divided by `cost`, meets the target.
+
+        `cost` is the render's pixel work relative to the calibration clip.
+        Returns (trial, projected speed); the trial is None when nothing fits.
+        """
+        usable = [
+            t for t in self.trials if max_threads is None or t.threads <= max_threads
+        ] or list(self.trials)
+        # A render uses every core it is granted, so judge each setting by its
+        # run with the most threads that fit.
+        best_threads: dict[tuple[str, int], EncoderTrial] = {}
+        for trial in usable:
+            current = best_threads.get((trial.preset, trial.crf))
+            if current is None or trial.threads > current.threads:
+                best_threads[(trial.preset, trial.crf)] = trial
+
+        cost = max(cost, 1e-9)
+        fitting = [t for t in best_threads.values() if t.speed / cost >= target_speed]
+        if not fitting:
+            return None, 0.0
+        best = max(fitting, key=lambda t: t.quality_rank)
+        return best, best.speed / cost
+
+
+def host_id() -> str:
+    return socket.gethostname()
+
+
+def make_clip(
+    runner: FFmpegRunner, path: Path, width: int, height: int, fps: int, duration: float
+) -> None:
+    """Write a synthetic H.264 clip to benchmark against.
+
+    Light grain keeps it closer to camera footage than a bare test pattern,
+    and it is near-lossless so decoding costs about as much as a real upload.
+    """
+    runner.run(
+        [
+            "ffmpeg",
+            "-y",
+            "-f",
+            "lavfi",
+            "-i",
+            f"testsrc2=size={width}x{height}:rate={fps}:duration={duration}",
+            "-vf",
+            "noise=alls=4:allf=t",
+            "-c:v",
+            "libx264",
+            "-preset",
+            "ultrafast",
+            "-qp",
+            "4",
+            "-pix_fmt",
+            "yuv420p",
+            path.as_posix(),
+        ],
+        label="calibrate clip",
+        duration=duration,
+    )
+
+
+def run_trials(
+    runner: FFmpegRunner,
+    clip: Path,
+    tmp_dir: Path,
+    duration: float,
+    presets: Iterable[str],
+    crfs: Iterable[int],
+    threads: Iterable[int],
+) -> list[EncoderTrial]:
+    trials = []
+    for preset in presets:
+        for crf in crfs:
+            for count in threads:
+                out = tmp_dir / f"trial_{preset}_{crf}_{count}.mp4"
+                record = runner.run(
+                    [
+                        "ffmpeg",
+                        "-y",
+                        "-i",
+                        clip.as_posix(),
+                        "-an",
+                        "-c:v",
+                        "libx264",
+                        "-preset",
+                        preset,
+                        "-crf",
+                        str(crf),
+                        out.as_posix(),
+                    ],
+                    label=f"calibrate {preset} crf{crf} t{count}",
+                    duration=duration,
+                    cores=count,
+                )
+                wall_s = max(record.wall_s, 1e-6)
+                kbps = (record.output_bytes or 0) * 8 / duration / 1000
+                trials.append(
+                    EncoderTrial(
+                        preset=preset,
+                        crf=crf,
+                        threads=record.cores or count,
+                        fps=round(record.frames / wall_s, 2),
+                        speed=round(duration / wall_s, 3),
+                        kbps=round(kbps, 1),
+                        wall_s=round(wall_s, 3),
+                    )
+                )
+                out.unlink(missing_ok=True)
+    return trials
+
+
+def calibrate(
+    runner: FFmpegRunner,
+    tmp_dir: Path,
+    *,
+    width: int,
+    height: int,
+    fps: int,
+    duration: float,
+    presets: Iterable[str],
+    crfs: Iterable[int],
+    threads: Iterable[int],
+) -> Calibration:
+    clip = tmp_dir / "calibration.mp4"
+    make_clip(runner, clip, width, height, fps, duration)
+    return Calibration(
+        host=host_id(),
+        cpu_count=os.cpu_count() or 1,
+        width=width,
+        height=height,
+        fps=fps,
+        duration=duration,
+        measured_at=time.time(),
+        trials=run_trials(runner, clip, tmp_dir, duration, presets, crfs, threads),
+    )
@@ -0,0 +1,342 @@
+import contextvars
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from functools import partial
+from typing import TYPE_CHECKING, Any, Callable, Optional
+
+if TYPE_CHECKING:
+    import asyncio
+
+# Receives the outputs (usually cache keys) of the node's dependencies.
+NodeTask = Callable[[dict[str, Any]], Any]
+
+
+@dataclass(frozen=True)
+class Node:
+    name: str
+    task: NodeTask
+    deps: tuple[str, ...] = ()
+    # Nodes sharing a resource (a provider, ffmpeg) count against its limit.
+    resource: Optional[str] = None
+
+
+@dataclass
+class NodeRun:
+    name: str
+    deps: tuple[str, ...]
+    resource: Optional[str]
+    ready_at: float = 0.0
+    started_at: float = 0.0
+    finished_at: float = 0.0
+    output: Any = None
+    error: Optional[BaseException] = None
+    # Output carried over from an earlier run rather than computed.
+    reused: bool = False
+
+    @property
+    def wall_s(self) -> float:
+        return self.finished_at - self.started_at
+
+    @property
+    def queued_s(self) -> float:
+        """Time spent ready but held back by a resource limit."""
+        return self.started_at - self.ready_at
+
+
+@dataclass
+class DagRun:
+    nodes: dict[str, NodeRun] = field(default_factory=dict)
+    wall_s: float = 0.0
+
+    def output(self, name: str) -> Any:
+        return self.nodes[name].output
+
+    def critical_path(self) -> list[NodeRun]:
+        """Chain of nodes that set the total wall time, first to last.
+
+        Walks back from the last node to finish, each time through the
+        dependency that finished last (the one the node actually waited on).
+        """
+        done = [n for n in self.nodes.values() if n.error is None and n.finished_at]
+        if not done:
+            return []
+        path = [max(done, key=lambda n: n.finished_at)]
+        while True:
+            ran = [self.nodes[d] for d in path[-1].deps if not self.nodes[d].reused]
+            if not ran:
+                break
+            path.append(max(ran, key=lambda n: n.finished_at))
+        return path[::-1]
+
+    def report(self) -> dict[str, Any]:
+        critical = {n.name for n in self.critical_path()}
+        busy_s = sum(n.wall_s for n in self.nodes.values())
+        return {
+            "wall_s": round(self.wall_s, 3),
+            "busy_s": round(busy_s, 3),
+            "parallelism": round(busy_s / self.wall_s, 2) if self.wall_s else 0.0,
+            "critical_path": [n.name for n in self.critical_path()],
+            "nodes": [
+                {
+                    "name": n.name,
+                    "deps": list(n.deps),
+                    "resource": n.resource,
+                    "start_s": round(n.started_at, 3),
+                    "wall_s": round(n.wall_s, 3),
+                    "queued_s": round(n.queued_s, 3),
+                    "critical": n.name in critical,
+                    "reused": n.reused,
+                    "error": repr(n.error) if n.error else None,
+                }
+                # Reused nodes go first; nodes that never ran (after a failure) last.
+                for n in sorted(
+                    self.nodes.values(),
+                    key=lambda n: (not n.reused, not n.finished_at, n.started_at),
+                )
+            ],
+        }
+
+
+class DagError(RuntimeError):
+    """Raised by Dag.run when a node fails; the failure is the __cause__."""
+
+    def __init__(self, node: str, run: DagRun) -> None:
+        super().__init__(f"Stage {node!r} failed")
+        self.node = node
+        self.run = run
+
+
+class Dag:
+    """Runs nodes as soon as their dependencies finish, within resource limits.
+
+    Times in the resulting DagRun are seconds from the start of the run.
+    After a failure no new node starts; running ones finish first. Outputs
+    passed to run() as `done` skip their nodes, e.g. to resume a job.
+    """
+
+    def __init__(self, limits: Optional[dict[str, int]] = None) -> None:
+        self._limits = dict(limits or {})
+        self._nodes: dict[str, Node] = {}
+
+    def add(
+        self,
+        name: str,
+        task: NodeTask,
+        deps: tuple[str, ...] = (),
+        resource: Optional[str] = None,
+    ) -> None:
+        if name in self._nodes:
+            raise ValueError(f"Duplicate node {name!r}")
+        missing = [d for d in deps if d not in self._nodes]
+        if missing:
+            # Dependencies must be added first, which also rules out cycles.
+            raise ValueError(f"Node {name!r} depends on unknown {missing}")
+        self._nodes[name] = Node(name, task, tuple(deps), resource)
+
+    @property
+    def nodes(self) -> list[Node]:
+        """Nodes in the order added, which is a valid execution order."""
+        return list(self._nodes.values())
+
+    def run(self, done: Optional[dict[str, Any]] = None) -> DagRun:
+        """Run every node, except those in `done` (name -> earlier output)."""
+        unknown = set(done or {}) - set(self._nodes)
+        if unknown:
+            raise ValueError(f"Unknown nodes {sorted(unknown)}")
+        started = time.perf_counter()
+        result = DagRun(
+            nodes={
+                n.name: NodeRun(n.name, n.deps, n.resource)
+                for n in self._nodes.values()
+            }
+        )
+        pending = {n: node for n, node in self._nodes.items() if n not in (done or {})}
+        ready: list[Node] = []
+        in_use: dict[str, int] = {}
+        running: dict[Future, Node] = {}
+        completed: set[str] = set(done or {})
+        for name, output in (done or {}).items():
+            result.nodes[name].output = output
+            result.nodes[name].reused = True
+        failed: Optional[str] = None
+        lock = threading.Lock()
+
+        def execute(node: Node, inputs: dict[str, Any]) -> Any:
+            run = result.nodes[node.name]
+            with lock:
+                run.started_at = time.perf_counter() - started
+            try:
+                return node.task(inputs)
+            finally:
+                with lock:
+                    run.finished_at = max(time.perf_counter() - started, 1e-9)
+
+        with ThreadPoolExecutor(max_workers=max(1, len(self._nodes))) as pool:
+            while pending or ready or running:
+                if failed is None:
+                    for name, node in list(pending.items()):
+                        if completed.issuperset(node.deps):
+                            result.nodes[name].ready_at = time.perf_counter() - started
+                            ready.append(pending.pop(name))
+
+                    for node in list(ready):
+                        limit = self._limits.get(node.resource or "")
+                        used = in_use.get(node.resource or "", 0)
+                        if limit is not None and used >= limit:
+                            continue
+                        ready.remove(node)
+                        in_use[node.resource or ""] = used + 1
+                        inputs = {d: result.nodes[d].output for d in node.deps}
+                        # Each task gets the caller's context (e.g. output capture).
+                        context = contextvars.copy_context()
+                        running[pool.submit(context.run, execute, node, inputs)] = node
+                elif not running:
+                    break
+
+                if not running:
+                    if failed is None and (pending or ready):
+                        raise RuntimeError("DAG stalled: a resource limit is 0")
+                    break
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    node = running.pop(future)
+                    in_use[node.resource or ""] -= 1
+                    run = result.nodes[node.name]
+                    try:
+                        run.output = future.result()
+                        completed.add(node.name)
+                    except BaseException as exc:
+                        run.error = exc
+                        failed = failed or node.name
+
+        result.wall_s = time.perf_counter() - started
+        if failed is not None:
+            raise DagError(failed, result) from result.nodes[failed].error
+        return result
+
+
+@dataclass
+class ResourceUsage:
+    limit: Optional[int]
+    runs: int = 0
+    busy_s: float = 0.0
+    queued_s: float = 0.0
+
+
+class AsyncDagRunner:
+    """Runs many DAGs on one event loop, sharing per-resource limits.
+
+    Every node's task is blocking (provider SDK calls, ffmpeg), so it runs
+    in its resource's thread pool while the loop only schedules. Limits are
+    asyncio semaphores shared by all DAGs run through this runner, so e.g.
+    at most `limits["tts"]` TTS calls are in flight across the whole batch.
+    asyncio is imported on first use; plain Dag.run never needs it.
+    """
+
+    # Threads for nodes without a limited resource.
+    UNLIMITED_WORKERS = 32
+
+    def __init__(self, limits: dict[str, int]) -> None:
+        self._limits = dict(limits)
+        self._semaphores: dict[str, asyncio.Semaphore] = {}
+        self._executors: dict[str, ThreadPoolExecutor] = {}
+        self.usage: dict[str, ResourceUsage] = {}
+
+    def _resource(self, resource: Optional[str]) -> str:
+        import asyncio
+
+        name = resource or ""
+        if name not in self.usage:
+            limit = self._limits.get(name)
+            if limit is not None and limit < 1:
+                raise ValueError(f"Limit for {name!r} must be at least 1")
+            self.usage[name] = ResourceUsage(limit)
+            self._semaphores[name] = asyncio.Semaphore(
+                limit or self.UNLIMITED_WORKERS
+            )
+            self._executors[name] = ThreadPoolExecutor(
+                max_workers=limit or self.UNLIMITED_WORKERS,
+                thread_name_prefix=f"dag-{name or 'other'}",
+            )
+        return name
+
+    async def run(self, dag: Dag, done: Optional[dict[str, Any]] = None) -> DagRun:
+        """Async counterpart of Dag.run; concurrent calls share the limits."""
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        result = DagRun(
+            nodes={n.name: NodeRun(n.name, n.deps, n.resource) for n in dag.nodes}
+        )
+        failed: list[str] = []
+        tasks: dict[str, asyncio.Future[Any]] = {}
+
+        async def execute(node: Node) -> Any:
+            run = result.nodes[node.name]
+            inputs = {}
+            for dep in node.deps:
+                inputs[dep] = await tasks[dep]
+            run.ready_at = time.perf_counter() - started
+            resource = self._resource(node.resource)
+            async with self._semaphores[resource]:
+                if failed:
+                    raise asyncio.CancelledError
+                run.started_at = time.perf_counter() - started
+                # Each task gets the caller's context (e.g. output capture).
+                call = partial(contextvars.copy_context().run, node.task, inputs)
+                try:
+                    return await loop.run_in_executor(self._executors[resource], call)
+                except BaseException as exc:
+                    run.error = exc
+                    failed.append(node.name)
+                    raise
+                finally:
+                    run.finished_at = max(time.perf_counter() - started, 1e-9)
+                    usage = self.usage[resource]
+                    usage.runs += 1
+                    usage.busy_s += run.wall_s
+                    usage.queued_s += run.queued_s
+
+        for node in dag.nodes:
+            if done is not None and node.name in done:
+                result.nodes[node.name].output = done[node.name]
+                result.nodes[node.name].reused = True
+                tasks[node.name] = loop.create_future()
+                tasks[node.name].set_result(done[node.name])
+            else:
+                tasks[node.name] = asyncio.ensure_future(execute(node))
+
+        outcomes = await asyncio.gather(*tasks.values(), return_exceptions=True)
+        for name, outcome in zip(tasks, outcomes):
+            if not isinstance(outcome, BaseException):
+                result.nodes[name].output = outcome
+        result.wall_s = time.perf_counter() - started
+        if failed:
+            raise DagError(failed[0], result) from result.nodes[failed[0]].error
+        return result
+
+    def report(self, wall_s: float) -> dict[str, Any]:
+        """Per-resource load over `wall_s`: busy time against the limit."""
+        return {
+            (name or "other"): {
+                "limit": usage.limit,
+                "runs": usage.runs,
+                "busy_s": round(usage.busy_s, 3),
+                "queued_s": round(usage.queued_s, 3),
+                # Share of the limit's slots kept busy over the batch.
+                "utilisation": (
+                    round(usage.busy_s / (usage.limit * wall_s), 3)
+                    if usage.limit and wall_s
+                    else None
+                ),
+            }
+            for name, usage in self.usage.items()
+        }
+
+    def close(self) -> None:
+        for executor in self._executors.values():
+            executor.shutdown(wait=True)
@@ -0,0 +1,311 @@
+import io
+import json
+import os
+import subprocess
+import threading
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import IO, Any, Callable, Optional
+
+from src.application.service.scheduler import CpuBudget
+
+# (label, seconds of output written so far, expected output seconds, finished)
+ProgressCallback = Callable[[str, float, Optional[float], bool], None]
+# Receives ffmpeg's stdout in chunks when the output is `pipe:1`.
+OutputSink = Callable[[bytes], None]
+# Writes ffmpeg's stdin when an input is `pipe:0`; stdin is closed after it returns.
+InputFeed = Callable[[IO[bytes]], None]
+
+
+class FFmpegCancelled(RuntimeError):
+    """Raised when an ffmpeg job is stopped because a sibling job failed."""
+
+
+@dataclass
+class FFmpegRecord:
+    label: str
+    cmd: list[str]
+    started_at: float
+    wall_s: float = 0.0
+    cpu_s: Optional[float] = None
+    frames: int = 0
+    fps: float = 0.0
+    speed: Optional[float] = None
+    out_time_s: float = 0.0
+    output: Optional[str] = None
+    output_bytes: Optional[int] = None
+    returncode: Optional[int] = None
+    cores: Optional[int] = None
+    queue_wait_s: float = 0.0
+
+
+class FFmpegRunner:
+    """Runs ffmpeg with live `-progress` parsing and records every invocation.
+
+    Records are collected per runner, so one runner covers one render. With a
+    `budget`, each run first leases cores from the machine-wide CpuBudget and
+    ffmpeg's `-threads` is set to the granted count.
+    """
+
+    def __init__(
+        self,
+        on_progress: Optional[ProgressCallback] = None,
+        budget: Optional[CpuBudget] = None,
+    ) -> None:
+        self.on_progress = on_progress
+        self.budget = budget
+        self.records: list[FFmpegRecord] = []
+        self._lock = threading.Lock()
+
+    def run(
+        self,
+        cmd: list[str],
+        *,
+        label: str = "ffmpeg",
+        duration: Optional[float] = None,
+        cancel: Optional[threading.Event] = None,
+        cores: Optional[int] = None,
+        sink: Optional[OutputSink] = None,
+        feed: Optional[InputFeed] = None,
+    ) -> FFmpegRecord:
+        """Run one ffmpeg command; `cores` caps its threads (and its lease).
+
+        `sink` and `feed` stream the process's stdout and stdin. `cores=0`
+        runs outside the budget, for copy-only processes that wait on others
+        and must not hold cores meanwhile.
+        """
+        if self.budget is None or cores == 0:
+            return self._run(
+                cmd, label, duration, cancel, cores or None, 0.0, sink, feed
+            )
+
+        try:
+            lease = self.budget.acquire(cores or self.budget.total_cores, cancel)
+        except InterruptedError as exc:
+            raise FFmpegCancelled(f"Cancelled: {label}") from exc
+        try:
+            return self._run(
+                cmd, label, duration, cancel, lease.cores, lease.wait_s, sink, feed
+            )
+        finally:
+            self.budget.release(lease)
+
+    def _run(
+        self,
+        cmd: list[str],
+        label: str,
+        duration: Optional[float],
+        cancel: Optional[threading.Event],
+        cores: Optional[int],
+        queue_wait_s: float,
+        sink: Optional[OutputSink],
+        feed: Optional[InputFeed],
+    ) -> FFmpegRecord:
+        if cmd and cmd[0] == "ffmpeg":
+            if cores and "-threads" not in cmd:
+                # Output option: must sit before the output path.
+                cmd = [*cmd[:-1], "-threads", str(cores), cmd[-1]]
+            cmd = [
+                cmd[0],
+                "-hide_banner",
+                "-loglevel",
+                "error",
+                "-nostats",
+                "-progress",
+                "pipe:2",
+                *cmd[1:],
+            ]
+
+        record = FFmpegRecord(
+            label=label,
+            cmd=cmd,
+            started_at=time.time(),
+            cores=cores,
+            queue_wait_s=queue_wait_s,
+        )
+        errors: list[str] = []
+        started = time.perf_counter()
+        proc = subprocess.Popen(
+            cmd,
+            stdin=subprocess.PIPE if feed else None,
+            stdout=subprocess.PIPE if sink else None,
+            stderr=subprocess.PIPE,
+        )
+        threads = [
+            threading.Thread(
+                target=self._read_progress,
+                args=(proc, record, duration, errors),
+                daemon=True,
+            )
+        ]
+        if sink is not None:
+            threads.append(
+                threading.Thread(
+                    target=self._drain, args=(proc, record, sink), daemon=True
+                )
+            )
+        if feed is not None:
+            threads.append(
+                threading.Thread(target=self._feed, args=(proc, feed), daemon=True)
+            )
+        for thread in threads:
+            thread.start()
+
+        try:
+            self._wait(proc, record, cancel)
+        finally:
+            for thread in threads:
+                thread.join()
+            for pipe in (proc.stdin, proc.stdout, proc.stderr):
+                if pipe is not None:
+                    pipe.close()
+
+        record.wall_s = time.perf_counter() - started
+        record.output = cmd[-1] if cmd else None
+        if record.output and os.path.isfile(record.output):
+            record.output_bytes = os.path.getsize(record.output)
+        with self._lock:
+            self.records.append(record)
+
+        if record.returncode:
+            raise subprocess.CalledProcessError(
+                record.returncode, cmd, stderr="\n".join(errors[-20:])
+            )
+        return record
+
+    @staticmethod
+    def _wait(
+        proc: subprocess.Popen,
+        record: FFmpegRecord,
+        cancel: Optional[threading.Event],
+    ) -> None:
+        while True:
+            if cancel is not None and cancel.is_set():
+                proc.kill()
+                proc.wait()
+                raise FFmpegCancelled(f"Cancelled: {record.label}")
+
+            if hasattr(os, "wait4"):
+                # Reap the child ourselves to read its own CPU usage.
+                pid, status, usage = os.wait4(proc.pid, os.WNOHANG)
+                if pid:
+                    proc.returncode = os.waitstatus_to_exitcode(status)
+                    record.cpu_s = usage.ru_utime + usage.ru_stime
+                    record.returncode = proc.returncode
+                    return
+                time.sleep(0.1)
+                continue
+
+            try:
+                record.returncode = proc.wait(timeout=0.1)
+                return
+            except subprocess.TimeoutExpired:
+                continue
+
+    @staticmethod
+    def _drain(proc: subprocess.Popen, record: FFmpegRecord, sink: OutputSink) -> None:
+        assert proc.stdout is not None
+        record.output_bytes = 0
+        while chunk := proc.stdout.read1(1 << 16):  # type: ignore[attr-defined]
+            record.output_bytes += len(chunk)
+            sink(chunk)
+
+    @staticmethod
+    def _feed(proc: subprocess.Popen, feed: InputFeed) -> None:
+        assert proc.stdin is not None
+        try:
+            feed(proc.stdin)
+            proc.stdin.close()
+        except (BrokenPipeError, ValueError, OSError):
+            # ffmpeg exited (or was killed) before reading everything; its
+            # return code reports why.
+            pass
+
+    def _read_progress(
+        self,
+        proc: subprocess.Popen,
+        record: FFmpegRecord,
+        duration: Optional[float],
+        errors: list[str],
+    ) -> None:
+        assert proc.stderr is not None
+        stderr = io.TextIOWrapper(proc.stderr, encoding="utf-8", errors="replace")
+        block: dict[str, str] = {}
+        for line in stderr:
+            key, sep, value = line.strip().partition("=")
+            if not sep or " " in key:
+                if line.strip():
+                    errors.append(line.rstrip())
+                continue
+
+            block[key] = value
+            if key != "progress":
+                continue
+
+            self._apply_block(record, block)
+            block = {}
+            if self.on_progress:
+                self.on_progress(
+                    record.label, record.out_time_s, duration, value == "end"
+                )
+
+    @staticmethod
+    def _apply_block(record: FFmpegRecord, block: dict[str, str]) -> None:
+        try:
+            record.frames = int(block.get("frame", record.frames))
+        except ValueError:
+            pass
+        try:
+            record.fps = float(block.get("fps", record.fps))
+        except ValueError:
+            pass
+        speed = block.get("speed", "").rstrip("x").strip()
+        if speed and speed != "N/A":
+            try:
+                record.speed = float(speed)
+            except ValueError:
+                pass
+        # out_time_ms is in microseconds too (long-standing ffmpeg quirk).
+        out_time = block.get("out_time_us") or block.get("out_time_ms")
+        if out_time and out_time != "N/A":
+            try:
+                record.out_time_s = max(0.0, int(out_time) / 1_000_000)
+            except ValueError:
+                pass
+
+    def report(self, **extra: Any) -> dict[str, Any]:
+        with self._lock:
+            records = list(self.records)
+
+        by_label: dict[str, dict[str, float]] = {}
+        for r in records:
+            stage = r.label.split(" ", 1)[0]
+            totals = by_label.setdefault(
+                stage,
+                {
+                    "count": 0,
+                    "wall_s": 0.0,
+                    "cpu_s": 0.0,
+                    "frames": 0,
+                    "queue_wait_s": 0.0,
+                },
+            )
+            totals["count"] += 1
+            totals["wall_s"] += r.wall_s
+            totals["cpu_s"] += r.cpu_s or 0.0
+            totals["frames"] += r.frames
+            totals["queue_wait_s"] += r.queue_wait_s
+
+        return {
+            **extra,
+            "invocations": [asdict(r) for r in records],
+            "stages": by_label,
+        }
+
+    def write_report(self, path: Path, **extra: Any) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(
+            json.dumps(self.report(**extra), indent=2, ensure_ascii=False),
+            encoding="utf-8",
+        )
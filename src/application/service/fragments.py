@@ -0,0 +1,162 @@
+import json
+import os
+import struct
+import threading
+import time
+from pathlib import Path
+from typing import Any, Iterable, Optional
+
+# Top-level boxes that, with what follows them, make one deliverable range.
+_OPENERS = {"ftyp": "moov", "moof": "mdat"}
+_KINDS = {"moov": "init", "mdat": "fragment"}
+
+
+def sidecar_path(output: Path) -> Path:
+    return output.with_name(output.name + ".fragments.json")
+
+
+class _BoxScanner:
+    """Incrementally walks the top-level ISO BMFF boxes of a growing file.
+
+    Only boxes that are fully on disk are reported. `ftyp`+`moov` form the
+    init range and each `moof`+`mdat` pair one fragment; any other
+    top-level box (sidx, mfra, ...) is a range of its own.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.ranges: list[dict[str, Any]] = []
+        self._pos = 0
+        self._open: Optional[tuple[str, int]] = None
+
+    def reset(self) -> None:
+        self.ranges = []
+        self._pos = 0
+        self._open = None
+
+    @property
+    def committed(self) -> int:
+        """Length of the file prefix covered by completed ranges."""
+        return self.ranges[-1]["offset"] + self.ranges[-1]["size"] if self.ranges else 0
+
+    def scan(self, size: int) -> bool:
+        """Read boxes up to `size` bytes; returns True when ranges were added."""
+        if size < self._pos:
+            # Truncated underneath us (ffmpeg -y restarting the file).
+            self.reset()
+        added = False
+        with open(self.path, "rb") as f:
+            while self._pos + 8 <= size:
+                f.seek(self._pos)
+                header = f.read(16)
+                box_size, box_type = struct.unpack(">I4s", header[:8])
+                kind = box_type.decode("latin-1")
+                if box_size == 1:
+                    if len(header) < 16:
+                        break
+                    (box_size,) = struct.unpack(">Q", header[8:16])
+                if box_size < 8 or self._pos + box_size > size:
+                    # Size 0 runs to EOF, i.e. still being written.
+                    break
+
+                start, self._pos = self._pos, self._pos + box_size
+                if kind in _OPENERS and self._open is None:
+                    self._open = (kind, start)
+                    continue
+                if self._open is not None:
+                    opener, opened_at = self._open
+                    if kind != _OPENERS[opener]:
+                        # Something in between (e.g. free); keep it in the group.
+                        continue
+                    self._open = None
+                    self.ranges.append(
+                        {
+                            "kind": _KINDS[kind],
+                            "offset": opened_at,
+                            "size": self._pos - opened_at,
+                        }
+                    )
+                else:
+                    self.ranges.append(
+                        {"kind": kind, "offset": start, "size": box_size}
+                    )
+                added = True
+        return added
+
+
+class FragmentWatcher:
+    """Publishes the completed byte ranges of MP4 files while ffmpeg writes them.
+
+    A background thread polls each output and rewrites `<output>.fragments.json`
+    whenever a fragment lands, so an uploader can send the `bytes` prefix
+    before the render ends. With `live=False` (e.g. faststart, where the
+    moov is moved to the front on close) the sidecar is only written once the
+    file is final. Files untouched since the watcher started are ignored, so
+    a previous render's output is never published.
+    """
+
+    def __init__(
+        self, outputs: Iterable[Path], live: bool = True, poll_s: float = 0.25
+    ) -> None:
+        self._scanners = [_BoxScanner(Path(p)) for p in outputs]
+        self._live = live
+        self._poll_s = poll_s
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._started_ns = 0
+
+    def __enter__(self) -> "FragmentWatcher":
+        self._started_ns = time.time_ns()
+        for scanner in self._scanners:
+            sidecar_path(scanner.path).unlink(missing_ok=True)
+        if self._live:
+            self._thread = threading.Thread(target=self._poll, daemon=True)
+            self._thread.start()
+        return self
+
+    def __exit__(self, exc_type: Any, exc: Any, tb: Any) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        if exc_type is not None:
+            return
+        for scanner in self._scanners:
+            if not scanner.path.exists():
+                continue
+            scanner.reset()
+            scanner.scan(scanner.path.stat().st_size)
+            self._publish(scanner, complete=True)
+
+    def _poll(self) -> None:
+        while not self._stop.wait(self._poll_s):
+            for scanner in self._scanners:
+                try:
+                    stat = scanner.path.stat()
+                except FileNotFoundError:
+                    continue
+                # Bound to the start time (less a little mtime granularity).
+                if stat.st_mtime_ns < self._started_ns - 50_000_000:
+                    continue
+                try:
+                    if scanner.scan(stat.st_size):
+                        self._publish(scanner, complete=False)
+                except (OSError, struct.error):
+                    continue
+
+    @staticmethod
+    def _publish(scanner: _BoxScanner, complete: bool) -> None:
+        sidecar = sidecar_path(scanner.path)
+        staging = sidecar.with_name(f"{sidecar.name}.{os.getpid()}.tmp")
+        staging.write_text(
+            json.dumps(
+                {
+                    "output": str(scanner.path),
+                    "complete": complete,
+                    "bytes": scanner.committed,
+                    "ranges": scanner.ranges,
+                },
+                indent=2,
+            ),
+            encoding="utf-8",
+        )
+        os.replace(staging, sidecar)
@@ -0,0 +1,306 @@
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+from contextlib import closing, contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Iterator, Optional
+
+# Lanes in the order they are served: a ready interactive job is always
+# leased before any backfill job.
+LANES = ("interactive", "backfill")
+STATUSES = ("queued", "leased", "done", "dead")
+
+
+def worker_id() -> str:
+    """Lease owner for the calling thread, unique across hosts."""
+    return f"{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}"
+
+
+@dataclass(frozen=True)
+class QueuedJob:
+    id: int
+    kind: str
+    payload: dict[str, Any]
+    lane: str
+    status: str
+    attempts: int
+    max_attempts: int
+    run_after: float
+    lease_owner: Optional[str]
+    lease_expires: Optional[float]
+    created_at: float
+    updated_at: float
+    result: Any
+    error: Optional[str]
+
+    @classmethod
+    def from_row(cls, row: sqlite3.Row) -> "QueuedJob":
+        return cls(
+            id=row["id"],
+            kind=row["kind"],
+            payload=json.loads(row["payload"]),
+            lane=LANES[row["priority"]],
+            status=row["status"],
+            attempts=row["attempts"],
+            max_attempts=row["max_attempts"],
+            run_after=row["run_after"],
+            lease_owner=row["lease_owner"],
+            lease_expires=row["lease_expires"],
+            created_at=row["created_at"],
+            updated_at=row["updated_at"],
+            result=None if row["result"] is None else json.loads(row["result"]),
+            error=row["error"],
+        )
+
+
+class JobQueue:
+    """Durable work queue shared by every process that opens the same file.
+
+    A worker leases the next ready job for `lease_s` seconds and keeps the
+    lease alive with `heartbeat`. A lease that isn't renewed in time (the
+    worker crashed, or its host went away) expires and the job is handed to
+    the next worker. A failed attempt is retried after an exponential
+    backoff until `max_attempts` is used up, then the job is dead-lettered:
+    it stays in the table with its last error until `retry` requeues it.
+
+    Leases compare wall-clock times written by different hosts, so keep
+    `lease_s` well above any clock skew between them. The default rollback
+    journal (not WAL) is used because WAL needs shared memory, which
+    processes on different hosts sharing the directory don't have.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        lease_s: float = 60.0,
+        max_attempts: int = 3,
+        backoff_s: float = 5.0,
+        max_backoff_s: float = 300.0,
+    ) -> None:
+        self.path = Path(path)
+        self.lease_s = lease_s
+        self.max_attempts = max_attempts
+        self._backoff_s = backoff_s
+        self._max_backoff_s = max_backoff_s
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    kind TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    priority INTEGER NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'queued',
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    max_attempts INTEGER NOT NULL,
+                    run_after REAL NOT NULL,
+                    lease_owner TEXT,
+                    lease_expires REAL,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL,
+                    result TEXT,
+                    error TEXT
+                )
+                """
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS jobs_ready "
+                "ON jobs (status, priority, id)"
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    @contextmanager
+    def _transaction(self, conn: sqlite3.Connection) -> Iterator[None]:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def _backoff(self, attempts: int) -> float:
+        return min(self._max_backoff_s, self._backoff_s * 2 ** max(0, attempts - 1))
+
+    def enqueue(
+        self,
+        kind: str,
+        payload: dict[str, Any],
+        lane: str = "interactive",
+        max_attempts: Optional[int] = None,
+    ) -> int:
+        if lane not in LANES:
+            raise ValueError(f"Unknown lane {lane!r}; expected one of {LANES}")
+        now = time.time()
+        with closing(self._connect()) as conn:
+            cursor = conn.execute(
+                "INSERT INTO jobs (kind, payload, priority, max_attempts, "
+                "run_after, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    kind,
+                    json.dumps(payload),
+                    LANES.index(lane),
+                    max_attempts or self.max_attempts,
+                    now,
+                    now,
+                    now,
+                ),
+            )
+        return int(cursor.lastrowid or 0)
+
+    def lease(
+        self, owner: str, lanes: tuple[str, ...] = LANES
+    ) -> Optional[QueuedJob]:
+        """Take the next ready job in `lanes`, or None if nothing is ready.
+
+        Ready means queued and past its backoff, or leased with the lease
+        expired. An expired job with no attempts left is dead-lettered here.
+        """
+        priorities = [LANES.index(lane) for lane in lanes]
+        marks = ", ".join("?" * len(priorities))
+        now = time.time()
+        with closing(self._connect()) as conn:
+            with self._transaction(conn):
+                conn.execute(
+                    "UPDATE jobs SET status = 'dead', updated_at = ?, "
+                    "error = 'lease of ' || lease_owner || ' expired', "
+                    "lease_owner = NULL, lease_expires = NULL "
+                    "WHERE status = 'leased' AND lease_expires < ? "
+                    "AND attempts >= max_attempts",
+                    (now, now),
+                )
+                row = conn.execute(
+                    f"SELECT id, status, lease_owner FROM jobs "
+                    f"WHERE priority IN ({marks}) AND ("
+                    f"(status = 'queued' AND run_after <= ?) OR "
+                    f"(status = 'leased' AND lease_expires < ?)) "
+                    f"ORDER BY priority, id LIMIT 1",
+                    (*priorities, now, now),
+                ).fetchone()
+                if row is None:
+                    return None
+                # Keep the reason a reclaimed job is being run again.
+                expired = (
+                    f"lease of {row['lease_owner']} expired"
+                    if row["status"] == "leased"
+                    else None
+                )
+                conn.execute(
+                    "UPDATE jobs SET status = 'leased', lease_owner = ?, "
+                    "lease_expires = ?, attempts = attempts + 1, updated_at = ?, "
+                    "error = COALESCE(?, error) WHERE id = ?",
+                    (owner, now + self.lease_s, now, expired, row["id"]),
+                )
+                leased = conn.execute(
+                    "SELECT * FROM jobs WHERE id = ?", (row["id"],)
+                ).fetchone()
+        return QueuedJob.from_row(leased)
+
+    def heartbeat(self, job_id: int, owner: str) -> bool:
+        """Extend the lease; False means it expired and someone else has the job."""
+        now = time.time()
+        with closing(self._connect()) as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET lease_expires = ?, updated_at = ? "
+                "WHERE id = ? AND status = 'leased' AND lease_owner = ?",
+                (now + self.lease_s, now, job_id, owner),
+            )
+        return cursor.rowcount == 1
+
+    def complete(self, job_id: int, owner: str, result: Any = None) -> bool:
+        """Mark the job done; False if the lease was lost to another worker."""
+        with closing(self._connect()) as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = 'done', result = ?, error = NULL, "
+                "lease_owner = NULL, lease_expires = NULL, updated_at = ? "
+                "WHERE id = ? AND status = 'leased' AND lease_owner = ?",
+                (json.dumps(result), time.time(), job_id, owner),
+            )
+        return cursor.rowcount == 1
+
+    def fail(
+        self, job_id: int, owner: str, error: str, retry: bool = True
+    ) -> Optional[str]:
+        """Record a failed attempt; returns the job's new status.
+
+        The job is queued again after a backoff while attempts remain and
+        `retry` is set, otherwise dead-lettered. None if the lease was lost.
+        """
+        now = time.time()
+        with closing(self._connect()) as conn:
+            with self._transaction(conn):
+                row = conn.execute(
+                    "SELECT attempts, max_attempts FROM jobs "
+                    "WHERE id = ? AND status = 'leased' AND lease_owner = ?",
+                    (job_id, owner),
+                ).fetchone()
+                if row is None:
+                    return None
+                attempts = row["attempts"]
+                status = (
+                    "queued" if retry and attempts < row["max_attempts"] else "dead"
+                )
+                conn.execute(
+                    "UPDATE jobs SET status = ?, error = ?, run_after = ?, "
+                    "lease_owner = NULL, lease_expires = NULL, updated_at = ? "
+                    "WHERE id = ?",
+                    (status, error, now + self._backoff(attempts), now, job_id),
+                )
+        return status
+
+    def retry(self, job_id: int) -> bool:
+        """Requeue a dead-lettered job with a fresh set of attempts."""
+        now = time.time()
+        with closing(self._connect()) as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET status = 'queued', attempts = 0, run_after = ?, "
+                "updated_at = ? WHERE id = ? AND status = 'dead'",
+                (now, now, job_id),
+            )
+        return cursor.rowcount == 1
+
+    def get(self, job_id: int) -> Optional[QueuedJob]:
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return None if row is None else QueuedJob.from_row(row)
+
+    def jobs(self, status: Optional[str] = None, limit: int = 50) -> list[QueuedJob]:
+        """Most recently updated jobs first, optionally with one status."""
+        query = "SELECT * FROM jobs"
+        params: tuple[Any, ...] = ()
+        if status is not None:
+            query += " WHERE status = ?"
+            params = (status,)
+        query += " ORDER BY updated_at DESC, id DESC LIMIT ?"
+        with closing(self._connect()) as conn:
+            rows = conn.execute(query, (*params, limit)).fetchall()
+        return [QueuedJob.from_row(row) for row in rows]
+
+    def snapshot(self) -> dict[str, Any]:
+        """Job counts per lane and status, and how long the oldest ready job waited."""
+        now = time.time()
+        counts = {lane: dict.fromkeys(STATUSES, 0) for lane in LANES}
+        with closing(self._connect()) as conn:
+            for row in conn.execute(
+                "SELECT priority, status, COUNT(*) AS n FROM jobs "
+                "GROUP BY priority, status"
+            ):
+                counts[LANES[row["priority"]]][row["status"]] = row["n"]
+            (oldest,) = conn.execute(
+                "SELECT MIN(created_at) FROM jobs "
+                "WHERE status = 'queued' AND run_after <= ?",
+                (now,),
+            ).fetchone()
+        return {
+            "lanes": counts,
+            "oldest_ready_s": None if oldest is None else round(now - oldest, 1),
+        }
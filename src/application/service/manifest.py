@@ -0,0 +1,201 @@
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Callable, Optional
+
+from src.application.service.cache import DiskCache
+
+if TYPE_CHECKING:
+    from src.application.service.dag import NodeTask
+
+MANIFEST_NAMESPACE = "job"
+
+
+def manifest_key(job_id: str) -> str:
+    return DiskCache.make_key(MANIFEST_NAMESPACE, job_id)
+
+
+@dataclass
+class StageRecord:
+    name: str
+    deps: list[str]
+    resource: Optional[str]
+    params: dict[str, Any]
+    status: str = "pending"  # pending | running | done | failed
+    # Outputs of the dependencies this stage ran with (cache keys or paths).
+    inputs: dict[str, Any] = field(default_factory=dict)
+    output: Any = None
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    attempts: int = 0
+    error: Optional[str] = None
+
+    @property
+    def wall_s(self) -> Optional[float]:
+        if self.started_at is None or self.finished_at is None:
+            return None
+        return self.finished_at - self.started_at
+
+
+@dataclass
+class JobManifest:
+    id: str
+    video_path: str
+    # What the caller needs to rebuild the stages, as plain data so that
+    # reading a manifest (e.g. `cache stats`) doesn't import the CLI.
+    options: dict[str, Any]
+    status: str = "running"  # running | done | failed
+    created_at: float = field(default_factory=time.time)
+    updated_at: float = field(default_factory=time.time)
+    runs: int = 1
+    result: Any = None
+    # Declaration order, which is also a valid execution order.
+    stages: dict[str, StageRecord] = field(default_factory=dict)
+
+    @property
+    def key(self) -> str:
+        return manifest_key(self.id)
+
+    def failed_stage(self) -> Optional[str]:
+        return next(
+            (s.name for s in self.stages.values() if s.status == "failed"), None
+        )
+
+
+def new_job_id() -> str:
+    return uuid.uuid4().hex[:12]
+
+
+def load_manifest(cache: DiskCache, job_id: str) -> Optional[JobManifest]:
+    manifest = cache.get(manifest_key(job_id))
+    return manifest if isinstance(manifest, JobManifest) else None
+
+
+def list_manifests(cache: DiskCache) -> list[JobManifest]:
+    """All stored manifests, most recently updated first."""
+    manifests = [
+        manifest
+        for key in cache.keys(f"{MANIFEST_NAMESPACE}:")
+        if isinstance(manifest := cache.get(key), JobManifest)
+    ]
+    return sorted(manifests, key=lambda m: m.updated_at, reverse=True)
+
+
+class JobTracker:
+    """Keeps a job's manifest in the cache in step with its stages.
+
+    Each change rewrites the whole manifest with one cache.set, which
+    diskcache commits as a single SQLite transaction: a crash leaves the
+    last complete state, never a partial one. A stage caught mid-run by a
+    crash stays "running" and is re-run on resume.
+    """
+
+    def __init__(self, cache: DiskCache, manifest: JobManifest) -> None:
+        self._cache = cache
+        self._lock = threading.Lock()
+        self.manifest = manifest
+
+    @classmethod
+    def create(
+        cls,
+        cache: DiskCache,
+        video_path: str,
+        options: dict[str, Any],
+        job_id: Optional[str] = None,
+    ) -> "JobTracker":
+        manifest = JobManifest(
+            id=job_id or new_job_id(), video_path=video_path, options=options
+        )
+        return cls(cache, manifest)
+
+    @classmethod
+    def resume(cls, cache: DiskCache, job_id: str) -> Optional["JobTracker"]:
+        manifest = load_manifest(cache, job_id)
+        if manifest is None:
+            return None
+        manifest.runs += 1
+        manifest.status = "running"
+        return cls(cache, manifest)
+
+    def _save(self) -> None:
+        # Callers hold the lock, so the pickled manifest is consistent.
+        self.manifest.updated_at = time.time()
+        self._cache.set(self.manifest.key, self.manifest)
+
+    def _update(self, name: str, **changes: Any) -> None:
+        with self._lock:
+            stage = self.manifest.stages[name]
+            for attr, value in changes.items():
+                setattr(stage, attr, value)
+            self._save()
+
+    def declare(
+        self,
+        name: str,
+        deps: tuple[str, ...],
+        resource: Optional[str],
+        params: dict[str, Any],
+    ) -> None:
+        with self._lock:
+            stage = self.manifest.stages.get(name)
+            if stage is None:
+                self.manifest.stages[name] = StageRecord(
+                    name, list(deps), resource, params
+                )
+            else:
+                stage.deps, stage.resource, stage.params = list(deps), resource, params
+
+    def track(self, name: str, task: "NodeTask") -> "NodeTask":
+        """Wrap a DAG task so its start, output or error lands in the manifest."""
+
+        def run(inputs: dict[str, Any]) -> Any:
+            attempts = self.manifest.stages[name].attempts + 1
+            self._update(
+                name,
+                status="running",
+                inputs=dict(inputs),
+                started_at=time.time(),
+                finished_at=None,
+                attempts=attempts,
+                error=None,
+            )
+            try:
+                output = task(inputs)
+            except BaseException as exc:
+                self._update(
+                    name, status="failed", finished_at=time.time(), error=repr(exc)
+                )
+                raise
+            self._update(name, status="done", output=output, finished_at=time.time())
+            return output
+
+        return run
+
+    def reusable(self, is_valid: Callable[[Any], bool]) -> dict[str, Any]:
+        """Outputs of finished stages that can be skipped on resume.
+
+        A stage is reused only if its output still passes `is_valid` (the
+        cache may have been cleared since) and every stage it depends on is
+        reused too; anything downstream of a re-run stage runs again.
+        """
+        reuse: dict[str, Any] = {}
+        with self._lock:
+            for name, stage in self.manifest.stages.items():
+                if (
+                    stage.status == "done"
+                    and all(dep in reuse for dep in stage.deps)
+                    and is_valid(stage.output)
+                ):
+                    reuse[name] = stage.output
+        return reuse
+
+    def finish(self, status: str, result: Any = None) -> None:
+        with self._lock:
+            self.manifest.status = status
+            self.manifest.result = result
+            self._save()
+
+    def save(self) -> None:
+        with self._lock:
+            self._save()
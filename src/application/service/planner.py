@@ -0,0 +1,87 @@
+"""Estimates for dry runs: prompt tokens, rates from earlier runs, critical paths.
+
+Nothing here calls a provider; everything is computed from text already in
+hand or from timings recorded by earlier jobs.
+"""
+
+import math
+import statistics
+from collections import defaultdict
+from typing import Iterable, Optional
+
+from src.application.service.dag import Node
+
+# Without a tokenizer installed: CJK characters come out at about one token
+# each, and the rest (Vietnamese with diacritics, English, JSON) at about
+# three characters per token. Good to ~20%, which is plenty for a forecast.
+CHARS_PER_TOKEN = 3.0
+
+
+def _is_cjk(ch: str) -> bool:
+    code = ord(ch)
+    return (
+        0x4E00 <= code <= 0x9FFF  # CJK unified ideographs
+        or 0x3400 <= code <= 0x4DBF  # extension A
+        or 0x3000 <= code <= 0x303F  # CJK punctuation
+        or 0xFF00 <= code <= 0xFFEF  # full-width forms
+    )
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate prompt tokens in `text`."""
+    cjk = sum(1 for ch in text if _is_cjk(ch))
+    return cjk + math.ceil((len(text) - cjk) / CHARS_PER_TOKEN)
+
+
+class RateHistory:
+    """Quantities per second of source media, learned from earlier runs.
+
+    Each sample is a value (a stage's wall time, a transcript's tokens)
+    divided by the duration of the video it came from; `project` scales
+    the median back up for a new video.
+    """
+
+    def __init__(self) -> None:
+        self._samples: dict[str, list[float]] = defaultdict(list)
+
+    def add(self, name: str, value: float, duration_s: float) -> None:
+        if duration_s > 0:
+            self._samples[name].append(value / duration_s)
+
+    def samples(self, name: str) -> int:
+        return len(self._samples.get(name, ()))
+
+    def rate(self, name: str) -> Optional[float]:
+        samples = self._samples.get(name)
+        return statistics.median(samples) if samples else None
+
+    def project(self, name: str, duration_s: float) -> Optional[float]:
+        rate = self.rate(name)
+        return None if rate is None else rate * duration_s
+
+
+def critical_path(
+    nodes: Iterable[Node], durations: dict[str, float]
+) -> tuple[float, list[str]]:
+    """Longest chain through the DAG by estimated duration, and its length.
+
+    `nodes` must be in a valid execution order (as `Dag.nodes` is). Resource
+    limits are ignored: this is the wall time with unlimited concurrency.
+    """
+    finish: dict[str, float] = {}
+    via: dict[str, Optional[str]] = {}
+    for node in nodes:
+        start, prev = max(
+            ((finish[dep], dep) for dep in node.deps), default=(0.0, None)
+        )
+        finish[node.name] = start + durations.get(node.name, 0.0)
+        via[node.name] = prev
+    if not finish:
+        return 0.0, []
+    last: Optional[str] = max(finish, key=lambda name: finish[name])
+    total = finish[last]
+    path = []
+    while last is not None:
+        path.append(last)
+        last = via[last]
+    return total, path[::-1]
@@ -0,0 +1,153 @@
+import json
+import subprocess
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Optional
+
+from src.application.service.artifacts import file_digest
+from src.application.service.cache import DiskCache
+
+
+@dataclass
+class MediaProbe:
+    digest: str
+    duration: float
+    format_name: str
+    streams: list[dict[str, Any]] = field(default_factory=list)
+    keyframes: list[float] = field(default_factory=list)
+
+    def stream(self, codec_type: str) -> Optional[dict[str, Any]]:
+        return next(
+            (s for s in self.streams if s.get("codec_type") == codec_type), None
+        )
+
+    @property
+    def video(self) -> Optional[dict[str, Any]]:
+        return self.stream("video")
+
+    @property
+    def audio(self) -> Optional[dict[str, Any]]:
+        return self.stream("audio")
+
+    @property
+    def frame_size(self) -> Optional[tuple[int, int]]:
+        """Decoded video size, after the rotation ffmpeg applies on input."""
+        stream = self.video or {}
+        width, height = stream.get("width"), stream.get("height")
+        if not width or not height:
+            return None
+        rotation = (stream.get("tags") or {}).get("rotate") or next(
+            (
+                data["rotation"]
+                for data in stream.get("side_data_list") or []
+                if "rotation" in data
+            ),
+            0,
+        )
+        try:
+            quarter_turn = int(float(rotation)) % 180 != 0
+        except ValueError:
+            quarter_turn = False
+        return (int(height), int(width)) if quarter_turn else (int(width), int(height))
+
+    @property
+    def fps(self) -> Optional[float]:
+        return _rate((self.video or {}).get("avg_frame_rate"))
+
+    @property
+    def nominal_fps(self) -> Optional[float]:
+        """The stream's base frame rate; differs from `fps` for VFR sources."""
+        return _rate((self.video or {}).get("r_frame_rate"))
+
+
+def _rate(value: Optional[str]) -> Optional[float]:
+    num, _, den = (value or "").partition("/")
+    try:
+        rate = float(num) / float(den or 1)
+    except (ValueError, ZeroDivisionError):
+        return None
+    return rate or None
+
+
+class ProbeService:
+    """Runs ffprobe once per content hash and serves results from DiskCache."""
+
+    def __init__(self, cache: DiskCache, ffprobe: str = "ffprobe") -> None:
+        self._cache = cache
+        self._ffprobe = ffprobe
+        self._memo: dict[tuple[str, int, int], MediaProbe] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _fingerprint(path: Path) -> tuple[str, int, int]:
+        stat = path.stat()
+        return str(path.resolve()), stat.st_size, stat.st_mtime_ns
+
+    def digest(self, path: Path) -> str:
+        """Content hash of a file, reused while its path, size and mtime hold."""
+        key = self._cache.make_key("digest", *self._fingerprint(path))
+        if (cached := self._cache.get(key)) is not None:
+            return cached  # type: ignore
+        return self._cache.set(key, file_digest(path))
+
+    def probe(self, path: Path) -> MediaProbe:
+        fingerprint = self._fingerprint(path)
+        with self._lock:
+            if (memo := self._memo.get(fingerprint)) is not None:
+                return memo
+
+        digest = self.digest(path)
+        key = self._cache.make_key("probe", digest)
+        result = self._cache.get(key)
+        if result is None:
+            result = self._cache.set(key, self._run(path, digest))
+
+        with self._lock:
+            self._memo[fingerprint] = result  # type: ignore
+        return result  # type: ignore
+
+    def _ffprobe_out(self, args: list[str]) -> str:
+        return subprocess.run(
+            [self._ffprobe, "-v", "error", *args],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+
+    def _run(self, path: Path, digest: str) -> MediaProbe:
+        info = json.loads(
+            self._ffprobe_out(
+                ["-show_format", "-show_streams", "-of", "json", str(path)]
+            )
+        )
+        fmt = info.get("format") or {}
+        streams = info.get("streams") or []
+
+        keyframes: list[float] = []
+        if any(s.get("codec_type") == "video" for s in streams):
+            # Packet flags avoid decoding; "K" marks keyframes.
+            packets = self._ffprobe_out(
+                [
+                    "-select_streams",
+                    "v:0",
+                    "-show_entries",
+                    "packet=pts_time,flags",
+                    "-of",
+                    "csv=p=0",
+                    str(path),
+                ]
+            )
+            for line in packets.splitlines():
+                pts, _, flags = line.partition(",")
+                if "K" in flags and pts and pts != "N/A":
+                    keyframes.append(float(pts))
+            keyframes.sort()
+
+        return MediaProbe(
+            digest=digest,
+            duration=float(fmt.get("duration") or 0.0),
+            format_name=str(fmt.get("format_name") or ""),
+            streams=streams,
+            keyframes=keyframes,
+        )
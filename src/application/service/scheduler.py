@@ -0,0 +1,210 @@
+import os
+import socket
+import sqlite3
+import threading
+import time
+from contextlib import closing, contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator, Optional
+
+
+@dataclass(frozen=True)
+class Lease:
+    ticket: int
+    cores: int
+    wait_s: float
+
+
+def _pid_alive(pid: int) -> bool:
+    if os.name == "nt":
+        # os.kill(pid, 0) would terminate the process on Windows; rely on the
+        # heartbeat there instead.
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class CpuBudget:
+    """Machine-wide core budget shared by every process using the same file.
+
+    Jobs take a ticket in a sqlite table and are granted in FIFO order once
+    their cores fit under the budget. A job larger than the whole budget
+    runs alone. Tickets of dead processes on this host are reaped; tickets
+    whose owner can't be checked by pid (another host, or Windows) are kept
+    alive by a heartbeat and reaped once it is `stale_after_s` old.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        total_cores: Optional[int] = None,
+        poll_s: float = 0.2,
+        stale_after_s: float = 120.0,
+    ) -> None:
+        self.path = Path(path)
+        self.total_cores = max(1, total_cores or os.cpu_count() or 1)
+        self._poll_s = poll_s
+        self._stale_after_s = stale_after_s
+        self._host = socket.gethostname()
+        self._held: set[int] = set()
+        self._held_lock = threading.Lock()
+        self._heartbeat: Optional[threading.Thread] = None
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS tickets (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    host TEXT NOT NULL,
+                    pid INTEGER NOT NULL,
+                    cores INTEGER NOT NULL,
+                    requested_at REAL NOT NULL,
+                    granted_at REAL,
+                    heartbeat_at REAL
+                )
+                """
+            )
+            with self._transaction(conn):
+                columns = {row[1] for row in conn.execute("PRAGMA table_info(tickets)")}
+                if "heartbeat_at" not in columns:
+                    conn.execute("ALTER TABLE tickets ADD COLUMN heartbeat_at REAL")
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30, isolation_level=None)
+
+    @contextmanager
+    def _transaction(self, conn: sqlite3.Connection) -> Iterator[None]:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def _hold(self, ticket: int) -> None:
+        with self._held_lock:
+            self._held.add(ticket)
+            if self._heartbeat is None:
+                self._heartbeat = threading.Thread(
+                    target=self._keep_alive, name="cpu-budget-heartbeat", daemon=True
+                )
+                self._heartbeat.start()
+
+    def _drop(self, conn: sqlite3.Connection, ticket: int) -> None:
+        conn.execute("DELETE FROM tickets WHERE id = ?", (ticket,))
+        with self._held_lock:
+            self._held.discard(ticket)
+
+    def _keep_alive(self) -> None:
+        # Runs while this instance holds tickets, waiting or granted.
+        while True:
+            time.sleep(self._stale_after_s / 4)
+            with self._held_lock:
+                held = list(self._held)
+                if not held:
+                    self._heartbeat = None
+                    return
+            marks = ", ".join("?" * len(held))
+            with closing(self._connect()) as conn:
+                conn.execute(
+                    f"UPDATE tickets SET heartbeat_at = ? WHERE id IN ({marks})",
+                    (time.time(), *held),
+                )
+
+    def _reap(self, conn: sqlite3.Connection) -> None:
+        # A long render keeps its ticket for as long as its process lives;
+        # age alone only counts where the pid can't be checked.
+        conn.execute(
+            "DELETE FROM tickets WHERE (host != ? OR ?) "
+            "AND COALESCE(heartbeat_at, requested_at) < ?",
+            (self._host, os.name == "nt", time.time() - self._stale_after_s),
+        )
+        rows = conn.execute(
+            "SELECT DISTINCT pid FROM tickets WHERE host = ? AND pid != ?",
+            (self._host, os.getpid()),
+        ).fetchall()
+        for (pid,) in rows:
+            if not _pid_alive(pid):
+                conn.execute(
+                    "DELETE FROM tickets WHERE host = ? AND pid = ?", (self._host, pid)
+                )
+
+    def _try_grant(self, conn: sqlite3.Connection, ticket: int, cores: int) -> bool:
+        (head,) = conn.execute(
+            "SELECT MIN(id) FROM tickets WHERE granted_at IS NULL"
+        ).fetchone()
+        if head != ticket:
+            return False
+        (used,) = conn.execute(
+            "SELECT COALESCE(SUM(cores), 0) FROM tickets WHERE granted_at IS NOT NULL"
+        ).fetchone()
+        if used and used + cores > self.total_cores:
+            return False
+        conn.execute(
+            "UPDATE tickets SET granted_at = ? WHERE id = ?", (time.time(), ticket)
+        )
+        return True
+
+    def acquire(self, cores: int, cancel: Optional[threading.Event] = None) -> Lease:
+        """Block until `cores` fit in the budget; raises InterruptedError on cancel."""
+        cores = max(1, min(cores, self.total_cores))
+        requested = time.perf_counter()
+        with closing(self._connect()) as conn:
+            with self._transaction(conn):
+                now = time.time()
+                ticket = int(
+                    conn.execute(
+                        "INSERT INTO tickets (host, pid, cores, requested_at, "
+                        "heartbeat_at) VALUES (?, ?, ?, ?, ?)",
+                        (self._host, os.getpid(), cores, now, now),
+                    ).lastrowid
+                    or 0
+                )
+            self._hold(ticket)
+            try:
+                while True:
+                    with self._transaction(conn):
+                        self._reap(conn)
+                        if self._try_grant(conn, ticket, cores):
+                            break
+                    if cancel is None:
+                        time.sleep(self._poll_s)
+                    elif cancel.wait(self._poll_s):
+                        raise InterruptedError("Cancelled while waiting for CPU budget")
+            except BaseException:
+                self._drop(conn, ticket)
+                raise
+        return Lease(ticket=ticket, cores=cores, wait_s=time.perf_counter() - requested)
+
+    def release(self, lease: Lease) -> None:
+        with closing(self._connect()) as conn:
+            self._drop(conn, lease.ticket)
+
+    @contextmanager
+    def lease(
+        self, cores: int, cancel: Optional[threading.Event] = None
+    ) -> Iterator[Lease]:
+        granted = self.acquire(cores, cancel)
+        try:
+            yield granted
+        finally:
+            self.release(granted)
+
+    def snapshot(self) -> dict[str, int]:
+        """Current granted cores and queue depth across all processes."""
+        with closing(self._connect()) as conn:
+            (used,) = conn.execute(
+                "SELECT COALESCE(SUM(cores), 0) FROM tickets "
+                "WHERE granted_at IS NOT NULL"
+            ).fetchone()
+            (waiting,) = conn.execute(
+                "SELECT COUNT(*) FROM tickets WHERE granted_at IS NULL"
+            ).fetchone()
+        return {"total": self.total_cores, "used": used, "waiting": waiting}
@@ -7,6 +7,14 @@ from src.domain.core.sentence import Sentence
 from src.domain.core.word import Word
 
 
+def segment_cache_key(words: List[Word]) -> str:
+    """Key of a segmentation; a deterministic fingerprint of timings and text."""
+    payload = "|".join(f"{w.start}-{w.end}-{w.word}" for w in words)
+    return DiskCache.make_key(
+        "segment", hashlib.sha256(payload.encode("utf-8")).digest()
+    )
+
+
 class SegmentService:
     """Application service to run segmentation and cache results."""
 
@@ -14,17 +22,8 @@ class SegmentService:
         self._segmenter = segmenter
         self._cache = cache
 
-    def _fingerprint(self, words: List[Word]) -> bytes:
-        # Create a deterministic fingerprint from word timings and text.
-        payload = "|".join(f"{w.start}-{w.end}-{w.word}" for w in words)
-        return hashlib.sha256(payload.encode("utf-8")).digest()
-
     def segment(self, words: List[Word]) -> Tuple[List[Sentence], str | None]:
-        key = (
-            self._cache.make_key("segment", self._fingerprint(words))
-            if self._cache
-            else None
-        )
+        key = segment_cache_key(words) if self._cache else None
 
         if key and (cached := self._cache.get(key)) is not None:
             return cached, key  # type: ignore
@@ -0,0 +1,206 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Iterator, Optional
+
+VIDEO_SUFFIXES = frozenset({".mp4", ".mov", ".mkv", ".webm", ".m4v"})
+# Files the pipeline writes next to its input; never feed them back in.
+OUTPUT_MARKERS = ("_translated", "_speeded_up", "_captioned", "_draft")
+
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_NONBLOCK = 0o4000
+_IN_CLOEXEC = 0o2000000
+_EVENT = struct.Struct("iIII")
+
+
+def is_pipeline_output(path: Path, markers: tuple[str, ...] = OUTPUT_MARKERS) -> bool:
+    return any(path.stem.endswith(marker) for marker in markers)
+
+
+def is_candidate(
+    path: Path,
+    suffixes: frozenset[str] = VIDEO_SUFFIXES,
+    markers: tuple[str, ...] = OUTPUT_MARKERS,
+) -> bool:
+    name = path.name
+    return (
+        not name.startswith(".")
+        and path.suffix.lower() in suffixes
+        and not is_pipeline_output(path, markers)
+    )
+
+
+class _Inotify:
+    """Minimal inotify binding via ctypes; names of created or written files."""
+
+    def __init__(self, directory: Path) -> None:
+        libc_name = ctypes.util.find_library("c")
+        if libc_name is None:
+            raise OSError("libc not found")
+        libc = ctypes.CDLL(libc_name, use_errno=True)
+        if not hasattr(libc, "inotify_init1"):
+            raise OSError("inotify is not available")
+        self._fd = libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        mask = _IN_CLOSE_WRITE | _IN_MOVED_TO | _IN_CREATE
+        if libc.inotify_add_watch(self._fd, os.fsencode(directory), mask) < 0:
+            errno = ctypes.get_errno()
+            os.close(self._fd)
+            raise OSError(errno, f"inotify_add_watch failed for {directory}")
+
+    def read(self, timeout: float) -> list[str]:
+        """Names touched since the last call; waits up to `timeout` seconds."""
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if not readable:
+            return []
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        names = []
+        offset = 0
+        while offset + _EVENT.size <= len(data):
+            _, _, _, length = _EVENT.unpack_from(data, offset)
+            offset += _EVENT.size
+            raw = data[offset : offset + length].rstrip(b"\0")
+            offset += length
+            if raw:
+                names.append(os.fsdecode(raw))
+        return names
+
+    def close(self) -> None:
+        os.close(self._fd)
+
+
+@dataclass
+class _Pending:
+    first_seen: float
+    size: int
+    mtime: float
+    stable_since: float
+
+
+@dataclass(frozen=True)
+class ReadyFile:
+    path: Path
+    # Monotonic time the file was first noticed, for end-to-end latency.
+    detected_at: float
+    settle_s: float
+
+
+class FolderWatcher:
+    """Yields media files in one directory once they stop growing.
+
+    Uses inotify where available and otherwise rescans every `poll_s`.
+    A file is ready when its size and mtime have not changed for
+    `settle_s` seconds, like n8n's `awaitWriteFinish`. Each path is yielded
+    once per change; deduplication by content is up to the caller.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        settle_s: float = 2.0,
+        poll_s: float = 1.0,
+        include_existing: bool = False,
+        use_inotify: bool = True,
+        accept: Callable[[Path], bool] = is_candidate,
+    ) -> None:
+        self.directory = directory
+        self._settle_s = settle_s
+        self._poll_s = poll_s
+        self._include_existing = include_existing
+        self._use_inotify = use_inotify
+        self._accept = accept
+        self._pending: dict[Path, _Pending] = {}
+        # (size, mtime) last yielded per path; an untouched file is not re-queued.
+        self._yielded: dict[Path, tuple[int, float]] = {}
+        self._inotify: Optional[_Inotify] = None
+        self.mode = "polling"
+
+    def _scan(self) -> list[Path]:
+        try:
+            return [p for p in self.directory.iterdir() if p.is_file()]
+        except FileNotFoundError:
+            return []
+
+    def _note(self, path: Path, now: float) -> None:
+        if not self._accept(path):
+            return
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            self._pending.pop(path, None)
+            return
+        signature = (stat.st_size, stat.st_mtime)
+        if self._yielded.get(path) == signature:
+            return
+        pending = self._pending.get(path)
+        if pending is None:
+            self._pending[path] = _Pending(now, *signature, stable_since=now)
+        elif (pending.size, pending.mtime) != signature:
+            pending.size, pending.mtime = signature
+            pending.stable_since = now
+
+    def _settled(self, now: float) -> list[ReadyFile]:
+        ready = []
+        for path in list(self._pending):
+            self._note(path, now)
+            pending = self._pending.get(path)
+            if pending is None or pending.size == 0:
+                continue
+            if now - pending.stable_since >= self._settle_s:
+                del self._pending[path]
+                self._yielded[path] = (pending.size, pending.mtime)
+                ready.append(
+                    ReadyFile(path, pending.first_seen, now - pending.first_seen)
+                )
+        return ready
+
+    def __enter__(self) -> "FolderWatcher":
+        if self._use_inotify:
+            try:
+                self._inotify = _Inotify(self.directory)
+                self.mode = "inotify"
+            except OSError:
+                self._inotify = None
+
+        now = time.monotonic()
+        for path in self._scan():
+            if self._include_existing:
+                self._note(path, now)
+                continue
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            self._yielded[path] = (stat.st_size, stat.st_mtime)
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        if self._inotify is not None:
+            self._inotify.close()
+            self._inotify = None
+
+    def watch(self, stop: threading.Event) -> Iterator[ReadyFile]:
+        """Ready files until `stop` is set; use inside `with watcher:`."""
+        while not stop.is_set():
+            if self._inotify is not None:
+                names = self._inotify.read(self._poll_s)
+                touched = [self.directory / name for name in names]
+            else:
+                stop.wait(self._poll_s)
+                touched = self._scan()
+            now = time.monotonic()
+            for path in touched:
+                self._note(path, now)
+            yield from self._settled(now)
@@ -2,6 +2,10 @@ from src.domain.core.stt_base import STTBase, STTResponse
 from src.application.service.cache import DiskCache
 
 
+def stt_cache_key(model_id: str, file: bytes) -> str:
+    return DiskCache.make_key("stt", model_id, file)
+
+
 class Transcribe:
     def __init__(
         self,
@@ -13,7 +17,7 @@ class Transcribe:
 
     # common services
     def execute(self, model_id: str, file: bytes) -> tuple[STTResponse, str | None]:
-        key = self._cache.make_key("stt", model_id, file) if self._cache else None
+        key = stt_cache_key(model_id, file) if self._cache else None
 
         if key and (cached := self._cache.get(key)) is not None:  # type: ignore
             return cached, key
@@ -2,6 +2,14 @@ from src.application.service.cache import DiskCache
 from src.domain.core.translator import Translator
 
 
+def translation_cache_key(
+    text: str, target_language: str, source_language: str | None = None
+) -> str:
+    return DiskCache.make_key(
+        "translate", target_language, source_language or "", bytes(text, "utf-8")
+    )
+
+
 class Translate:
     def __init__(self, translator: Translator, cache: DiskCache | None = None):
         self._translator = translator
@@ -11,12 +19,7 @@ class Translate:
         self, text: str, target_language: str, source_language: str | None = None
     ) -> tuple[str, str | None]:
         key = (
-            self._cache.make_key(
-                "translate",
-                target_language,
-                source_language or "",
-                bytes(text, "utf-8"),
-            )
+            translation_cache_key(text, target_language, source_language)
             if self._cache
             else None
         )
@@ -1,29 +1,65 @@
+from importlib import import_module
+from typing import Optional
+
 import typer
+import typer.main
+from typer._click import Command, Context
+from typer.core import TyperGroup
 
-from src.cli import cache, segment, stt, tts
-from src.cli import translate as translate_cli
-from src.cli import map as map_cli
-from src.cli import video as video_cli
 from src.cli.container import AppContainer, build_container
 
+# Subcommand -> "module:attribute" (a Typer sub-app or a command function).
+# Modules are imported only for the command being run, so `cache stats`
+# doesn't pay for the video, pipeline or serve modules.
+COMMANDS = {
+    "stt": "src.cli.stt:app",
+    "tts": "src.cli.tts:app",
+    "cache": "src.cli.cache:app",
+    "translate": "src.cli.translate:translate",
+    "segment": "src.cli.segment:segment",
+    "map": "src.cli.map:map",
+    "build_c": "src.cli.map:build_c",
+    "video": "src.cli.video:app",
+    "pipeline": "src.cli.pipeline:app",
+    "serve": "src.cli.serve:serve",
+    "watch": "src.cli.watch:watch",
+    "queue": "src.cli.jobqueue:app",
+}
+
+
+class LazyGroup(TyperGroup):
+    """Root group that imports a subcommand's module on first lookup."""
+
+    def list_commands(self, ctx: Context) -> list[str]:
+        loaded = super().list_commands(ctx)
+        return loaded + [name for name in COMMANDS if name not in loaded]
 
-app = typer.Typer(help="Media CLI")
+    def get_command(self, ctx: Context, cmd_name: str) -> Optional[Command]:
+        if cmd_name not in COMMANDS:
+            return super().get_command(ctx, cmd_name)
+        if cmd_name not in self.commands:
+            module, _, attribute = COMMANDS[cmd_name].partition(":")
+            target = getattr(import_module(module), attribute)
+            if isinstance(target, typer.Typer):
+                command: Command = typer.main.get_group(target)
+            else:
+                single = typer.Typer()
+                single.command(name=cmd_name)(target)
+                command = typer.main.get_command(single)
+            command.name = cmd_name
+            self.commands[cmd_name] = command
+        return self.commands[cmd_name]
+
+
+app = typer.Typer(help="Media CLI", cls=LazyGroup)
 
 
 @app.callback()
 def init_app(ctx: typer.Context):
     """Composition root: build and attach dependencies."""
-    ctx.obj = build_container()
-
-
-app.add_typer(stt.app, name="stt")
-app.add_typer(tts.app, name="tts")
-app.add_typer(cache.app, name="cache")
-app.command(name="translate")(translate_cli.translate)
-app.command(name="segment")(segment.segment)
-app.command(name="map")(map_cli.map)
-app.command(name="build_c")(map_cli.build_c)
-app.command(name="video")(video_cli.render_video)
+    # The serve daemon passes its long-lived container in with each job.
+    if not isinstance(ctx.obj, AppContainer):
+        ctx.obj = build_container()
 
 
 if __name__ == "__main__":
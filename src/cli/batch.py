@@ -0,0 +1,170 @@
+"""JSONL batch mode shared by the key-producing commands.
+
+With `--batch`, a command reads one JSON object per line from stdin and
+writes one JSON result per line to stdout, so thousands of operations share
+one process, container and cache. Command-line options act as defaults that
+each request may override by field name.
+"""
+
+import json
+import sys
+import threading
+from typing import TYPE_CHECKING, Any, Callable, Iterator, Optional, TextIO
+
+import typer
+
+if TYPE_CHECKING:
+    from concurrent.futures import Future
+
+Handler = Callable[[dict[str, Any]], Any]
+
+# Requests read ahead of the workers, per worker, to keep them busy.
+READ_AHEAD = 4
+
+
+def batch_option() -> Any:
+    return typer.Option(
+        False,
+        "--batch",
+        help="Read JSON requests from stdin, one per line; write JSON results",
+    )
+
+
+def jobs_option() -> Any:
+    return typer.Option(
+        4, "--jobs", "-j", min=1, help="Requests run concurrently with --batch"
+    )
+
+
+def ordered_option() -> Any:
+    return typer.Option(
+        False,
+        "--ordered",
+        help="With --batch, write results in input order instead of as they finish",
+    )
+
+
+class BatchRequestError(ValueError):
+    """A request line that can't be run as given."""
+
+
+def fields(
+    request: dict[str, Any], required: tuple[str, ...] = (), **defaults: Any
+) -> dict[str, Any]:
+    """Validate a request's fields and fill in the command-line defaults."""
+    known = {*required, *defaults, "id"}
+    unknown = sorted(set(request) - known)
+    if unknown:
+        raise BatchRequestError(f"Unknown fields: {', '.join(unknown)}")
+    values = {**defaults, **request}
+    missing = [name for name in required if values.get(name) in (None, "")]
+    if missing:
+        raise BatchRequestError(f"Missing fields: {', '.join(missing)}")
+    values.pop("id", None)
+    return values
+
+
+def require(value: Optional[str], name: str) -> str:
+    """Positional arguments are optional for --batch; enforce them otherwise."""
+    if value is None:
+        raise typer.BadParameter(f"Missing {name} (or use --batch)")
+    return value
+
+
+def error_message(exc: BaseException) -> str:
+    """One line for a failed request, including typer's message-less Exit."""
+    if isinstance(exc, typer.Exit):
+        return f"failed with exit code {exc.exit_code}"
+    if isinstance(exc, KeyError):
+        return f"missing {exc}"
+    message = getattr(exc, "message", None) or str(exc)
+    return message or type(exc).__name__
+
+
+def _requests(stdin: TextIO) -> Iterator[tuple[int, Any]]:
+    for number, line in enumerate(stdin, start=1):
+        if not line.strip():
+            continue
+        try:
+            request = json.loads(line)
+        except ValueError as exc:
+            request = BatchRequestError(f"Invalid JSON: {exc}")
+        if not isinstance(request, (dict, Exception)):
+            request = BatchRequestError("Each line must be a JSON object")
+        yield number, request
+
+
+def run_batch(
+    handler: Handler,
+    jobs: int = 4,
+    ordered: bool = False,
+    stdin: Optional[TextIO] = None,
+    stdout: Optional[TextIO] = None,
+) -> int:
+    """Run `handler` on every stdin request; returns the number that failed.
+
+    Each result line carries the request's `line` number and its `id` (if
+    given) plus either `"ok": true, "result": ...` or `"ok": false,
+    "error": "..."`. stdin is read lazily, so input can be streamed too.
+    """
+    # Imported here: concurrent.futures pulls in logging, which `cache get`
+    # shouldn't pay for unless it runs a batch.
+    from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+    stdin = stdin or sys.stdin
+    stdout = stdout or sys.stdout
+    failed = 0
+    write_lock = threading.Lock()
+    pending: dict[int, dict[str, Any]] = {}
+    next_line: list[int] = []
+
+    def execute(number: int, request: Any) -> dict[str, Any]:
+        record: dict[str, Any] = {"line": number}
+        if isinstance(request, dict) and "id" in request:
+            record["id"] = request["id"]
+        try:
+            if isinstance(request, Exception):
+                raise request
+            record["result"] = handler(request)
+            record["ok"] = True
+        except (Exception, typer.Exit) as exc:
+            record["ok"] = False
+            record["error"] = error_message(exc)
+        return record
+
+    def emit(record: dict[str, Any]) -> None:
+        nonlocal failed
+        failed += not record["ok"]
+        with write_lock:
+            stdout.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+            stdout.flush()
+
+    def collect(future: "Future") -> None:
+        record = future.result()
+        if not ordered:
+            emit(record)
+            return
+        pending[record["line"]] = record
+        while next_line and next_line[0] in pending:
+            emit(pending.pop(next_line.pop(0)))
+
+    with ThreadPoolExecutor(max_workers=jobs, thread_name_prefix="batch") as pool:
+        running: set["Future"] = set()
+        for number, request in _requests(stdin):
+            next_line.append(number)
+            running.add(pool.submit(execute, number, request))
+            if len(running) >= jobs * READ_AHEAD:
+                done, running = wait(running, return_when=FIRST_COMPLETED)
+                for future in sorted(done, key=lambda f: f.result()["line"]):
+                    collect(future)
+        while running:
+            done, running = wait(running, return_when=FIRST_COMPLETED)
+            for future in sorted(done, key=lambda f: f.result()["line"]):
+                collect(future)
+    return failed
+
+
+def finish(failed: int) -> None:
+    """Exit 1 when any request in the batch failed, like a failed command."""
+    if failed:
+        raise typer.Exit(1)
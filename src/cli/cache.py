@@ -1,27 +1,41 @@
+from dataclasses import asdict, is_dataclass
 from pathlib import Path
-from typing import Any, Literal
+from typing import TYPE_CHECKING, Any, Literal, Optional
 
 import typer
-from rich.console import Console
-from rich.table import Table
 
 from src.application.formatters.word import word_to_json
 from src.application.service.cache import DiskCache
+from src.cli import batch
 from src.domain.core.sentence import Sentence
 from src.domain.core.stt_base import STTResponse
 
+if TYPE_CHECKING:
+    from rich.console import Console
+
 BASE_CACHE_DIR = Path(__file__).resolve().parents[2] / ".cache"
 
-console = Console()
 app = typer.Typer(help="Cache inspection commands")
 
 
+def _echo(label: str, value: Optional[Any] = None, color: str = "cyan") -> None:
+    # One-line answers go through click, so they don't pay for importing rich.
+    styled = typer.style(label, fg=color)
+    typer.echo(styled if value is None else f"{styled} {value}")
+
+
+def _console() -> "Console":
+    from rich.console import Console
+
+    return Console()
+
+
 def _render_stt_content(
     value,
     *,
     verbose: Literal["text", "words", "hybrid"],
     truncate: bool,
-    console: Console,
+    console: "Console",
     text_limit: int = 200,
     words_limit: int = 10,
 ):
@@ -60,14 +74,25 @@ def _classify_value(value: Any) -> str:
     return type(value).__name__
 
 
+def _to_json_value(value: Any) -> Any:
+    """Cached objects as plain JSON data (dataclasses become dicts)."""
+    if is_dataclass(value) and not isinstance(value, type):
+        return asdict(value)
+    if isinstance(value, (list, tuple)):
+        return [_to_json_value(item) for item in value]
+    if isinstance(value, dict):
+        return {str(k): _to_json_value(v) for k, v in value.items()}
+    return value
+
+
 def _iter_cache(cache: DiskCache):
-    for key in cache._cache.iterkeys():  # type: ignore[attr-defined]
-        yield key, cache.get(key)  # type: ignore
+    for key in cache.keys():
+        yield key, cache.get(key)
 
 
 @app.command("get")
 def get_key(
-    key: str = typer.Argument(..., help="Cache key"),
+    key: str | None = typer.Argument(None, help="Cache key"),
     verbose: Literal["text", "words", "hybrid"] = typer.Option(
         "text",
         "--verbose",
@@ -82,18 +107,39 @@ def get_key(
         show_default=True,
     ),
     quiet: bool = typer.Option(False, "--quiet", "-q", help="Suppress console output"),
+    batch_mode: bool = batch.batch_option(),
+    jobs: int = batch.jobs_option(),
+    ordered: bool = batch.ordered_option(),
 ):
-    """Get a cached item by key."""
+    """Get a cached item by key.
+
+    With --batch, each stdin line is {"key": ...} and the result is the
+    cached value as JSON.
+    """
     cache = DiskCache(directory=str(BASE_CACHE_DIR))
+    if batch_mode:
+
+        def handle(request: dict) -> Any:
+            key = batch.fields(request, ("key",))["key"]
+            value = cache.get(key)
+            if value is None:
+                raise LookupError(f"Not found: {key}")
+            return _to_json_value(value)
+
+        batch.finish(batch.run_batch(handle, jobs, ordered))
+        return
+
+    key = batch.require(key, "KEY")
     value = cache.get(key)
     if value is None:
         if not quiet:
-            console.print("[red]Not found[/red]")
+            _echo("Not found", color="red")
         raise typer.Exit(1)
 
     if quiet:
         return
 
+    console = _console()
     console.print(f"[cyan]Key:[/cyan] {key}")
     console.print(f"[cyan]Type:[/cyan] {_classify_value(value)}")
     if isinstance(value, STTResponse):
@@ -123,7 +169,7 @@ def exists(
     cache = DiskCache(directory=str(BASE_CACHE_DIR))
     found = cache.get(key) is not None
     if not quiet:
-        console.print("[green]Yes[/green]" if found else "[red]No[/red]")
+        _echo("Yes" if found else "No", color="green" if found else "red")
     raise typer.Exit(0 if found else 1)
 
 
@@ -136,6 +182,8 @@ def list_keys(
     cache = DiskCache(directory=str(BASE_CACHE_DIR))
     if quiet:
         return
+    from rich.table import Table
+
     table = Table(title="Cache keys", show_lines=False)
     table.add_column("Key", overflow="fold", no_wrap=True)
     table.add_column("Type")
@@ -145,8 +193,8 @@ def list_keys(
             continue
         table.add_row(str(key), _classify_value(value))
         count += 1
-    console.print(table)
-    console.print(f"[cyan]Total:[/cyan] {count}")
+    _console().print(table)
+    _echo("Total:", count)
 
 
 @app.command("stats")
@@ -167,9 +215,9 @@ def stats(
             segments += 1
     if quiet:
         return
-    console.print(f"[cyan]Total keys:[/cyan] {total}")
-    console.print(f"[cyan]Transcripts:[/cyan] {transcripts}")
-    console.print(f"[cyan]Segments:[/cyan] {segments}")
+    _echo("Total keys:", total)
+    _echo("Transcripts:", transcripts)
+    _echo("Segments:", segments)
 
 
 @app.command("clear")
@@ -177,17 +225,24 @@ def clear(
     confirm: bool = typer.Option(
         False, "--yes", "-y", help="Confirm clearing the cache"
     ),
+    keep_prefix: list[str] = typer.Option(
+        [],
+        "--keep-prefix",
+        "-k",
+        help="Keep keys with this prefix, e.g. job: for pipeline manifests",
+    ),
     quiet: bool = typer.Option(False, "--quiet", "-q", help="Suppress console output"),
 ):
     """Clear the cache store."""
     if not confirm:
         if not quiet:
-            console.print("[yellow]Use --yes to confirm clearing the cache[/yellow]")
+            _echo("Use --yes to confirm clearing the cache", color="yellow")
         raise typer.Exit(1)
     cache = DiskCache(directory=str(BASE_CACHE_DIR))
-    cache.clear()
+    removed = cache.clear(tuple(keep_prefix))
     if not quiet:
-        console.print("[green]Cache cleared[/green]")
+        kept = f", kept {', '.join(keep_prefix)}*" if keep_prefix else ""
+        _echo("Cache cleared", f"({removed} keys{kept})", color="green")
 
 
 @app.command("delete")
@@ -202,6 +257,6 @@ def delete_key(
     if quiet:
         return
     if existed:
-        console.print(f"[green]Deleted:[/green] {key}")
+        _echo("Deleted:", key, color="green")
     else:
-        console.print(f"[yellow]Key not found:[/yellow] {key}")
+        _echo("Key not found:", key, color="yellow")
@@ -1,31 +1,46 @@
 import os
-from dataclasses import dataclass
-from pathlib import Path
-from typing import Literal
+import threading
+from typing import TYPE_CHECKING, Any, Callable, Generic, Literal, TypeVar
 
-from elevenlabs import ElevenLabs
+from src.cli.cache import BASE_CACHE_DIR
 
-from dotenv import load_dotenv
+if TYPE_CHECKING:
+    from elevenlabs import ElevenLabs
+    from openai import OpenAI
 
-from src.application.service.cache import DiskCache
-from src.application.service.segment import SegmentService
-from src.application.usecases.transcribe import Transcribe
-from src.application.usecases.translate import Translate
-from src.cli.cache import BASE_CACHE_DIR
-from src.infras.segmenting.openai_segmenting import OpenAISegmenter
-from src.infras.segmenting.punctuation_segmenting import PunctuationSegmenter
-from src.infras.stt.elevenlabs import STTElevenlabs
-from src.infras.translate.openai_translate import OpenAITranslator
-from src.infras.tts.elevenlabs import TTSElevenlabs
-from openai import OpenAI
-from src.application.usecases.tts import TextToSpeech
+    from src.application.service.cache import DiskCache
+    from src.application.service.probe import ProbeService
+    from src.application.service.segment import SegmentService
+    from src.application.usecases.transcribe import Transcribe
+    from src.application.usecases.translate import Translate
+    from src.application.usecases.tts import TextToSpeech
+
+T = TypeVar("T")
+
+_env_loaded = False
 
-load_dotenv()
+
+def _api_key(name: str) -> str:
+    """Read a key from the environment (or .env), only once it is needed."""
+    global _env_loaded
+    if not _env_loaded:
+        from dotenv import load_dotenv
+
+        load_dotenv()
+        _env_loaded = True
+    value = os.getenv(name)
+    if not value:
+        raise RuntimeError(f"Missing {name}")
+    return value
 
 
 class SegmentServiceFactory:
-    def __init__(self, openai_client: OpenAI) -> None:
+    def __init__(
+        self, openai_client: Callable[[], "OpenAI"], cache: "DiskCache"
+    ) -> None:
+        # Called only for the "openai" technique, so other techniques need no key.
         self._openai_client = openai_client
+        self._cache = cache
 
     def get_segment_service(
         self,
@@ -34,77 +49,135 @@ class SegmentServiceFactory:
         model: str | None = None,
         punctuation: str | None = None,
         max_words_per_segment: int | None = None,
-    ):
+    ) -> "SegmentService":
+        from src.application.service.segment import SegmentService
+
         if technique == "openai":
             if not model or not prompt:
                 raise ValueError(
                     "When using openai as a segmenter, please provide your service a model and a prompt."
                 )
-            cache = DiskCache(directory=str(BASE_CACHE_DIR))
+            from src.infras.segmenting.openai_segmenting import OpenAISegmenter
+
             return SegmentService(
-                OpenAISegmenter(self._openai_client, prompt, model), cache
+                OpenAISegmenter(self._openai_client(), prompt, model), self._cache
             )
         elif technique == "punctuation":
-            cache = DiskCache(directory=str(BASE_CACHE_DIR))
+            from src.infras.segmenting.punctuation_segmenting import (
+                PunctuationSegmenter,
+            )
 
             if punctuation:
-                return SegmentService(PunctuationSegmenter(punctuation), cache)
+                return SegmentService(PunctuationSegmenter(punctuation), self._cache)
             else:
-                return SegmentService(PunctuationSegmenter(), cache)
+                return SegmentService(PunctuationSegmenter(), self._cache)
         elif technique == "words_count":
-            cache = DiskCache(directory=str(BASE_CACHE_DIR))
             from src.infras.segmenting.word_count_segmenting import WordCountSegmenter
 
             return SegmentService(
                 WordCountSegmenter(
                     max_words_per_segment=max_words_per_segment or 20
                 ),
-                cache,
+                self._cache,
             )
         else:
             raise ValueError(f"Unsupported segmenter type: {technique}")
 
 
-@dataclass
+class _Provider(Generic[T]):
+    """Container attribute built on first access, then stored on the instance.
+
+    Building holds the container's lock, so stages running on several
+    threads share one client; once stored, reads never take the lock.
+    """
+
+    def __init__(self, build: Callable[["AppContainer"], T]) -> None:
+        self._build = build
+        self.__doc__ = build.__doc__
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        self._name = name
+
+    def __get__(self, container: "AppContainer", owner: type | None = None) -> T:
+        if container is None:
+            return self  # type: ignore[return-value]
+        with container._lock:
+            if self._name not in container.__dict__:
+                container.__dict__[self._name] = self._build(container)
+            return container.__dict__[self._name]
+
+
 class AppContainer:
-    cache: DiskCache
-    transcribe: Transcribe
-    segment_service_factory: SegmentServiceFactory
-    translate: Translate
-    tts: TextToSpeech
-    openai_client: OpenAI
+    """Dependencies, each imported and built only when a command uses it.
+
+    `cache list` never loads the ElevenLabs or OpenAI SDKs or asks for
+    their API keys. Pass providers as keyword arguments to override them.
+    """
+
+    def __init__(self, **providers: Any) -> None:
+        self._lock = threading.RLock()
+        unknown = [
+            name
+            for name in providers
+            if not isinstance(getattr(type(self), name, None), _Provider)
+        ]
+        if unknown:
+            raise TypeError(f"Unknown providers: {', '.join(unknown)}")
+        self.__dict__.update(providers)
+
+    @_Provider
+    def cache(self) -> "DiskCache":
+        from src.application.service.cache import DiskCache
+
+        return DiskCache(directory=str(BASE_CACHE_DIR))
+
+    @_Provider
+    def probe(self) -> "ProbeService":
+        from src.application.service.probe import ProbeService
+
+        return ProbeService(self.cache)
+
+    @_Provider
+    def elevenlabs_client(self) -> "ElevenLabs":
+        api_key = _api_key("ELEVENLABS_API_KEY")
+        from elevenlabs import ElevenLabs
+
+        return ElevenLabs(api_key=api_key)
+
+    @_Provider
+    def openai_client(self) -> "OpenAI":
+        api_key = _api_key("OPENAI_API_KEY")
+        from openai import OpenAI
+
+        return OpenAI(api_key=api_key)
+
+    @_Provider
+    def segment_service_factory(self) -> SegmentServiceFactory:
+        return SegmentServiceFactory(lambda: self.openai_client, self.cache)
+
+    @_Provider
+    def transcribe(self) -> "Transcribe":
+        from src.application.usecases.transcribe import Transcribe
+        from src.infras.stt.elevenlabs import STTElevenlabs
+
+        stt = STTElevenlabs(self.elevenlabs_client.speech_to_text)
+        return Transcribe(stt, self.cache)
+
+    @_Provider
+    def translate(self) -> "Translate":
+        from src.application.usecases.translate import Translate
+        from src.infras.translate.openai_translate import OpenAITranslator
+
+        return Translate(OpenAITranslator(self.openai_client), self.cache)
+
+    @_Provider
+    def tts(self) -> "TextToSpeech":
+        from src.application.usecases.tts import TextToSpeech
+        from src.infras.tts.elevenlabs import TTSElevenlabs
+
+        tts = TTSElevenlabs(self.elevenlabs_client.text_to_speech)
+        return TextToSpeech(tts, self.cache)
 
 
 def build_container() -> AppContainer:
-    elevenlabs_api_key = os.getenv("ELEVENLABS_API_KEY")
-    openai_api_key = os.getenv("OPENAI_API_KEY")
-    if not elevenlabs_api_key:
-        raise RuntimeError("Missing ELEVENLABS_API_KEY")
-
-    if not openai_api_key:
-        raise RuntimeError("Missing OPENAI_API_KEY")
-
-    elevenlabs_client = ElevenLabs(api_key=elevenlabs_api_key)
-    openai_client = OpenAI(api_key=openai_api_key)
-    cache_dir = Path(__file__).resolve().parents[2] / ".cache"
-    cache = DiskCache(directory=str(cache_dir))
-
-    stt_adapter = STTElevenlabs(elevenlabs_client.speech_to_text)
-    tts_adapter = TTSElevenlabs(elevenlabs_client.text_to_speech)
-
-    # factory
-    segment_service_factory = SegmentServiceFactory(openai_client)
-
-    # use cases
-    transcribe = Transcribe(stt_adapter, cache)
-    translate = Translate(OpenAITranslator(openai_client), cache)
-    tts = TextToSpeech(tts_adapter, cache)
-
-    return AppContainer(
-        cache=cache,
-        transcribe=transcribe,
-        segment_service_factory=segment_service_factory,
-        translate=translate,
-        tts=tts,
-        openai_client=openai_client,
-    )
+    return AppContainer()
@@ -0,0 +1,155 @@
+"""Forward `python -m src.main ...` to a running `serve` daemon.
+
+Stdlib only: this runs before any of the CLI is imported, so a forwarded
+command costs one localhost request instead of a cold start.
+
+Forwarding is opt-in: set PMEDIA_DAEMON to `on` (the default address) or
+to the daemon's host:port. A command is forwarded only after the daemon
+proves itself on /health with the token it wrote to the cache directory,
+readable by its own user only; anything else runs the command locally.
+Forwarded commands run with the daemon's environment and API keys.
+"""
+
+import os
+import sys
+from typing import Any, Optional, TextIO
+
+DAEMON_ENV = "PMEDIA_DAEMON"
+DEFAULT_ADDRESS = "127.0.0.1:8765"
+CONNECT_TIMEOUT_S = 0.2
+# Long-running or stdin-reading commands that must run in the calling process.
+LOCAL_ONLY = {"serve", "watch", "queue"}
+# Identifies a `serve` daemon on /health, so a stranger on the port isn't used.
+SERVICE = "pmedia-serve"
+# Same directory as src.cli.cache.BASE_CACHE_DIR, without importing the CLI.
+TOKEN_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    ".cache",
+)
+
+_OFF = ("", "0", "off", "no", "false")
+_ON = ("1", "on", "yes", "true")
+
+
+def parse_address(value: Optional[str]) -> Optional[tuple[str, int]]:
+    """(host, port) for a PMEDIA_DAEMON value, or None when it is off or unset."""
+    address = (value or "").strip()
+    if address.lower() in _OFF:
+        return None
+    if address.lower() in _ON:
+        address = DEFAULT_ADDRESS
+    host, _, port = address.rpartition(":")
+    try:
+        return host or "127.0.0.1", int(port)
+    except ValueError:
+        return None
+
+
+def daemon_address() -> Optional[tuple[str, int]]:
+    """(host, port) from $PMEDIA_DAEMON, or None when forwarding is off."""
+    return parse_address(os.environ.get(DAEMON_ENV))
+
+
+def token_path(address: tuple[str, int]) -> str:
+    return os.path.join(TOKEN_DIR, f"daemon-{address[1]}.token")
+
+
+def read_token(address: tuple[str, int]) -> Optional[str]:
+    try:
+        with open(token_path(address), encoding="utf-8") as f:
+            return f.read().strip() or None
+    except OSError:
+        return None
+
+
+def _request(
+    address: tuple[str, int],
+    method: str,
+    path: str,
+    token: str,
+    body: Optional[dict[str, Any]] = None,
+    timeout: Optional[float] = CONNECT_TIMEOUT_S,
+) -> tuple[int, Any]:
+    """One request to the daemon; raises OSError, HTTPException or ValueError."""
+    import json
+    import socket
+
+    sock = socket.create_connection(address, timeout=CONNECT_TIMEOUT_S)
+    # http.client is only worth importing once something is listening.
+    import http.client
+
+    conn = http.client.HTTPConnection(*address)
+    sock.settimeout(timeout)
+    conn.sock = sock
+    headers = {"Authorization": f"Bearer {token}"}
+    data = None
+    if body is not None:
+        data = json.dumps(body)
+        headers["Content-Type"] = "application/json"
+    try:
+        conn.request(method, path, body=data, headers=headers)
+        response = conn.getresponse()
+        return response.status, json.loads(response.read() or b"{}")
+    finally:
+        conn.close()
+
+
+def _is_daemon(status: int, health: Any, cwd: str) -> bool:
+    return (
+        status == 200
+        and isinstance(health, dict)
+        and health.get("service") == SERVICE
+        and health.get("cwd") == cwd
+    )
+
+
+def forward(
+    argv: list[str],
+    stdout: TextIO = sys.stdout,
+    stderr: TextIO = sys.stderr,
+) -> Optional[int]:
+    """Run `argv` on the daemon and relay its output; returns the exit code.
+
+    Returns None when the command should run locally instead: forwarding is
+    off, there is no token, nothing answers as our daemon for this directory,
+    or the daemon turned the job down without running it.
+    """
+    address = daemon_address()
+    if address is None or not argv or argv[0] in LOCAL_ONLY:
+        return None
+    # The daemon doesn't get our stdin, which --batch reads its requests from.
+    if "--batch" in argv:
+        return None
+    token = read_token(address)
+    if token is None:
+        return None
+
+    cwd = os.path.realpath(os.getcwd())
+    try:
+        status, health = _request(address, "GET", "/health", token)
+    except Exception:
+        return None
+    if not _is_daemon(status, health, cwd):
+        return None
+
+    import http.client
+
+    payload = {"argv": argv, "cwd": cwd, "wait": True}
+    try:
+        # Accepted jobs may run for minutes, so wait without a timeout.
+        status, body = _request(address, "POST", "/jobs", token, payload, None)
+    except (OSError, http.client.HTTPException, ValueError) as exc:
+        # The job may have run; running it again here could repeat its work.
+        stderr.write(f"Daemon at {address[0]}:{address[1]} failed: {exc}\n")
+        return 1
+
+    if status != 200 or not isinstance(body, dict):
+        # Turned down before running (token rotated, different directory,
+        # shutting down): the command is still ours to run.
+        return None
+
+    stdout.write(body.get("stdout", ""))
+    stderr.write(body.get("stderr", ""))
+    stdout.flush()
+    stderr.flush()
+    return int(body.get("exit_code") or 0)
@@ -0,0 +1,369 @@
+import json
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+import typer
+from rich.console import Console
+from rich.table import Table
+
+from src.application.service.jobqueue import (
+    LANES,
+    STATUSES,
+    JobQueue,
+    QueuedJob,
+    worker_id,
+)
+from src.application.service.manifest import load_manifest, new_job_id
+from src.cli import batch
+from src.cli.cache import BASE_CACHE_DIR
+from src.cli.container import AppContainer
+from src.cli.map import build_c_key, map_transcripts
+from src.cli.pipeline import PipelineOptions, resume_pipeline, run_pipeline
+from src.cli.segment import segment_key
+from src.cli.stt import transcribe_file
+from src.cli.translate import translate_key
+from src.cli.tts import synthesize_key_to_file
+
+# Next to the cache, so hosts that share the cache directory share the queue.
+QUEUE_PATH = BASE_CACHE_DIR / "queue.sqlite3"
+
+console = Console(stderr=True, legacy_windows=False)
+app = typer.Typer(help="Durable job queue shared by workers on one or more hosts")
+
+
+@dataclass(frozen=True)
+class Stage:
+    """A kind of queued job: its payload fields and how to run it."""
+
+    required: tuple[str, ...]
+    run: Callable[[AppContainer, dict[str, Any]], str]
+    defaults: dict[str, Any] = field(default_factory=dict)
+
+    def fields(self, payload: dict[str, Any]) -> dict[str, Any]:
+        return batch.fields(payload, self.required, **self.defaults)
+
+
+def _pipeline(container: AppContainer, values: dict[str, Any]) -> str:
+    # A job picked up again after a crash or failure continues its manifest.
+    job_id = values["job_id"]
+    try:
+        if job_id and load_manifest(container.cache, job_id) is not None:
+            return resume_pipeline(container, job_id).video_key
+        opts = PipelineOptions.from_dict(values["options"])
+        return run_pipeline(container, Path(values["video"]), opts, job_id).video_key
+    except (Exception, typer.Exit) as exc:
+        manifest = load_manifest(container.cache, job_id) if job_id else None
+        stage = manifest.failed_stage() if manifest else None
+        if manifest is None or stage is None:
+            raise
+        error = manifest.stages[stage].error
+        raise RuntimeError(f"Stage {stage!r} failed: {error}") from exc
+
+
+# Payload fields match the --batch request fields of the same commands.
+STAGES = {
+    "pipeline": Stage(("video",), _pipeline, {"options": {}, "job_id": None}),
+    "stt": Stage(
+        ("audio_path",),
+        lambda c, v: transcribe_file(c, Path(v["audio_path"]), v["model"]),
+        {"model": "scribe_v2"},
+    ),
+    "translate": Stage(
+        ("key", "to"),
+        lambda c, v: translate_key(c, v["key"], v["to"], v["from"]),
+        {"from": None},
+    ),
+    "segment": Stage(
+        ("key",),
+        lambda c, v: segment_key(c, **v),
+        {
+            "technique": "openai",
+            "model": "gpt-4o",
+            "punctuation": None,
+            "max_words_per_segment": 20,
+        },
+    ),
+    "map": Stage(
+        ("rut_key", "goc_key"), lambda c, v: map_transcripts(c, **v), {"model": None}
+    ),
+    "build_c": Stage(
+        ("map_key", "rut_key", "goc_key"), lambda c, v: build_c_key(c, **v)
+    ),
+    "tts": Stage(
+        ("key", "voice", "output"),
+        lambda c, v: str(
+            synthesize_key_to_file(
+                c, v["key"], v["voice"], Path(v["output"]), v["model"]
+            )
+        ),
+        {"model": None},
+    ),
+}
+
+
+def _open(lease_s: float = 60.0) -> JobQueue:
+    return JobQueue(QUEUE_PATH, lease_s=lease_s)
+
+
+def _check_lane(lane: str) -> str:
+    if lane not in LANES:
+        raise typer.BadParameter(f"Lane must be one of: {', '.join(LANES)}")
+    return lane
+
+
+def _keep_alive(
+    jobs: JobQueue, job: QueuedJob, owner: str, done: threading.Event
+) -> None:
+    while not done.wait(jobs.lease_s / 3):
+        if not jobs.heartbeat(job.id, owner):
+            console.print(f"[yellow]lost lease[/yellow] on job {job.id}")
+            return
+
+
+def _work(
+    container: AppContainer,
+    jobs: JobQueue,
+    lanes: tuple[str, ...],
+    poll_s: float,
+    drain: bool,
+    stop: threading.Event,
+) -> None:
+    owner = worker_id()
+    while not stop.is_set():
+        job = jobs.lease(owner, lanes)
+        if job is None:
+            if drain:
+                return
+            stop.wait(poll_s)
+            continue
+
+        console.print(
+            f"[cyan]start[/cyan] job {job.id} {job.kind} ({job.lane}, "
+            f"attempt {job.attempts}/{job.max_attempts})"
+        )
+        done = threading.Event()
+        heartbeat = threading.Thread(
+            target=_keep_alive, args=(jobs, job, owner, done), daemon=True
+        )
+        heartbeat.start()
+        started = time.perf_counter()
+        try:
+            stage = STAGES.get(job.kind)
+            if stage is None:
+                raise batch.BatchRequestError(f"Unknown job kind {job.kind!r}")
+            result = stage.run(container, stage.fields(job.payload))
+        except (Exception, typer.Exit) as exc:
+            # Bad input won't get better on another attempt.
+            permanent = isinstance(
+                exc, (typer.BadParameter, batch.BatchRequestError)
+            )
+            error = batch.error_message(exc)
+            status = jobs.fail(job.id, owner, error, retry=not permanent)
+            console.print(
+                f"[red]failed[/red] job {job.id}: {error} -> {status or 'lease lost'}"
+            )
+        else:
+            if jobs.complete(job.id, owner, result):
+                console.print(
+                    f"[green]done[/green] job {job.id} in "
+                    f"{time.perf_counter() - started:.1f}s"
+                )
+                print(result, flush=True)
+            else:
+                console.print(
+                    f"[yellow]lease lost[/yellow] job {job.id}; result not recorded"
+                )
+        finally:
+            done.set()
+            heartbeat.join()
+
+
+@app.command("add")
+def add(
+    videos: list[Path] = typer.Argument(..., help="Videos to run the pipeline on"),
+    lane: str = typer.Option(
+        "interactive", "--lane", "-l", help="interactive or backfill"
+    ),
+    max_attempts: int = typer.Option(3, "--max-attempts", min=1),
+    source_language: str = typer.Option("zh", "--from", "-f"),
+    target_language: str = typer.Option("vi", "--to", "-t"),
+    voice: str = typer.Option(
+        PipelineOptions.voice, "--voice", help="ElevenLabs voice id"
+    ),
+    tempo: float = typer.Option(PipelineOptions.tempo, "--tempo", min=0.1, max=10.0),
+):
+    """Queue `pipeline run` for each video and print the queue job ids."""
+    _check_lane(lane)
+    opts = PipelineOptions(
+        source_language=source_language,
+        target_language=target_language,
+        voice=voice,
+        tempo=tempo,
+    )
+    jobs = _open()
+    for video in videos:
+        if not video.exists():
+            raise typer.BadParameter(f"File not found: {video}")
+        payload = {
+            # Absolute, so a worker started elsewhere finds the file.
+            "video": str(video.resolve()),
+            "options": opts.to_dict(),
+            # The pipeline manifest id, fixed up front so a retry resumes it.
+            "job_id": new_job_id(),
+        }
+        print(jobs.enqueue("pipeline", payload, lane, max_attempts))
+
+
+@app.command("submit")
+def submit(
+    kind: str = typer.Argument(..., help=f"One of: {', '.join(STAGES)}"),
+    lane: str = typer.Option(
+        "interactive", "--lane", "-l", help="interactive or backfill"
+    ),
+    max_attempts: int = typer.Option(3, "--max-attempts", min=1),
+):
+    """Queue one job of KIND per JSON payload line on stdin; print their ids.
+
+    Payloads have the same fields as the matching command's --batch requests.
+    """
+    _check_lane(lane)
+    stage = STAGES.get(kind)
+    if stage is None:
+        raise typer.BadParameter(f"Kind must be one of: {', '.join(STAGES)}")
+    # Check every line first, so a bad one doesn't leave half the input queued.
+    payloads = []
+    for number, line in enumerate(sys.stdin, start=1):
+        if not line.strip():
+            continue
+        try:
+            payload = json.loads(line)
+            if not isinstance(payload, dict):
+                raise ValueError("not a JSON object")
+            stage.fields(payload)
+        except ValueError as exc:
+            raise typer.BadParameter(f"line {number}: {exc}")
+        payloads.append(payload)
+    jobs = _open()
+    for payload in payloads:
+        if kind == "pipeline" and not payload.get("job_id"):
+            # As in `add`: fixed up front so a retry resumes the manifest.
+            payload["job_id"] = new_job_id()
+        print(jobs.enqueue(kind, payload, lane, max_attempts))
+
+
+@app.command("work")
+def work(
+    workers: int = typer.Option(1, "--workers", "-w", min=1, help="Jobs run at once"),
+    lanes: Optional[list[str]] = typer.Option(
+        None, "--lane", "-l", help="Only take jobs from this lane (repeatable)"
+    ),
+    lease: float = typer.Option(
+        60.0, "--lease", min=1.0, help="Seconds a job stays leased without heartbeat"
+    ),
+    poll: float = typer.Option(1.0, "--poll", min=0.05, help="Idle check interval"),
+    drain: bool = typer.Option(False, "--drain", help="Exit once no job is ready"),
+    ctx: typer.Context = typer.Option(None, hidden=True),
+):
+    """Run queued jobs until stopped, printing each result (a key or path).
+
+    Start one worker per host, or several per host; they coordinate through
+    the queue file. Ctrl-C lets running jobs finish. A worker that dies
+    leaves its job leased until the lease expires, then another takes it.
+    """
+    if not isinstance(ctx.obj, AppContainer):
+        raise typer.BadParameter("App container not initialized")
+
+    selected = tuple(_check_lane(lane) for lane in lanes) if lanes else LANES
+    jobs = _open(lease)
+    stop = threading.Event()
+    threads = [
+        threading.Thread(
+            target=_work,
+            args=(ctx.obj, jobs, selected, poll, drain, stop),
+            name=f"queue-worker-{i}",
+            daemon=True,
+        )
+        for i in range(workers)
+    ]
+    console.print(
+        f"[green]Working {QUEUE_PATH}[/green] "
+        f"({workers} workers, lanes {', '.join(selected)})"
+    )
+    for thread in threads:
+        thread.start()
+    try:
+        while any(thread.is_alive() for thread in threads):
+            for thread in threads:
+                thread.join(timeout=0.5)
+    except KeyboardInterrupt:
+        console.print("[yellow]Stopping; waiting for running jobs[/yellow]")
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+
+@app.command("status")
+def status(
+    as_json: bool = typer.Option(False, "--json", help="Print the counts as JSON"),
+):
+    """Show job counts per lane and status."""
+    snapshot = _open().snapshot()
+    if as_json:
+        print(json.dumps(snapshot))
+        return
+    table = Table(title=str(QUEUE_PATH))
+    table.add_column("Lane")
+    for name in STATUSES:
+        table.add_column(name, justify="right")
+    for lane, counts in snapshot["lanes"].items():
+        table.add_row(lane, *(str(counts[name]) for name in STATUSES))
+    console.print(table)
+    if snapshot["oldest_ready_s"] is not None:
+        console.print(f"Oldest ready job waiting {snapshot['oldest_ready_s']}s")
+
+
+@app.command("list")
+def list_jobs(
+    status: Optional[str] = typer.Option(
+        None, "--status", "-s", help=f"One of: {', '.join(STATUSES)}"
+    ),
+    limit: int = typer.Option(20, "--limit", "-n", min=1),
+):
+    """List recently updated jobs, e.g. `--status dead` for the dead letters."""
+    if status is not None and status not in STATUSES:
+        raise typer.BadParameter(f"Status must be one of: {', '.join(STATUSES)}")
+    table = Table()
+    for column in ("Id", "Kind", "Lane", "Status", "Attempts", "Owner / error"):
+        table.add_column(column)
+    for job in _open().jobs(status, limit):
+        detail = job.lease_owner if job.status == "leased" else job.error
+        table.add_row(
+            str(job.id),
+            job.kind,
+            job.lane,
+            job.status,
+            f"{job.attempts}/{job.max_attempts}",
+            detail or "",
+        )
+    console.print(table)
+
+
+@app.command("retry")
+def retry(
+    job_ids: list[int] = typer.Argument(..., help="Dead-lettered job ids"),
+):
+    """Requeue dead-lettered jobs with a fresh set of attempts."""
+    jobs = _open()
+    missing = [job_id for job_id in job_ids if not jobs.retry(job_id)]
+    for job_id in job_ids:
+        if job_id not in missing:
+            print(job_id)
+    if missing:
+        console.print(
+            f"[red]Not dead-lettered:[/red] {', '.join(map(str, missing))}"
+        )
+        raise typer.Exit(1)
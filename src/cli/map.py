@@ -4,6 +4,8 @@ from typing import Any, Dict, Iterable, List, Optional
 
 import typer
 
+from src.application.service.cache import DiskCache
+from src.cli import batch
 from src.cli.container import AppContainer
 from src.domain.core.sentence import Sentence
 from src.domain.core.stt_base import STTResponse
@@ -164,37 +166,35 @@ def _extract_from_cache_value(value: Any) -> str:
     return _extract_from_json_value(value)
 
 
-@app.command()
-def map(
-    prompt: str = typer.Option(
-        DEFAULT_PROMPT_TEMPLATE_2,
-        "--prompt",
-        help="Prompt template; must include {rut} and {goc} placeholders.",
-    ),
-    rut_key: str = typer.Option(
-        ...,
-        "--rut-key",
-        help="Cache key for shortened/edited transcript (segments or text).",
-    ),
-    goc_key: str = typer.Option(
-        ...,
-        "--goc-key",
-        help="Cache key for original transcript (segments or text).",
-    ),
-    model: Optional[str] = typer.Option(
-        None,
-        "--model",
-        help="Override OpenAI model id; defaults to gpt-5-mini-2025-08-07.",
-    ),
-    show_prompt: bool = typer.Option(
-        False, "--show-prompt", help="Print the filled prompt before sending to OpenAI."
-    ),
-    ctx: typer.Context = typer.Option(None, hidden=True),
-):
-    if not isinstance(ctx.obj, AppContainer):
-        raise typer.BadParameter("App container not initialized")
+MAP_MODEL = "gpt-5-mini-2025-08-07"
+MAP_SYSTEM_PROMPT = (
+    "You are a helpful assistant working with transcriptions, translating and writing."
+)
+
+
+def map_cache_key(rut_key: str, goc_key: str, model: Optional[str] = None) -> str:
+    return DiskCache.make_key("map", rut_key, goc_key, model or MAP_MODEL)
+
 
-    cache = ctx.obj.cache
+def fill_map_prompt(prompt: str, rut_value: Any, goc_value: Any) -> str:
+    """The user message sent for a map; the values are cached transcripts."""
+    transcript_text = _extract_from_cache_value(rut_value)
+    transcript_text_speed = _extract_from_cache_value(goc_value)
+    return prompt.replace("{rut}", transcript_text).replace(
+        "{goc}", transcript_text_speed or transcript_text
+    )
+
+
+def map_transcripts(
+    container: AppContainer,
+    rut_key: str,
+    goc_key: str,
+    model: Optional[str] = None,
+    prompt: str = DEFAULT_PROMPT_TEMPLATE_2,
+    show_prompt: bool = False,
+) -> str:
+    """Align the shortened transcript onto the original; returns the map key."""
+    cache = container.cache
 
     rut_value = cache.get(rut_key)
     goc_value = cache.get(goc_key)
@@ -203,28 +203,20 @@ def map(
     if goc_value is None:
         raise typer.BadParameter(f"Cache key not found for goc: {goc_key}")
 
-    transcript_text = _extract_from_cache_value(rut_value)
-    transcript_text_speed = _extract_from_cache_value(goc_value)
-
-    filled_prompt = prompt.replace("{rut}", transcript_text).replace(
-        "{goc}", transcript_text_speed or transcript_text
-    )
+    filled_prompt = fill_map_prompt(prompt, rut_value, goc_value)
 
     if show_prompt:
         print(filled_prompt)
 
-    client = ctx.obj.openai_client
+    client = container.openai_client
 
     try:
         response = client.chat.completions.create(
             messages=[
-                {
-                    "role": "system",
-                    "content": "You are a helpful assistant working with transcriptions, translating and writing.",
-                },
+                {"role": "system", "content": MAP_SYSTEM_PROMPT},
                 {"role": "user", "content": filled_prompt},
             ],
-            model=model or "gpt-5-mini-2025-08-07",
+            model=model or MAP_MODEL,
             response_format={"type": "json_object"},
         )
     except Exception as exc:
@@ -242,10 +234,72 @@ def map(
     except Exception as exc:
         raise typer.Exit(code=1) from exc
 
-    map_key = cache.make_key("map", rut_key, goc_key, model or "gpt-5-mini-2025-08-07")
+    map_key = map_cache_key(rut_key, goc_key, model)
     cache.set(map_key, parsed)
 
-    print(map_key)
+    return map_key
+
+
+@app.command()
+def map(
+    prompt: str = typer.Option(
+        DEFAULT_PROMPT_TEMPLATE_2,
+        "--prompt",
+        help="Prompt template; must include {rut} and {goc} placeholders.",
+    ),
+    rut_key: Optional[str] = typer.Option(
+        None,
+        "--rut-key",
+        help="Cache key for shortened/edited transcript (segments or text).",
+    ),
+    goc_key: Optional[str] = typer.Option(
+        None,
+        "--goc-key",
+        help="Cache key for original transcript (segments or text).",
+    ),
+    model: Optional[str] = typer.Option(
+        None,
+        "--model",
+        help="Override OpenAI model id; defaults to gpt-5-mini-2025-08-07.",
+    ),
+    show_prompt: bool = typer.Option(
+        False, "--show-prompt", help="Print the filled prompt before sending to OpenAI."
+    ),
+    batch_mode: bool = batch.batch_option(),
+    jobs: int = batch.jobs_option(),
+    ordered: bool = batch.ordered_option(),
+    ctx: typer.Context = typer.Option(None, hidden=True),
+):
+    if not isinstance(ctx.obj, AppContainer):
+        raise typer.BadParameter("App container not initialized")
+
+    container = ctx.obj
+    if batch_mode:
+        # Lines are {"rut_key", "goc_key", "model"}; --show-prompt would mix
+        # prompts into the JSON results, so it is ignored here.
+        def handle(request: dict) -> str:
+            values = batch.fields(
+                request,
+                ("rut_key", "goc_key"),
+                rut_key=rut_key,
+                goc_key=goc_key,
+                model=model,
+            )
+            return map_transcripts(container, prompt=prompt, **values)
+
+        batch.finish(batch.run_batch(handle, jobs, ordered))
+        return
+
+    print(
+        map_transcripts(
+            container,
+            batch.require(rut_key, "--rut-key"),
+            batch.require(goc_key, "--goc-key"),
+            model,
+            prompt,
+            show_prompt,
+        )
+    )
 
 
 def _to_decimal(x: Any) -> Decimal:
@@ -352,33 +406,16 @@ def _index_by_id(items: List[Dict[str, Any]]) -> Dict[int, Dict[str, Any]]:
     return {int(x["id"]): x for x in items}
 
 
-@app.command()
-def build_c(
-    map_key: str = typer.Option(
-        ...,
-        "--map-key",
-        help="Cache key that stores mapping output (clarity + mappings).",
-    ),
-    rut_key: str = typer.Option(
-        ...,
-        "--rut-key",
-        help="Cache key for B (Vietnamese) segmented sentences WITH ids.",
-    ),
-    goc_key: str = typer.Option(
-        ..., "--goc-key", help="Cache key for A (Chinese) segmented sentences WITH ids."
-    ),
-    ctx: typer.Context = typer.Option(None, hidden=True),
-):
+def build_c_key(
+    container: AppContainer, map_key: str, rut_key: str, goc_key: str
+) -> str:
     """
     Build version C segments by mapping each B to exactly one A:
       start_C = start_A
       end_C = start_C + duration_B + pause_padding
-    where pause_padding comes from gaps in B.
+    where pause_padding comes from gaps in B. Returns the key of the result.
     """
-    if not isinstance(ctx.obj, AppContainer):
-        raise typer.BadParameter("App container not initialized")
-
-    cache = ctx.obj.cache
+    cache = container.cache
 
     mapping_obj = cache.get(map_key)
     if mapping_obj is None:
@@ -498,5 +535,61 @@ def build_c(
         "pause" if include_b_gaps_as_pause else "nopause",
     )
     cache.set(out_key, result)
+    return out_key
+
+
+@app.command()
+def build_c(
+    map_key: Optional[str] = typer.Option(
+        None,
+        "--map-key",
+        help="Cache key that stores mapping output (clarity + mappings).",
+    ),
+    rut_key: Optional[str] = typer.Option(
+        None,
+        "--rut-key",
+        help="Cache key for B (Vietnamese) segmented sentences WITH ids.",
+    ),
+    goc_key: Optional[str] = typer.Option(
+        None, "--goc-key", help="Cache key for A (Chinese) segmented sentences WITH ids."
+    ),
+    batch_mode: bool = batch.batch_option(),
+    jobs: int = batch.jobs_option(),
+    ordered: bool = batch.ordered_option(),
+    ctx: typer.Context = typer.Option(None, hidden=True),
+):
+    """
+    Build version C segments by mapping each B to exactly one A:
+      start_C = start_A
+      end_C = start_C + duration_B + pause_padding
+    where pause_padding comes from gaps in B.
 
-    print(out_key)
+    With --batch, each stdin line is {"map_key", "rut_key", "goc_key"}.
+    """
+    if not isinstance(ctx.obj, AppContainer):
+        raise typer.BadParameter("App container not initialized")
+
+    container = ctx.obj
+    if batch_mode:
+
+        def handle(request: dict) -> str:
+            values = batch.fields(
+                request,
+                ("map_key", "rut_key", "goc_key"),
+                map_key=map_key,
+                rut_key=rut_key,
+                goc_key=goc_key,
+            )
+            return build_c_key(container, **values)
+
+        batch.finish(batch.run_batch(handle, jobs, ordered))
+        return
+
+    print(
+        build_c_key(
+            container,
+            batch.require(map_key, "--map-key"),
+            batch.require(rut_key, "--rut-key"),
+            batch.require(goc_key, "--goc-key"),
+        )
+    )
@@ -0,0 +1,1082 @@
+import json
+import time
+from dataclasses import asdict, dataclass, field, replace
+from pathlib import Path
+from typing import Any, Literal, Optional
+
+import typer
+from rich.console import Console
+from rich.table import Table
+
+from src.application.service.dag import (
+    AsyncDagRunner,
+    Dag,
+    DagError,
+    DagRun,
+    NodeTask,
+)
+from src.application.service.ffmpeg import FFmpegRunner
+from src.application.service.manifest import JobManifest, JobTracker, list_manifests
+from src.application.service.planner import RateHistory, critical_path, estimate_tokens
+from src.application.service.scheduler import CpuBudget
+from src.application.service.segment import segment_cache_key
+from src.application.usecases.transcribe import stt_cache_key
+from src.application.usecases.translate import translation_cache_key
+from src.cli import video as video_cli
+from src.cli.container import AppContainer
+from src.cli.map import (
+    DEFAULT_PROMPT_TEMPLATE_2,
+    MAP_SYSTEM_PROMPT,
+    fill_map_prompt,
+    map_transcripts,
+)
+from src.cli.segment import segment_key
+from src.cli.stt import transcribe_file
+from src.cli.translate import translate_key
+from src.cli.tts import synthesize_key_to_file
+from src.domain.core.stt_base import STTResponse
+
+# stdout carries the resulting cache key; progress goes to stderr.
+console = Console(stderr=True, legacy_windows=False)
+app = typer.Typer(help="End-to-end dubbing pipeline")
+
+# Caption styling used by workflow/current.json.
+WORKFLOW_RENDER = video_cli.RenderOptions(
+    method="ass",
+    caption_box=True,
+    caption_box_width=1050,
+    caption_box_align="center",
+    caption_box_margin_bottom=-1300,
+    caption_box_height=260,
+    caption_box_alpha=1.0,
+)
+
+
+@dataclass(frozen=True)
+class PipelineOptions:
+    """Settings for one `pipeline run`; defaults mirror the n8n workflow."""
+
+    source_language: str = "zh"
+    target_language: str = "vi"
+    stt_model: str = "scribe_v2"
+    source_punctuation: str = "。"
+    max_words_per_segment: int = 10
+    voice: str = "UsgbMVmY3U59ijwK5mdh"
+    tts_model: Optional[str] = "eleven_v3"
+    map_model: str = "gpt-5-mini-2025-08-07"
+    tempo: float = 1.4
+    render: video_cli.RenderOptions = WORKFLOW_RENDER
+    # Concurrent stages per resource within this run.
+    limits: dict[str, int] = field(
+        default_factory=lambda: {"stt": 2, "llm": 2, "tts": 2, "ffmpeg": 1}
+    )
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "PipelineOptions":
+        """Inverse of to_dict; fields missing from `data` keep their defaults."""
+        # Hand-written queue payloads may leave out render or any of its fields.
+        render = replace(WORKFLOW_RENDER, **data.get("render", {}))
+        return cls(**{**data, "render": render})
+
+    def translated_audio(self, video_path: Path) -> Path:
+        return video_path.with_stem(video_path.stem + "_translated").with_suffix(
+            ".mp3"
+        )
+
+    def speeded_up_audio(self, video_path: Path) -> Path:
+        return video_path.with_stem(video_path.stem + "_speeded_up").with_suffix(
+            ".mp3"
+        )
+
+
+@dataclass
+class PipelineResult:
+    video_key: str
+    keys: dict[str, str]
+    entry: dict[str, Any]
+    report: dict[str, Any] = field(default_factory=dict)
+    job_id: Optional[str] = None
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+def _logged(name: str, task: NodeTask) -> NodeTask:
+    def run(inputs: dict[str, Any]) -> Any:
+        started = time.perf_counter()
+        result = task(inputs)
+        shown = result.get("output") if isinstance(result, dict) else result
+        console.print(
+            f"[cyan]{name}[/cyan] {time.perf_counter() - started:.2f}s -> {shown}",
+            soft_wrap=True,
+        )
+        return result
+
+    return run
+
+
+def build_dag(
+    container: AppContainer,
+    video_path: Path,
+    opts: PipelineOptions,
+    tracker: Optional[JobTracker] = None,
+    label: str = "",
+) -> Dag:
+    """Stages of one video as a DAG; each node's output is a cache key or path.
+
+    Translation only needs the transcript, so it overlaps the original's
+    segmentation; the map waits for both transcripts' segments. With a
+    tracker, every stage and its parameters are recorded in the job manifest.
+    Stage resources are "stt", "llm", "tts" and "ffmpeg"; `label` prefixes
+    the progress lines (e.g. the video name in a batch).
+    """
+    # The atempo stage shares the render's CPU budget like any other ffmpeg call.
+    budget = (
+        CpuBudget(video_cli.CPU_BUDGET_PATH, opts.render.cpu_budget_cores)
+        if opts.render.cpu_budget
+        else None
+    )
+    runner = FFmpegRunner(budget=budget)
+    translated = opts.translated_audio(video_path)
+    render_opts = replace(opts.render, audio=translated, tempo=opts.tempo)
+    dag = Dag(opts.limits)
+
+    def add(
+        name: str,
+        task: NodeTask,
+        *deps: str,
+        resource: Optional[str] = None,
+        **params: Any,
+    ) -> None:
+        if tracker is not None:
+            tracker.declare(name, deps, resource, params)
+            task = tracker.track(name, task)
+        dag.add(name, _logged(f"{label}{name}", task), deps, resource)
+
+    add(
+        "transcribe",
+        lambda _: transcribe_file(container, video_path, opts.stt_model),
+        resource="stt",
+        model=opts.stt_model,
+    )
+    add(
+        "segment",
+        lambda i: segment_key(
+            container,
+            i["transcribe"],
+            "punctuation",
+            punctuation=opts.source_punctuation,
+        ),
+        "transcribe",
+        technique="punctuation",
+        punctuation=opts.source_punctuation,
+    )
+    add(
+        "translate",
+        lambda i: translate_key(
+            container, i["transcribe"], opts.target_language, opts.source_language
+        ),
+        "transcribe",
+        resource="llm",
+        source=opts.source_language,
+        target=opts.target_language,
+    )
+    add(
+        "tts",
+        lambda i: synthesize_key_to_file(
+            container, i["translate"], opts.voice, translated, opts.tts_model
+        ),
+        "translate",
+        resource="tts",
+        voice=opts.voice,
+        model=opts.tts_model,
+    )
+    dubbed = "tts"
+    if opts.tempo != 1.0:
+        dubbed = "atempo"
+        add(
+            "atempo",
+            lambda i: video_cli.speed_up_audio(
+                runner, i["tts"], opts.speeded_up_audio(video_path), opts.tempo
+            ),
+            "tts",
+            resource="ffmpeg",
+            tempo=opts.tempo,
+        )
+    add(
+        "transcribe dubbed",
+        lambda i: transcribe_file(container, i[dubbed], opts.stt_model),
+        dubbed,
+        resource="stt",
+        model=opts.stt_model,
+    )
+    add(
+        "segment dubbed",
+        lambda i: segment_key(
+            container,
+            i["transcribe dubbed"],
+            "words_count",
+            max_words_per_segment=opts.max_words_per_segment,
+        ),
+        "transcribe dubbed",
+        technique="words_count",
+        max_words_per_segment=opts.max_words_per_segment,
+    )
+    add(
+        "map",
+        lambda i: map_transcripts(
+            container,
+            rut_key=i["segment dubbed"],
+            goc_key=i["segment"],
+            model=opts.map_model,
+        ),
+        "segment",
+        "segment dubbed",
+        resource="llm",
+        model=opts.map_model,
+    )
+    add(
+        "video",
+        lambda i: video_cli.render(container, i["map"], video_path, render_opts),
+        "map",
+        "tts",
+        resource="ffmpeg",
+        method=render_opts.method,
+        render_mode=render_opts.render_mode,
+        output=render_opts.output,
+    )
+    return dag
+
+
+def _output_exists(container: AppContainer, output: Any) -> bool:
+    """Whether a stage output recorded in a manifest is still usable."""
+    if isinstance(output, Path):
+        return output.exists()
+    if isinstance(output, dict):
+        return bool(output.get("output")) and Path(output["output"]).exists()
+    if isinstance(output, str):
+        return container.cache.get(output) is not None
+    return False
+
+
+def _failed(tracker: JobTracker, exc: DagError) -> None:
+    tracker.finish("failed")
+    _print_summary(exc.run.report())
+    console.print(
+        f"[red]Stage {exc.node!r} failed.[/red] Resume with "
+        f"`pipeline resume {tracker.manifest.id}`"
+    )
+
+
+def _complete(
+    container: AppContainer,
+    video_path: Path,
+    opts: PipelineOptions,
+    tracker: JobTracker,
+    run: DagRun,
+) -> PipelineResult:
+    map_key = run.output("map")
+    render_opts = replace(opts.render, audio=opts.translated_audio(video_path))
+    result = PipelineResult(
+        video_key=render_opts.cache_key(container.cache, map_key, video_path),
+        keys={
+            "transcript": run.output("transcribe"),
+            "segments": run.output("segment"),
+            "translation": run.output("translate"),
+            "dubbed_transcript": run.output("transcribe dubbed"),
+            "dubbed_segments": run.output("segment dubbed"),
+            "map": map_key,
+        },
+        entry=run.output("video"),
+        report=run.report(),
+        job_id=tracker.manifest.id,
+    )
+    tracker.finish("done", result.video_key)
+    return result
+
+
+def _execute(
+    container: AppContainer,
+    video_path: Path,
+    opts: PipelineOptions,
+    tracker: JobTracker,
+    reuse: Optional[dict[str, Any]] = None,
+) -> PipelineResult:
+    dag = build_dag(container, video_path, opts, tracker)
+    tracker.save()
+    try:
+        run = dag.run(done=reuse)
+    except DagError as exc:
+        _failed(tracker, exc)
+        raise exc.__cause__ or exc
+    except BaseException:
+        tracker.finish("failed")
+        raise
+    return _complete(container, video_path, opts, tracker, run)
+
+
+def run_pipeline(
+    container: AppContainer,
+    video_path: Path,
+    opts: PipelineOptions = PipelineOptions(),
+    job_id: Optional[str] = None,
+) -> PipelineResult:
+    """Dub and caption one video in-process, with independent stages overlapped.
+
+    Every stage goes through the same use cases and cache keys as its CLI
+    command, so the keys and files match a run of the workflow. Progress is
+    checkpointed to a job manifest (see `resume_pipeline`), under `job_id`
+    when given. A failing stage's own exception is re-raised after the
+    summary is printed.
+    """
+    if not video_path.exists():
+        raise typer.BadParameter(f"File not found: {video_path}")
+
+    tracker = JobTracker.create(
+        container.cache, str(video_path), opts.to_dict(), job_id
+    )
+    console.print(f"[cyan]job[/cyan] {tracker.manifest.id}")
+    return _execute(container, video_path, opts, tracker)
+
+
+def resume_pipeline(container: AppContainer, job_id: str) -> PipelineResult:
+    """Re-run a job's failed and unfinished stages, and everything downstream.
+
+    Finished stages are skipped as long as their outputs (cache entries,
+    audio files, the rendered video) still exist.
+    """
+    tracker = JobTracker.resume(container.cache, job_id)
+    if tracker is None:
+        raise typer.BadParameter(f"No pipeline job {job_id!r}")
+    manifest = tracker.manifest
+    video_path = Path(manifest.video_path)
+    if not video_path.exists():
+        raise typer.BadParameter(f"File not found: {video_path}")
+
+    reuse = tracker.reusable(lambda output: _output_exists(container, output))
+    rerun = [name for name in manifest.stages if name not in reuse]
+    console.print(
+        f"[cyan]job[/cyan] {job_id}: reusing {len(reuse)} stages, "
+        f"running {', '.join(rerun) or 'nothing'}",
+        soft_wrap=True,
+    )
+    opts = PipelineOptions.from_dict(manifest.options)
+    return _execute(container, video_path, opts, tracker, reuse)
+
+
+# Batch-wide caps: provider calls mostly wait on the network, ffmpeg on CPU.
+BATCH_LIMITS = {"stt": 4, "llm": 4, "tts": 4, "ffmpeg": 2}
+
+
+@dataclass
+class BatchResult:
+    results: dict[str, PipelineResult]
+    failures: dict[str, str]
+    report: dict[str, Any]
+
+
+async def run_batch(
+    container: AppContainer,
+    videos: list[Path],
+    opts: PipelineOptions = PipelineOptions(),
+    limits: dict[str, int] = BATCH_LIMITS,
+    max_videos: Optional[int] = None,
+) -> BatchResult:
+    """Drive many videos through the pipeline at once on one event loop.
+
+    Stages from all videos share the `limits` caps (see AsyncDagRunner), so
+    one video's TTS overlaps another's transcription and a third's render.
+    Blocking work (SDK calls, cache writes, ffmpeg) never runs on the loop.
+    A failed video keeps its manifest for `pipeline resume`; the rest go on.
+    """
+    import asyncio
+
+    runner = AsyncDagRunner(limits)
+    gate = asyncio.Semaphore(max_videos or len(videos) or 1)
+    results: dict[str, PipelineResult] = {}
+    failures: dict[str, str] = {}
+    started = time.perf_counter()
+
+    async def one(video_path: Path) -> None:
+        async with gate:
+            tracker = JobTracker.create(
+                container.cache, str(video_path), opts.to_dict()
+            )
+            console.print(f"[cyan]job[/cyan] {tracker.manifest.id} {video_path.name}")
+            dag = build_dag(
+                container, video_path, opts, tracker, label=f"{video_path.stem}: "
+            )
+            await asyncio.to_thread(tracker.save)
+            try:
+                run = await runner.run(dag)
+            except DagError as exc:
+                await asyncio.to_thread(tracker.finish, "failed")
+                failures[str(video_path)] = f"{exc.node}: {exc.__cause__!r}"
+                console.print(
+                    f"[red]{video_path.name}: stage {exc.node!r} failed[/red] "
+                    f"({exc.__cause__!r}); resume with "
+                    f"`pipeline resume {tracker.manifest.id}`",
+                    soft_wrap=True,
+                )
+                return
+            results[str(video_path)] = await asyncio.to_thread(
+                _complete, container, video_path, opts, tracker, run
+            )
+
+    try:
+        await asyncio.gather(*(one(video) for video in videos))
+    finally:
+        runner.close()
+    wall_s = time.perf_counter() - started
+
+    stages: dict[str, dict[str, Any]] = {}
+    for result in results.values():
+        for node in result.report["nodes"]:
+            if node["reused"]:
+                continue
+            stage = stages.setdefault(
+                node["name"],
+                {"resource": node["resource"], "runs": 0, "busy_s": 0.0},
+            )
+            stage.setdefault("queued_s", 0.0)
+            stage["runs"] += 1
+            stage["busy_s"] += node["wall_s"]
+            stage["queued_s"] += node["queued_s"]
+    report = {
+        "videos": len(videos),
+        "done": len(results),
+        "failed": len(failures),
+        "wall_s": round(wall_s, 3),
+        "videos_per_hour": round(len(results) * 3600 / wall_s, 1) if wall_s else 0.0,
+        "resources": runner.report(wall_s),
+        "stages": stages,
+    }
+    return BatchResult(results, failures, report)
+
+
+# Billed API behind each provider stage, and the unit it bills in.
+PROVIDERS = {
+    "transcribe": "elevenlabs stt",
+    "transcribe dubbed": "elevenlabs stt",
+    "translate": "openai",
+    "map": "openai",
+    "tts": "elevenlabs tts",
+}
+
+
+@dataclass
+class StagePlan:
+    name: str
+    resource: Optional[str]
+    # "hit": served from the cache; "miss": not cached, so it runs;
+    # "run": this stage has no cache and always runs.
+    status: str
+    provider: Optional[str] = None
+    audio_s: Optional[float] = None
+    prompt_tokens: Optional[int] = None
+    characters: Optional[int] = None
+    estimate_s: Optional[float] = None
+    # Amounts projected from earlier runs rather than from text in the cache.
+    projected: bool = False
+
+    @property
+    def calls(self) -> int:
+        return int(self.provider is not None and self.status != "hit")
+
+
+@dataclass
+class VideoPlan:
+    video: str
+    duration_s: float
+    stages: list[StagePlan]
+    wall_s: float
+    critical_path: list[str]
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            **asdict(self),
+            "stages": [{**asdict(s), "calls": s.calls} for s in self.stages],
+        }
+
+
+def plan_history(container: AppContainer) -> RateHistory:
+    """Per-second rates from earlier pipeline jobs and renders.
+
+    For each video the slowest run of a stage is kept: re-runs mostly hit
+    the cache, so the slowest is the one that did the work. Render speed
+    comes from every cached `video render` entry (wall time per output
+    second), pipeline or not.
+    """
+    cache = container.cache
+    history = RateHistory()
+    latest: dict[str, JobManifest] = {}
+    slowest: dict[tuple[str, str], float] = {}
+    for manifest in list_manifests(cache):  # newest first
+        latest.setdefault(manifest.video_path, manifest)
+        for stage in manifest.stages.values():
+            if stage.status == "done" and stage.wall_s is not None:
+                key = (stage.name, manifest.video_path)
+                slowest[key] = max(slowest.get(key, 0.0), stage.wall_s)
+
+    durations: dict[str, float] = {}
+    for video_path, manifest in latest.items():
+        try:
+            duration = container.probe.probe(Path(video_path)).duration
+        except Exception:
+            continue  # moved, deleted or unreadable: no duration to scale by
+        durations[video_path] = duration
+        outputs = {name: stage.output for name, stage in manifest.stages.items()}
+        transcript = cache.get(outputs.get("transcribe") or "")
+        if isinstance(transcript, STTResponse):
+            history.add("transcript tokens", estimate_tokens(transcript.text), duration)
+        translation = cache.get(outputs.get("translate") or "")
+        if isinstance(translation, str):
+            history.add("translation tokens", estimate_tokens(translation), duration)
+            history.add("translation chars", len(translation), duration)
+        dubbed = outputs.get("atempo") or outputs.get("tts")
+        if isinstance(dubbed, Path) and dubbed.exists():
+            dubbed_s = container.probe.probe(dubbed).duration
+            history.add("dubbed audio", dubbed_s, duration)
+
+    for (name, video_path), wall_s in slowest.items():
+        if video_path in durations:
+            history.add(name, wall_s, durations[video_path])
+    for key in cache.keys("video:"):
+        entry = cache.get(key)
+        if isinstance(entry, dict) and entry.get("output_s"):
+            history.add("render", entry["wall_s"], entry["output_s"])
+    return history
+
+
+def plan_pipeline(
+    container: AppContainer,
+    video_path: Path,
+    opts: PipelineOptions,
+    history: RateHistory,
+) -> VideoPlan:
+    """Predict a `pipeline run` without calling any provider.
+
+    Walks the stages' cache keys as far as cached outputs allow. TTS has no
+    cache and its audio is new on every run, so the dubbed transcript, its
+    segments and the map are always predicted as misses. Token counts are
+    exact prompts where the text is cached, else projected from history.
+    """
+    from src.infras.translate.openai_translate import SYSTEM_PROMPT, OpenAITranslator
+
+    cache = container.cache
+    duration = container.probe.probe(video_path).duration
+    source, target = opts.source_language, opts.target_language
+    stages: dict[str, dict[str, Any]] = {}
+
+    def projected_tokens(name: str) -> int:
+        return round(history.project(name, duration) or 0)
+
+    transcript = cache.get(stt_cache_key(opts.stt_model, video_path.read_bytes()))
+    if not isinstance(transcript, STTResponse):
+        transcript = None
+    stages["transcribe"] = {
+        "status": "hit" if transcript else "miss",
+        "audio_s": duration,
+    }
+
+    segments = cache.get(segment_cache_key(transcript.words)) if transcript else None
+    stages["segment"] = {"status": "hit" if segments is not None else "miss"}
+
+    translation = None
+    if transcript is not None:
+        translation = cache.get(translation_cache_key(transcript.text, target, source))
+        prompt = OpenAITranslator.build_prompt(transcript.text, target, source)
+        tokens = estimate_tokens(SYSTEM_PROMPT + prompt)
+    else:
+        prompt = OpenAITranslator.build_prompt("", target, source)
+        tokens = estimate_tokens(SYSTEM_PROMPT + prompt)
+        tokens += projected_tokens("transcript tokens")
+    if not isinstance(translation, str):
+        translation = None
+    stages["translate"] = {
+        "status": "hit" if translation is not None else "miss",
+        "prompt_tokens": tokens,
+        "projected": transcript is None,
+    }
+
+    stages["tts"] = {
+        "status": "run",
+        "characters": (
+            len(translation)
+            if translation is not None
+            else round(history.project("translation chars", duration) or 0) or None
+        ),
+        "projected": translation is None,
+    }
+    stages["atempo"] = {"status": "run"}
+    stages["transcribe dubbed"] = {
+        "status": "miss",
+        "audio_s": history.project("dubbed audio", duration)
+        or duration / opts.tempo,
+        "projected": True,
+    }
+    stages["segment dubbed"] = {"status": "miss"}
+
+    # The dubbed transcript is read from the translation, so the translation
+    # stands in for it; the original side is the cached segmentation.
+    goc = segments if segments is not None else transcript.text if transcript else ""
+    prompt = fill_map_prompt(DEFAULT_PROMPT_TEMPLATE_2, translation or "", goc)
+    tokens = estimate_tokens(MAP_SYSTEM_PROMPT + prompt)
+    if translation is None:
+        tokens += projected_tokens("translation tokens")
+    if transcript is None:
+        tokens += projected_tokens("transcript tokens")
+    stages["map"] = {
+        "status": "miss",
+        "prompt_tokens": tokens,
+        "projected": translation is None,
+    }
+    stages["video"] = {"status": "run"}
+
+    nodes = build_dag(container, video_path, opts).nodes
+    plans = []
+    for node in nodes:
+        stage = stages[node.name]
+        if stage["status"] == "hit":
+            estimate_s: Optional[float] = 0.0
+        elif node.name == "video":
+            estimate_s = history.project("render", duration) or history.project(
+                "video", duration
+            )
+        else:
+            estimate_s = history.project(node.name, duration)
+        plans.append(
+            StagePlan(
+                node.name,
+                node.resource,
+                provider=PROVIDERS.get(node.name),
+                estimate_s=estimate_s,
+                **stage,
+            )
+        )
+    wall_s, path = critical_path(nodes, {p.name: p.estimate_s or 0.0 for p in plans})
+    return VideoPlan(str(video_path), duration, plans, wall_s, path)
+
+
+def plan_totals(plans: list[VideoPlan], limits: dict[str, int]) -> dict[str, Any]:
+    """Provider usage summed over videos, and the projected wall time.
+
+    Running videos concurrently, the batch takes at least its longest
+    critical path and at least each resource's total work over its limit.
+    """
+    providers: dict[str, dict[str, float]] = {}
+    busy: dict[str, float] = {}
+    unknown: set[str] = set()
+    for plan in plans:
+        for stage in plan.stages:
+            if stage.provider and stage.calls:
+                usage = providers.setdefault(
+                    stage.provider,
+                    {"calls": 0, "audio_s": 0.0, "prompt_tokens": 0, "characters": 0},
+                )
+                usage["calls"] += stage.calls
+                usage["audio_s"] += stage.audio_s or 0.0
+                usage["prompt_tokens"] += stage.prompt_tokens or 0
+                usage["characters"] += stage.characters or 0
+            if stage.estimate_s is None:
+                unknown.add(stage.name)
+            elif stage.resource:
+                busy[stage.resource] = busy.get(stage.resource, 0.0) + stage.estimate_s
+    bounds = {
+        resource: busy_s / limits[resource]
+        for resource, busy_s in busy.items()
+        if limits.get(resource)
+    }
+    return {
+        "videos": len(plans),
+        "providers": providers,
+        "busy_s": busy,
+        "wall_s": max([p.wall_s for p in plans] + list(bounds.values()), default=0.0),
+        "bottleneck": max(bounds, key=lambda r: bounds[r]) if bounds else None,
+        "no_history": sorted(unknown),
+    }
+
+
+def _print_plan(plan: VideoPlan) -> None:
+    table = Table(title=f"{Path(plan.video).name} ({plan.duration_s:.1f}s)")
+    table.add_column("Stage")
+    table.add_column("Cache")
+    table.add_column("Provider")
+    table.add_column("Usage", justify="right")
+    table.add_column("Est. (s)", justify="right")
+    table.add_column("Critical", justify="center")
+    colours = {"hit": "green", "miss": "yellow", "run": "cyan"}
+
+    def usage(stage: StagePlan) -> str:
+        if not stage.calls:
+            return ""
+        if stage.audio_s is not None:
+            text = f"{stage.audio_s:.1f}s audio"
+        elif stage.prompt_tokens is not None:
+            text = f"{stage.prompt_tokens:,} tokens"
+        elif stage.characters is not None:
+            text = f"{stage.characters:,} chars"
+        else:
+            return "?"
+        return ("~" if stage.projected else "") + text
+
+    for stage in plan.stages:
+        colour = colours[stage.status]
+        table.add_row(
+            stage.name,
+            f"[{colour}]{stage.status}[/{colour}]",
+            stage.provider or "",
+            usage(stage),
+            "?" if stage.estimate_s is None else f"{stage.estimate_s:.2f}",
+            "*" if stage.name in plan.critical_path else "",
+        )
+    console.print(table)
+    console.print(
+        f"[cyan]Critical path:[/cyan] ~{plan.wall_s:.1f}s "
+        f"{' -> '.join(plan.critical_path)}",
+        soft_wrap=True,
+    )
+
+
+def _print_plan_totals(plans: list[VideoPlan], totals: dict[str, Any]) -> None:
+    if len(plans) > 1:
+        table = Table(title="Videos")
+        table.add_column("Video", overflow="fold")
+        table.add_column("Duration (s)", justify="right")
+        table.add_column("Cache hits", justify="right")
+        table.add_column("API calls", justify="right")
+        table.add_column("Critical path (s)", justify="right")
+        for plan in plans:
+            table.add_row(
+                plan.video,
+                f"{plan.duration_s:.1f}",
+                f"{sum(s.status == 'hit' for s in plan.stages)}/{len(plan.stages)}",
+                str(sum(s.calls for s in plan.stages)),
+                f"{plan.wall_s:.1f}",
+            )
+        console.print(table)
+
+    table = Table(title="Forecast")
+    table.add_column("Provider")
+    table.add_column("Calls", justify="right")
+    table.add_column("Audio (s)", justify="right")
+    table.add_column("Prompt tokens", justify="right")
+    table.add_column("Characters", justify="right")
+    for provider, usage in sorted(totals["providers"].items()):
+        table.add_row(
+            provider,
+            str(usage["calls"]),
+            f"{usage['audio_s']:.1f}" if usage["audio_s"] else "",
+            f"{usage['prompt_tokens']:,}" if usage["prompt_tokens"] else "",
+            f"{usage['characters']:,}" if usage["characters"] else "",
+        )
+    console.print(table)
+    bottleneck = totals["bottleneck"]
+    console.print(
+        f"[cyan]Projected wall time:[/cyan] ~{totals['wall_s']:.1f}s for "
+        f"{totals['videos']} video{'s' if totals['videos'] != 1 else ''}"
+        + (f" ({bottleneck}-bound)" if bottleneck and len(plans) > 1 else "")
+    )
+    if totals["no_history"]:
+        console.print(
+            f"[yellow]No earlier runs to time:[/yellow] "
+            f"{', '.join(totals['no_history'])} (counted as 0s)"
+        )
+
+
+def _print_batch_summary(report: dict[str, Any]) -> None:
+    table = Table(title="Batch resources")
+    table.add_column("Resource")
+    table.add_column("Limit", justify="right")
+    table.add_column("Runs", justify="right")
+    table.add_column("Busy (s)", justify="right")
+    table.add_column("Queued (s)", justify="right")
+    table.add_column("Utilisation", justify="right")
+    for name, usage in report["resources"].items():
+        utilisation = usage["utilisation"]
+        table.add_row(
+            name,
+            str(usage["limit"] or "-"),
+            str(usage["runs"]),
+            f"{usage['busy_s']:.2f}",
+            f"{usage['queued_s']:.2f}",
+            f"{utilisation:.0%}" if utilisation is not None else "-",
+        )
+    console.print(table)
+
+    table = Table(title="Batch stages")
+    table.add_column("Stage")
+    table.add_column("Resource")
+    table.add_column("Runs", justify="right")
+    table.add_column("Mean wall (s)", justify="right")
+    table.add_column("Queued (s)", justify="right")
+    for name, stage in report["stages"].items():
+        table.add_row(
+            name,
+            stage["resource"] or "-",
+            str(stage["runs"]),
+            f"{stage['busy_s'] / stage['runs']:.2f}",
+            f"{stage['queued_s']:.2f}",
+        )
+    console.print(table)
+    console.print(
+        f"[cyan]Batch:[/cyan] {report['done']}/{report['videos']} videos in "
+        f"{report['wall_s']:.2f}s ({report['videos_per_hour']:.1f} videos/hour)"
+        + (f", [red]{report['failed']} failed[/red]" if report["failed"] else "")
+    )
+
+
+def _print_summary(report: dict[str, Any]) -> None:
+    table = Table(title="Pipeline stages")
+    table.add_column("Stage")
+    table.add_column("Start (s)", justify="right")
+    table.add_column("Wall (s)", justify="right")
+    table.add_column("Queued (s)", justify="right")
+    table.add_column("Critical", justify="center")
+    for node in report["nodes"]:
+        name = node["name"] if not node["error"] else f"[red]{node['name']}[/red]"
+        if node["reused"]:
+            table.add_row(f"[dim]{name} (reused)[/dim]", "", "", "", "")
+            continue
+        table.add_row(
+            name,
+            f"{node['start_s']:.2f}",
+            f"{node['wall_s']:.2f}",
+            f"{node['queued_s']:.2f}",
+            "*" if node["critical"] else "",
+        )
+    console.print(table)
+    console.print(
+        f"[cyan]Total:[/cyan] wall {report['wall_s']:.2f}s, "
+        f"stage time {report['busy_s']:.2f}s (x{report['parallelism']:.2f} overlap)"
+    )
+    console.print(
+        f"[cyan]Critical path:[/cyan] {' -> '.join(report['critical_path'])}",
+        soft_wrap=True,
+    )
+
+
+@app.command(name="run")
+def run(
+    video_path: Path = typer.Argument(..., help="Source video to dub and caption"),
+    source_language: str = typer.Option("zh", "--from", "-f"),
+    target_language: str = typer.Option("vi", "--to", "-t"),
+    voice: str = typer.Option(
+        PipelineOptions.voice, "--voice", help="ElevenLabs voice id"
+    ),
+    tts_model: Optional[str] = typer.Option(
+        PipelineOptions.tts_model, "--tts-model", help="ElevenLabs TTS model id"
+    ),
+    map_model: str = typer.Option(
+        PipelineOptions.map_model, "--map-model", help="OpenAI model for mapping"
+    ),
+    tempo: float = typer.Option(
+        PipelineOptions.tempo,
+        "--tempo",
+        min=0.1,
+        max=10.0,
+        help="Speed-up applied to the dubbed audio",
+    ),
+    output: Optional[Path] = typer.Option(None, "--output", "-o"),
+    render_mode: Literal["single", "parts", "stream"] = typer.Option(
+        "parts", "--render-mode", help="See `video render --help`"
+    ),
+    jobs: int = typer.Option(1, "--jobs", "-j", min=1),
+    report: Optional[Path] = typer.Option(
+        None, "--report", help="Write stage timings and cache keys as JSON"
+    ),
+    ctx: typer.Context = typer.Option(None, hidden=True),
+):
+    """Run transcribe → translate → tts → map → video in one process.
+
+    Prints the video cache key, like `video render`.
+    """
+    if not isinstance(ctx.obj, AppContainer):
+        raise typer.BadParameter("App container not initialized")
+
+    opts = PipelineOptions(
+        source_language=source_language,
+        target_language=target_language,
+        voice=voice,
+        tts_model=tts_model,
+        map_model=map_model,
+        tempo=tempo,
+        render=replace(
+            WORKFLOW_RENDER, output=output, render_mode=render_mode, jobs=jobs
+        ),
+    )
+    _finish(run_pipeline(ctx.obj, video_path, opts), report)
+
+
+def _finish(result: PipelineResult, report: Optional[Path]) -> None:
+    _print_summary(result.report)
+    if report:
+        report.parent.mkdir(parents=True, exist_ok=True)
+        report.write_text(
+            json.dumps(result.to_dict(), indent=2, ensure_ascii=False, default=str),
+            encoding="utf-8",
+        )
+    print(result.video_key)
+
+
+@app.command(name="resume")
+def resume(
+    job_id: str = typer.Argument(..., help="Job id printed by `pipeline run`"),
+    report: Optional[Path] = typer.Option(
+        None, "--report", help="Write stage timings and cache keys as JSON"
+    ),
+    ctx: typer.Context = typer.Option(None, hidden=True),
+):
+    """Continue a failed or interrupted `pipeline run` from its manifest.
+
+    Prints the video cache key, like `pipeline run`.
+    """
+    if not isinstance(ctx.obj, AppContainer):
+        raise typer.BadParameter("App container not initialized")
+
+    _finish(resume_pipeline(ctx.obj, job_id), report)
+
+
+@app.command(name="jobs")
+def jobs(
+    limit: int = typer.Option(20, "--limit", "-n", min=1),
+    ctx: typer.Context = typer.Option(None, hidden=True),
+):
+    """List recent pipeline jobs and where they stopped."""
+    if not isinstance(ctx.obj, AppContainer):
+        raise typer.BadParameter("App container not initialized")
+
+    table = Table(title="Pipeline jobs")
+    table.add_column("Job")
+    table.add_column("Status")
+    table.add_column("Video", overflow="fold")
+    table.add_column("Updated")
+    table.add_column("Runs", justify="right")
+    table.add_column("Failed stage")
+    for manifest in list_manifests(ctx.obj.cache)[:limit]:
+        status = {"done": "green", "failed": "red"}.get(manifest.status, "yellow")
+        table.add_row(
+            manifest.id,
+            f"[{status}]{manifest.status}[/{status}]",
+            manifest.video_path,
+            time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(manifest.updated_at)),
+            str(manifest.runs),
+            manifest.failed_stage() or "",
+        )
+    console.print(table)
+
+
+@app.command(name="batch")
+def batch(
+    videos: list[Path] = typer.Argument(..., help="Source videos to dub and caption"),
+    source_language: str = typer.Option("zh", "--from", "-f"),
+    target_language: str = typer.Option("vi", "--to", "-t"),
+    voice: str = typer.Option(
+        PipelineOptions.voice, "--voice", help="ElevenLabs voice id"
+    ),
+    tempo: float = typer.Option(PipelineOptions.tempo, "--tempo", min=0.1, max=10.0),
+    stt: int = typer.Option(BATCH_LIMITS["stt"], "--stt", min=1, help="STT calls"),
+    llm: int = typer.Option(BATCH_LIMITS["llm"], "--llm", min=1, help="LLM calls"),
+    tts: int = typer.Option(BATCH_LIMITS["tts"], "--tts", min=1, help="TTS calls"),
+    ffmpeg: int = typer.Option(
+        BATCH_LIMITS["ffmpeg"], "--ffmpeg", min=1, help="ffmpeg stages"
+    ),
+    max_videos: Optional[int] = typer.Option(
+        None, "--max-videos", min=1, help="Videos in flight at once (default: all)"
+    ),
+    report: Optional[Path] = typer.Option(
+        None, "--report", help="Write throughput, utilisation and keys as JSON"
+    ),
+    ctx: typer.Context = typer.Option(None, hidden=True),
+):
+    """Run the pipeline on many videos concurrently with per-resource caps.
+
+    Prints each video's cache key in argument order; exits 1 if any failed.
+    """
+    if not isinstance(ctx.obj, AppContainer):
+        raise typer.BadParameter("App container not initialized")
+    missing = [str(video) for video in videos if not video.exists()]
+    if missing:
+        raise typer.BadParameter(f"File not found: {', '.join(missing)}")
+
+    opts = PipelineOptions(
+        source_language=source_language,
+        target_language=target_language,
+        voice=voice,
+        tempo=tempo,
+    )
+    limits = {"stt": stt, "llm": llm, "tts": tts, "ffmpeg": ffmpeg}
+    import asyncio
+
+    outcome = asyncio.run(run_batch(ctx.obj, videos, opts, limits, max_videos))
+    _print_batch_summary(outcome.report)
+    if report:
+        report.parent.mkdir(parents=True, exist_ok=True)
+        payload = {
+            **outcome.report,
+            "results": {k: r.to_dict() for k, r in outcome.results.items()},
+            "failures": outcome.failures,
+        }
+        report.write_text(
+            json.dumps(payload, indent=2, ensure_ascii=False, default=str),
+            encoding="utf-8",
+        )
+    for video in videos:
+        result = outcome.results.get(str(video))
+        if result is not None:
+            print(result.video_key)
+    if outcome.failures:
+        raise typer.Exit(1)
+
+
+@app.command(name="plan")
+def plan(
+    videos: list[Path] = typer.Argument(..., help="Source videos to forecast"),
+    source_language: str = typer.Option("zh", "--from", "-f"),
+    target_language: str = typer.Option("vi", "--to", "-t"),
+    tempo: float = typer.Option(PipelineOptions.tempo, "--tempo", min=0.1, max=10.0),
+    stages: bool = typer.Option(
+        False, "--stages", "-s", help="Show the stage table for every video"
+    ),
+    report: Optional[Path] = typer.Option(
+        None, "--report", help="Write the per-stage forecast as JSON"
+    ),
+    ctx: typer.Context = typer.Option(None, hidden=True),
+):
+    """Forecast `pipeline run`/`batch`: cache misses, API usage and wall time.
+
+    Calls no provider. Cache hits are checked stage by stage; prompt tokens
+    are estimated locally; stage and render times are projected from
+    earlier jobs and renders of other videos, per second of source video.
+    Amounts marked ~ are projections because the text isn't cached yet.
+    """
+    if not isinstance(ctx.obj, AppContainer):
+        raise typer.BadParameter("App container not initialized")
+    missing = [str(video) for video in videos if not video.exists()]
+    if missing:
+        raise typer.BadParameter(f"File not found: {', '.join(missing)}")
+
+    opts = PipelineOptions(
+        source_language=source_language,
+        target_language=target_language,
+        tempo=tempo,
+    )
+    history = plan_history(ctx.obj)
+    plans = [plan_pipeline(ctx.obj, video, opts, history) for video in videos]
+    # One video runs with the per-run limits, several with `pipeline batch`'s.
+    limits = opts.limits if len(videos) == 1 else BATCH_LIMITS
+    totals = plan_totals(plans, limits)
+    if stages or len(plans) == 1:
+        for video_plan in plans:
+            _print_plan(video_plan)
+    _print_plan_totals(plans, totals)
+    if report:
+        report.parent.mkdir(parents=True, exist_ok=True)
+        payload = {**totals, "plans": [p.to_dict() for p in plans]}
+        report.write_text(
+            json.dumps(payload, indent=2, ensure_ascii=False, default=str),
+            encoding="utf-8",
+        )
@@ -3,6 +3,7 @@ import typer
 from typing import Literal
 from rich.console import Console
 
+from src.cli import batch
 from src.cli.container import AppContainer
 from src.domain.core.stt_base import STTResponse
 
@@ -37,10 +38,44 @@ Lưu ý: cho tôi json và không giải thích gì thêm.
 """
 
 
+SegmentTechnique = Literal["openai", "words_count", "punctuation"]
+
+
+def segment_key(
+    container: AppContainer,
+    key: str,
+    technique: SegmentTechnique = "openai",
+    model: str = "gpt-4o",
+    punctuation: str | None = None,
+    max_words_per_segment: int = 20,
+) -> str:
+    """Segment a cached transcript and return the key of the sentences."""
+    transcript = container.cache.get(key)
+
+    segment_tecnique = container.segment_service_factory.get_segment_service(
+        technique=technique,
+        prompt=SEGMENT_PROMPT if technique == "openai" else None,
+        model=model if technique == "openai" else None,
+        punctuation=punctuation,
+        max_words_per_segment=max_words_per_segment,
+    )
+
+    if not segment_tecnique:
+        raise ValueError("Segment Technique should not be null.")
+
+    if not isinstance(transcript, STTResponse):
+        raise typer.Exit(1)
+
+    _, segmented_key = segment_tecnique.segment(transcript.words)  # type: ignore
+    if segmented_key is None:
+        raise typer.Exit(1)
+    return segmented_key
+
+
 @app.command()
 def segment(
-    key: str = typer.Argument(..., help="Cached transcript key to segment"),
-    technique: Literal["openai", "words_count", "punctuation"] = typer.Option(
+    key: str | None = typer.Argument(None, help="Cached transcript key to segment"),
+    technique: SegmentTechnique = typer.Option(
         "openai",
         help="Segment technique to use",
     ),
@@ -63,45 +98,39 @@ def segment(
         help="Max words per segment for words_count technique",
     ),
     # is_caption: bool = typer.Option(False, "--is-caption/--is-not-caption"),
+    batch_mode: bool = batch.batch_option(),
+    jobs: int = batch.jobs_option(),
+    ordered: bool = batch.ordered_option(),
     ctx: typer.Context = typer.Option(None, hidden=True),
 ):
     if not isinstance(ctx.obj, AppContainer):
         raise typer.BadParameter("App container not initialized")
 
-    transcript = ctx.obj.cache.get(key)
-
-    prompt = SEGMENT_PROMPT
-
-    segment_tecnique = ctx.obj.segment_service_factory.get_segment_service(
-        technique=technique,
-        prompt=prompt if technique == "openai" else None,
-        model=model if technique == "openai" else None,
-        punctuation=punctuation,
-        max_words_per_segment=max_words_per_segment,
+    container = ctx.obj
+    if batch_mode:
+        # Lines are {"key", "technique", "model", "punctuation",
+        # "max_words_per_segment"}; the options give the defaults.
+        def handle(request: dict) -> str:
+            values = batch.fields(
+                request,
+                ("key",),
+                technique=technique,
+                model=model,
+                punctuation=punctuation,
+                max_words_per_segment=max_words_per_segment,
+            )
+            return segment_key(container, **values)
+
+        batch.finish(batch.run_batch(handle, jobs, ordered))
+        return
+
+    print(
+        segment_key(
+            container,
+            batch.require(key, "KEY"),
+            technique,
+            model,
+            punctuation,
+            max_words_per_segment,
+        )
     )
-
-    if not segment_tecnique:
-        raise ValueError("Segment Technique should not be null.")
-
-    if transcript is None:
-        # if not quiet:
-        # print"[red]Not found[/red]")
-        raise typer.Exit(1)
-
-    if isinstance(transcript, STTResponse):
-        # if not quiet:
-        # print"[green]Segmenting transcript...[/green]")
-        (result, key) = segment_tecnique.segment(transcript.words)  # type: ignore
-        # print(result)
-        print(key)
-
-        # if not quiet:
-        # printresult)
-        # printf"[cyan]Cached segmented transcript key: [/cyan]{key}")
-
-    # else:
-    # if not quiet:
-    #     # print
-    #         f"[red]Unsupported transcript type: [/red] {type(transcript).__name__}"
-    #     )
-    # raise typer.Exit(code=1)
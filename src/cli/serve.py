@@ -0,0 +1,335 @@
+import contextvars
+import hmac
+import io
+import json
+import os
+import queue
+import secrets
+import sys
+import threading
+import time
+import traceback
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from typing import TYPE_CHECKING, Any, Iterator, Optional, TextIO
+
+import typer
+from rich.console import Console
+
+from src.cli.container import AppContainer
+from src.cli.daemon_client import (
+    DAEMON_ENV,
+    DEFAULT_ADDRESS,
+    SERVICE,
+    parse_address,
+    token_path,
+)
+
+if TYPE_CHECKING:
+    from http.server import BaseHTTPRequestHandler
+
+console = Console(stderr=True, legacy_windows=False)
+
+JOB_HISTORY = 500
+
+
+class _ContextStream:
+    """sys.stdout/sys.stderr stand-in that each job can redirect.
+
+    Commands print their cache key with print(), so per-job capture has to
+    happen at the sys level. The target lives in a ContextVar, so threads a
+    job starts with a copied context (e.g. pipeline stages) are captured
+    too, while other threads keep writing to the real stream.
+    """
+
+    def __init__(self, default: TextIO) -> None:
+        self._default = default
+        self._target_var: contextvars.ContextVar[Optional[TextIO]] = (
+            contextvars.ContextVar(f"stream_{id(self)}", default=None)
+        )
+
+    def _target(self) -> TextIO:
+        return self._target_var.get() or self._default
+
+    def write(self, text: str) -> int:
+        return self._target().write(text)
+
+    def flush(self) -> None:
+        self._target().flush()
+
+    def isatty(self) -> bool:
+        return self._target().isatty()
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._target(), name)
+
+    @contextmanager
+    def redirect(self, stream: TextIO) -> Iterator[None]:
+        token = self._target_var.set(stream)
+        try:
+            yield
+        finally:
+            self._target_var.reset(token)
+
+
+@dataclass
+class Job:
+    id: str
+    argv: list[str]
+    status: str = "queued"  # queued | running | done | failed
+    exit_code: Optional[int] = None
+    stdout: str = ""
+    stderr: str = ""
+    submitted_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+
+    def __post_init__(self) -> None:
+        self.finished = threading.Event()
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+class JobQueue:
+    """Runs CLI argv on worker threads against one shared container."""
+
+    def __init__(self, command: Any, container: AppContainer, workers: int = 2) -> None:
+        self._command = command
+        self._container = container
+        self._pending: queue.Queue[Optional[Job]] = queue.Queue()
+        self._jobs: dict[str, Job] = {}
+        self._finished: deque[str] = deque()
+        self._lock = threading.Lock()
+        self._running = 0
+        self._stdout = _ContextStream(sys.stdout)
+        self._stderr = _ContextStream(sys.stderr)
+        sys.stdout, sys.stderr = self._stdout, self._stderr  # type: ignore[assignment]
+        self._workers = [
+            threading.Thread(target=self._work, name=f"job-worker-{i}", daemon=True)
+            for i in range(max(1, workers))
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def submit(self, argv: list[str]) -> Job:
+        job = Job(id=uuid.uuid4().hex[:12], argv=argv)
+        with self._lock:
+            self._jobs[job.id] = job
+        self._pending.put(job)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list(self) -> list[Job]:
+        with self._lock:
+            return list(self._jobs.values())
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "workers": len(self._workers),
+                "queued": self._pending.qsize(),
+                "running": self._running,
+                "jobs": len(self._jobs),
+            }
+
+    def close(self) -> None:
+        for _ in self._workers:
+            self._pending.put(None)
+        sys.stdout, sys.stderr = self._stdout._default, self._stderr._default
+
+    def _work(self) -> None:
+        while (job := self._pending.get()) is not None:
+            with self._lock:
+                self._running += 1
+            try:
+                self._run(job)
+            finally:
+                with self._lock:
+                    self._running -= 1
+                    self._finished.append(job.id)
+                    while len(self._finished) > JOB_HISTORY:
+                        self._jobs.pop(self._finished.popleft(), None)
+                job.finished.set()
+
+    def _run(self, job: Job) -> None:
+        job.status = "running"
+        job.started_at = time.time()
+        console.print(f"[cyan]job {job.id}[/cyan] {' '.join(job.argv)}")
+        out, err = io.StringIO(), io.StringIO()
+        with self._stdout.redirect(out), self._stderr.redirect(err):
+            try:
+                # Standalone mode reports errors and exit codes exactly as a
+                # normal run would; they surface here as SystemExit.
+                self._command.main(
+                    args=job.argv,
+                    prog_name="python -m src.main",
+                    obj=self._container,
+                    standalone_mode=True,
+                )
+                exit_code = 0
+            except SystemExit as exc:
+                if exc.code is None or isinstance(exc.code, int):
+                    exit_code = exc.code or 0
+                else:
+                    err.write(f"{exc.code}\n")
+                    exit_code = 1
+            except BaseException:
+                traceback.print_exc(file=err)
+                exit_code = 1
+        job.stdout, job.stderr = out.getvalue(), err.getvalue()
+        job.exit_code = exit_code
+        job.status = "done" if exit_code == 0 else "failed"
+        job.finished_at = time.time()
+        console.print(
+            f"[cyan]job {job.id}[/cyan] {job.status} (exit {exit_code}) "
+            f"in {job.finished_at - job.started_at:.2f}s"
+        )
+
+
+def _write_token(path: str, token: str) -> None:
+    """Replace `path` with a file holding `token` that only this user can read."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.write(token)
+
+
+def _handler(
+    jobs: JobQueue, cwd: str, token: str
+) -> type["BaseHTTPRequestHandler"]:
+    from http.server import BaseHTTPRequestHandler
+
+    expected = f"Bearer {token}".encode("utf-8")
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, format: str, *args: Any) -> None:
+            pass
+
+        def _authorized(self) -> bool:
+            header = (self.headers.get("Authorization") or "").encode("utf-8")
+            if hmac.compare_digest(header, expected):
+                return True
+            self._send(401, {"error": "missing or wrong token"})
+            return False
+
+        def _send(self, status: int, body: Any) -> None:
+            data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self) -> None:
+            if not self._authorized():
+                return
+            path, _, query = self.path.partition("?")
+            if path == "/health":
+                health = {"service": SERVICE, "pid": os.getpid(), "cwd": cwd}
+                self._send(200, {**health, **jobs.stats()})
+            elif path == "/jobs":
+                summaries = []
+                for job in jobs.list():
+                    summary = job.to_dict()
+                    del summary["stdout"], summary["stderr"]
+                    summaries.append(summary)
+                self._send(200, summaries)
+            elif path.startswith("/jobs/"):
+                job = jobs.get(path.removeprefix("/jobs/"))
+                if job is None:
+                    self._send(404, {"error": "unknown job"})
+                    return
+                if "wait=1" in query.split("&"):
+                    job.finished.wait()
+                self._send(200, job.to_dict())
+            else:
+                self._send(404, {"error": "not found"})
+
+        def do_POST(self) -> None:
+            if not self._authorized():
+                return
+            if self.path != "/jobs":
+                self._send(404, {"error": "not found"})
+                return
+            try:
+                length = int(self.headers.get("Content-Length") or 0)
+                payload = json.loads(self.rfile.read(length) or b"{}")
+                argv = [str(arg) for arg in payload["argv"]]
+            except (KeyError, TypeError, ValueError) as exc:
+                self._send(400, {"error": f"bad request: {exc}"})
+                return
+            # Relative paths in argv resolve against the daemon's directory.
+            if os.path.realpath(payload.get("cwd") or cwd) != cwd:
+                self._send(409, {"error": f"daemon serves {cwd}"})
+                return
+
+            job = jobs.submit(argv)
+            if payload.get("wait"):
+                job.finished.wait()
+                self._send(200, job.to_dict())
+            else:
+                self._send(202, job.to_dict())
+
+    return Handler
+
+
+def serve(
+    workers: int = typer.Option(
+        2, "--workers", "-w", min=1, help="Commands run concurrently"
+    ),
+    ctx: typer.Context = typer.Option(None, hidden=True),
+):
+    """Keep the app warm and run forwarded commands over localhost HTTP.
+
+    Listens on $PMEDIA_DAEMON (default 127.0.0.1:8765) and writes an access
+    token to .cache/daemon-<port>.token, readable only by this user. With
+    PMEDIA_DAEMON=on (or the same host:port) set in your shell,
+    `python -m src.main <cmd> ...` from this directory is forwarded here and
+    prints the same output. Forwarded commands run with this process's
+    environment and API keys.
+    """
+    from http.server import ThreadingHTTPServer
+
+    if not isinstance(ctx.obj, AppContainer):
+        raise typer.BadParameter("App container not initialized")
+
+    address = parse_address(os.environ.get(DAEMON_ENV, DEFAULT_ADDRESS))
+    if address is None:
+        raise typer.BadParameter(
+            f"Set PMEDIA_DAEMON to host:port, e.g. {DEFAULT_ADDRESS}"
+        )
+
+    cwd = os.path.realpath(os.getcwd())
+    jobs = JobQueue(ctx.find_root().command, ctx.obj, workers)
+    token = secrets.token_urlsafe(32)
+    server = ThreadingHTTPServer(address, _handler(jobs, cwd, token))
+    server.daemon_threads = True
+    # Written once the port is ours, so a second `serve` that fails to bind
+    # doesn't lock clients out of the first.
+    token_file = token_path(address)
+    _write_token(token_file, token)
+    console.print(
+        f"[green]Serving on {address[0]}:{address[1]}[/green] "
+        f"({workers} workers, cwd {cwd})"
+    )
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        jobs.close()
+        try:
+            os.unlink(token_file)
+        except FileNotFoundError:
+            pass
@@ -3,15 +3,29 @@ from pathlib import Path
 
 from rich.console import Console
 
+from src.cli import batch
 from src.cli.container import AppContainer
 
 console = console = Console(force_terminal=True, legacy_windows=False)
 app = typer.Typer(help="Speech-to-text commands")
 
 
+def transcribe_file(
+    container: AppContainer, audio_path: Path, model_id: str = "scribe_v2"
+) -> str:
+    """Transcribe a media file through the cache and return its key."""
+    if not audio_path.exists():
+        raise typer.BadParameter(f"File not found: {audio_path}")
+
+    _, key = container.transcribe.execute(model_id, audio_path.read_bytes())
+    if key is None:
+        raise typer.BadParameter("Transcription cache is not configured")
+    return key
+
+
 @app.command()
 def transcribe(
-    audio_path: Path = typer.Argument(..., help="Path to the audio file"),
+    audio_path: Path | None = typer.Argument(None, help="Path to the audio file"),
     model_id: str = typer.Option(
         "scribe_v2",
         "--model",
@@ -19,26 +33,28 @@ def transcribe(
         help="ElevenLabs STT model id",
     ),
     quiet: bool = typer.Option(False, "--quiet", "-q", help="Suppress console output"),
+    batch_mode: bool = batch.batch_option(),
+    jobs: int = batch.jobs_option(),
+    ordered: bool = batch.ordered_option(),
     ctx: typer.Context = typer.Option(None, hidden=True),
 ):
-    """Transcribe audio, cache the result, and print the cache key."""
-    if not audio_path.exists():
-        raise typer.BadParameter(f"File not found: {audio_path}")
+    """Transcribe audio, cache the result, and print the cache key.
 
+    With --batch, each stdin line is {"audio_path": ..., "model": ...}.
+    """
     if not isinstance(ctx.obj, AppContainer):
         raise typer.BadParameter("App container not initialized")
 
-    audio_bytes = audio_path.read_bytes()
+    container = ctx.obj
+    if batch_mode:
 
-    response, key = ctx.obj.transcribe.execute(model_id, audio_bytes)
+        def handle(request: dict) -> str:
+            values = batch.fields(request, ("audio_path",), model=model_id)
+            return transcribe_file(
+                container, Path(values["audio_path"]), values["model"]
+            )
 
-    print(key)
+        batch.finish(batch.run_batch(handle, jobs, ordered))
+        return
 
-    if not quiet:
-        # print"[bold green]Transcription Complete")
-        # printf"[cyan]Cache key:[/cyan] {key}")
-        if response and getattr(response, "text", None):
-            preview = response.text.strip()
-            if len(preview) > 200:
-                preview = preview[:200] + "..."
-            # printf"[bold]Preview:[/bold] {preview}")
+    print(transcribe_file(container, batch.require(audio_path, "AUDIO_PATH"), model_id))
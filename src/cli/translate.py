@@ -1,6 +1,7 @@
 import typer
 from rich.console import Console
 
+from src.cli import batch
 from src.cli.container import AppContainer
 from src.domain.core.sentence import Sentence
 from src.domain.core.stt_base import STTResponse
@@ -24,52 +25,59 @@ def _extract_text(payload) -> str | None:
     return None
 
 
+def translate_key(
+    container: AppContainer, key: str, target: str, source: str | None = None
+) -> str:
+    """Translate the text of a cache entry and return the translation's key."""
+    cached_value = container.cache.get(key)
+    if cached_value is None:
+        raise typer.Exit(1)
+
+    text = _extract_text(cached_value)
+    if not text:
+        raise typer.Exit(code=1)
+
+    _, translated_key = container.translate.execute(text, target, source)
+    if translated_key is None:
+        raise typer.Exit(code=1)
+    return translated_key
+
+
 @app.command()
 def translate(
-    key: str = typer.Argument(..., help="Cache key containing text to translate"),
-    target: str = typer.Option(
-        ..., "--to", "-t", help="Target language (e.g., en, vi)"
+    key: str | None = typer.Argument(
+        None, help="Cache key containing text to translate"
+    ),
+    target: str | None = typer.Option(
+        None, "--to", "-t", help="Target language (e.g., en, vi)"
     ),
     source: str | None = typer.Option(
         None, "--from", "-f", help="Source language code (optional)"
     ),
     quiet: bool = typer.Option(False, "--quiet", "-q", help="Suppress console output"),
+    batch_mode: bool = batch.batch_option(),
+    jobs: int = batch.jobs_option(),
+    ordered: bool = batch.ordered_option(),
     ctx: typer.Context = typer.Option(None, hidden=True),
 ):
-    """Translate text using configured translator, cache result, and print key."""
+    """Translate text using configured translator, cache result, and print key.
+
+    With --batch, each stdin line is {"key": ..., "to": ..., "from": ...};
+    --to and --from give the defaults.
+    """
     if not isinstance(ctx.obj, AppContainer):
         raise typer.BadParameter("App container not initialized")
 
-    cached_value = ctx.obj.cache.get(key)
-
-    if cached_value is None:
-        # if not quiet:
-        # print"[red]Not found[/red]")
-        raise typer.Exit(1)
-
-    text = _extract_text(cached_value)
-    if not text:
-        # if not quiet:
-        # print()
-        #     f"[red]Unsupported cache entry type:[/red] {type(cached_value).__name__}"
-        # )
-        raise typer.Exit(code=1)
+    container = ctx.obj
+    if batch_mode:
 
-    translated, translated_key = ctx.obj.translate.execute(text, target, source)
+        def handle(request: dict) -> str:
+            values = batch.fields(request, ("key", "to"), to=target, **{"from": source})
+            return translate_key(container, values["key"], values["to"], values["from"])
 
-    print(translated_key)
+        batch.finish(batch.run_batch(handle, jobs, ordered))
+        return
 
-    if not quiet:
-        # print"[bold green]Translation Complete")
-        # printf"[cyan]Input key:[/cyan] {key}")
-        # if translated_key:
-        # printf"[cyan]Cache key:[/cyan] {translated_key}")
-        # printf"[cyan]Target:[/cyan] {target}")
-        # if source:
-        # printf"[cyan]Source:[/cyan] {source}")
-        preview = text.strip()
-        if preview:
-            suffix = "..." if len(preview) > 200 else ""
-            # printf"[cyan]Original:[/cyan] {preview[:200]}{suffix}")
-        # print"\n[bold]Result:[/bold]")
-        # printtranslated)
+    if target is None:
+        raise typer.BadParameter("Missing option --to")
+    print(translate_key(container, batch.require(key, "KEY"), target, source))
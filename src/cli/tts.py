@@ -1,14 +1,81 @@
 from pathlib import Path
+from typing import Iterable
 
 import typer
 from rich.console import Console
 
+from src.cli import batch
 from src.cli.container import AppContainer
 
 console = console = Console(force_terminal=True, legacy_windows=False)
 app = typer.Typer(help="Text-to-speech commands")
 
 
+def synthesize_key_to_file(
+    container: AppContainer,
+    cache_key: str,
+    voice_id: str,
+    output: Path,
+    model_id: str | None = None,
+) -> Path:
+    """Read a cached translation aloud and write the audio to `output`."""
+    try:
+        audio_stream, _ = container.tts.synthesize_from_cache(
+            cache_key, voice_id, model_id
+        )
+    except (KeyError, ValueError):
+        raise typer.Exit(code=1)
+    return _write_audio(audio_stream, output)
+
+
+def synthesize_text_to_file(
+    container: AppContainer,
+    text: str,
+    voice_id: str,
+    output: Path,
+    model_id: str | None = None,
+) -> Path:
+    """Read `text` aloud and write the audio to `output`."""
+    try:
+        audio_stream, _ = container.tts.synthesize(text, voice_id, model_id)
+    except (KeyError, ValueError):
+        raise typer.Exit(code=1)
+    return _write_audio(audio_stream, output)
+
+
+def _synthesize_request(
+    container: AppContainer, request: dict, voice_id: str | None, model_id: str | None
+) -> str:
+    values = batch.fields(
+        request,
+        ("voice", "output"),
+        text=None,
+        key=None,
+        voice=voice_id,
+        model=model_id,
+    )
+    if bool(values["text"]) == bool(values["key"]):
+        raise batch.BatchRequestError("Provide either text or key, but not both")
+    output = Path(values["output"])
+    if values["key"]:
+        synthesize_key_to_file(
+            container, values["key"], values["voice"], output, values["model"]
+        )
+    else:
+        synthesize_text_to_file(
+            container, values["text"], values["voice"], output, values["model"]
+        )
+    return str(output)
+
+
+def _write_audio(audio_stream: Iterable[bytes], output: Path) -> Path:
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with output.open("wb") as f:
+        for chunk in audio_stream:
+            f.write(chunk)
+    return output
+
+
 @app.command()
 def synthesize(
     text: str | None = typer.Argument(
@@ -21,7 +88,9 @@ def synthesize(
         "-k",
         help="Cache key containing translated text to read aloud",
     ),
-    voice_id: str = typer.Option(..., "--voice", "-v", help="ElevenLabs voice id"),
+    voice_id: str | None = typer.Option(
+        None, "--voice", "-v", help="ElevenLabs voice id"
+    ),
     model_id: str | None = typer.Option(
         None, "--model", "-m", help="ElevenLabs TTS model id (optional)"
     ),
@@ -33,12 +102,36 @@ def synthesize(
         show_default=True,
     ),
     quiet: bool = typer.Option(False, "--quiet", "-q", help="Suppress console output"),
+    batch_mode: bool = batch.batch_option(),
+    jobs: int = batch.jobs_option(),
+    ordered: bool = batch.ordered_option(),
     ctx: typer.Context = typer.Option(None, hidden=True),
 ):
-    """Synthesize speech from text or a cached translation key."""
+    """Synthesize speech from text or a cached translation key.
+
+    With --batch, each stdin line is {"text" or "key", "output", "voice",
+    "model"} and the result is the written path; --voice and --model give
+    the defaults.
+    """
     if not isinstance(ctx.obj, AppContainer):
         raise typer.BadParameter("App container not initialized")
 
+    if batch_mode:
+        container = ctx.obj
+        batch.finish(
+            batch.run_batch(
+                lambda request: _synthesize_request(
+                    container, request, voice_id, model_id
+                ),
+                jobs,
+                ordered,
+            )
+        )
+        return
+
+    if voice_id is None:
+        raise typer.BadParameter("Missing option --voice")
+
     if bool(text) == bool(cache_key):
         raise typer.BadParameter("Provide either text or --key, but not both.")
 
@@ -61,10 +154,7 @@ def synthesize(
         # printf"[red]{err}[/red]")
         raise typer.Exit(code=1)
 
-    output.parent.mkdir(parents=True, exist_ok=True)
-    with output.open("wb") as f:
-        for chunk in audio_stream:
-            f.write(chunk)
+    _write_audio(audio_stream, output)
 
     # if not quiet:
     #     # print"[bold green]TTS Complete")
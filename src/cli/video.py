@@ -1,17 +1,52 @@
 import json
+import os
+import queue
 import re
-import subprocess
 import tempfile
 import textwrap
+import threading
+import time
 import unicodedata
+from contextlib import nullcontext
+from concurrent.futures import FIRST_EXCEPTION, ThreadPoolExecutor, wait
+from dataclasses import dataclass, fields, replace
+from functools import lru_cache, partial
 from pathlib import Path
-from typing import Any, Literal, Optional
+from typing import (
+    IO,
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Literal,
+    Optional,
+    Sequence,
+    get_args,
+    get_origin,
+)
 
 import typer
-
+from typer.core import TyperGroup
+from rich.console import Console
+from rich.table import Table
+
+from src.application.service.artifacts import ArtifactStore
+from src.application.service.calibration import (
+    X264_PRESETS,
+    Calibration,
+    calibrate,
+    host_id,
+)
+from src.application.service.ffmpeg import FFmpegCancelled, FFmpegRunner, OutputSink
+from src.application.service.fragments import FragmentWatcher
+from src.application.service.probe import MediaProbe
+from src.application.service.scheduler import CpuBudget
+from src.cli.cache import BASE_CACHE_DIR
 from src.cli.container import AppContainer
 from src.domain.core.sentence import Sentence
 
+if TYPE_CHECKING:
+    from rich.progress import Progress, TaskID
+
 # ----------------------------
 # Config
 # ----------------------------
@@ -40,18 +75,175 @@ ASS_BOX_ALPHA = 0  # nền đen đặc
 TEXT_Y_BIAS = 1375  # số âm = đẩy lên (px theo PlayResY)
 TEXT_Y_BIAS_PER_EXTRA_LINE = -6  # mỗi dòng thêm (từ dòng 2 trở đi) đẩy lên thêm chút
 
-# Active box metrics used to align ASS text relative to the caption box center.
-_ACTIVE_CAPTION_BOX_H = CAPTION_BOX_H_DEFAULT
-_ACTIVE_CAPTION_BOX_PAD_BOTTOM = CAPTION_BOX_PAD_BOTTOM_DEFAULT
+# Caption geometry above is authored for a 1080x1920 frame.
+PLAY_RES_X = 1080
+PLAY_RES_Y = 1920
+
+PART_CACHE_DIR = BASE_CACHE_DIR / "artifacts" / "parts"
+CAPTION_CACHE_DIR = BASE_CACHE_DIR / "artifacts" / "captions"
+CAPTION_CACHE_MAX_MB = 256
+PART_CACHE_MAX_MB_DEFAULT = 2048
+# Longest run of adjoining segments one part encodes, in source seconds. A
+# caption edit re-encodes at most this much from the part cache.
+PART_MAX_S = 30.0
+# Shared by every render on this machine, whichever process started it.
+CPU_BUDGET_PATH = BASE_CACHE_DIR / "cpu_budget.sqlite3"
+
+
+@dataclass(frozen=True)
+class CaptionLayout:
+    """Box metrics used to align ASS text relative to the caption box center.
+
+    play_res_x/play_res_y are the frame the captions are laid out for; every
+    pixel constant is scaled from the 1080x1920 design to that frame.
+    """
+
+    box_h: int = CAPTION_BOX_H_DEFAULT
+    box_pad_bottom: int = CAPTION_BOX_PAD_BOTTOM_DEFAULT
+    play_res_x: int = PLAY_RES_X
+    play_res_y: int = PLAY_RES_Y
+
+    @property
+    def scale(self) -> float:
+        return self.play_res_x / PLAY_RES_X
+
+    def px(self, value: float) -> int:
+        return int(round(value * self.scale))
+
+    @property
+    def height_delta(self) -> int:
+        """Rows the frame differs from the scaled design (negative when cropped)."""
+        return self.play_res_y - self.px(PLAY_RES_Y)
+
+
+@dataclass(frozen=True)
+class RenderProfile:
+    """Output size and x264 settings; no size keeps the source resolution.
+
+    `aspect` center-crops the source to that ratio before scaling.
+    """
+
+    name: str
+    preset: str = "veryfast"
+    crf: Optional[int] = None
+    width: Optional[int] = None
+    height: Optional[int] = None
+    aspect: Optional[tuple[int, int]] = None
+
+    @property
+    def frame_filter(self) -> Optional[str]:
+        filters = []
+        if self.aspect is not None:
+            num, den = self.aspect
+            filters.append(
+                f"crop='min(iw,ih*{num}/{den})':'min(ih,iw*{den}/{num})'"
+            )
+        if self.width is not None and self.height is not None:
+            filters.append(f"scale={self.width}:{self.height}")
+        return ",".join(filters) or None
+
+    def encoder_args(self) -> list[str]:
+        args = ["-c:v", "libx264", "-preset", self.preset]
+        if self.crf is not None:
+            args += ["-crf", str(self.crf)]
+        return args
+
+    def output_size(self, src_w: int, src_h: int) -> tuple[int, int]:
+        if self.width is not None and self.height is not None:
+            return self.width, self.height
+        if self.aspect is not None:
+            num, den = self.aspect
+            return min(src_w, src_h * num // den), min(src_h, src_w * den // num)
+        return src_w, src_h
+
+    def layout(self, box_h: int, box_pad_bottom: int) -> CaptionLayout:
+        return CaptionLayout(
+            box_h=box_h,
+            box_pad_bottom=box_pad_bottom,
+            play_res_x=self.width or PLAY_RES_X,
+            play_res_y=self.height or PLAY_RES_Y,
+        )
+
+
+FINAL_PROFILE = RenderProfile("final")
+# Review proxy: quarter the pixels, fastest preset, visibly lossy.
+DRAFT_PROFILE = RenderProfile(
+    "draft", preset="ultrafast", crf=35, width=540, height=960
+)
+# Shapes selectable with --rendition; all but the first get a name suffix.
+RENDITIONS = {
+    "full": FINAL_PROFILE,
+    "720p": RenderProfile("720p", width=720, height=1280),
+    "square": RenderProfile("square", width=1080, height=1080, aspect=(1, 1)),
+}
+
+
+@dataclass(frozen=True)
+class _Rendition:
+    name: str
+    profile: RenderProfile
+    layout: CaptionLayout
+    box_filter: Optional[str]
+    output: Path
+    # Frame the captions land on: the source after crop/scale.
+    frame_size: tuple[int, int]
+
+
+# ass/drawtext draw text in every render; overlay composites cached PNGs.
+CaptionMethod = Literal["ass", "drawtext", "overlay"]
+Mp4Layout = Literal["standard", "fragmented", "faststart"]
+RenderMode = Literal["single", "parts", "stream"]
+
+
+# Render timing goes to stderr; stdout stays reserved for cache keys.
+console = Console(stderr=True, legacy_windows=False)
+
+
+class _RenderByDefault(TyperGroup):
+    """Routes `video <map_key> ...` to `video render` so existing calls keep working."""
+
+    def parse_args(self, ctx, args):  # type: ignore[no-untyped-def]
+        if args and args[0] not in self.commands and args[0] != "--help":
+            args = ["render", *args]
+        return super().parse_args(ctx, args)
+
+
+app = typer.Typer(cls=_RenderByDefault, help="Captioned video rendering")
 
 
 # ----------------------------
 # Utils
 # ----------------------------
-def _run(cmd: list[str]) -> None:
-    if cmd and cmd[0] == "ffmpeg":
-        cmd = [cmd[0], "-hide_banner", "-loglevel", "error", *cmd[1:]]
-    subprocess.run(cmd, check=True)
+def _cpu_seconds(runner: FFmpegRunner) -> float:
+    """CPU time of the ffmpeg processes this runner has run.
+
+    Read per child (wait4), so renders running side by side in one process
+    (`video batch`) don't count each other's work.
+    """
+    return sum(record.cpu_s or 0.0 for record in runner.records)
+
+
+class _ProgressView:
+    """Feeds FFmpegRunner progress callbacks into a live rich progress bar."""
+
+    def __init__(self, progress: "Progress") -> None:
+        self._progress = progress
+        self._tasks: dict[str, "TaskID"] = {}
+        self._lock = threading.Lock()
+
+    def __call__(
+        self, label: str, out_time_s: float, duration: Optional[float], done: bool
+    ) -> None:
+        with self._lock:
+            task = self._tasks.get(label)
+            if task is None:
+                task = self._progress.add_task(label, total=duration or None)
+                self._tasks[label] = task
+            if done:
+                self._progress.remove_task(task)
+                del self._tasks[label]
+                return
+            self._progress.update(task, completed=out_time_s)
 
 
 # ----------------------------
@@ -106,6 +298,21 @@ def _normalize_segments(raw: Any) -> list[dict[str, Any]]:
     return [_coerce_segment(x) for x in raw]
 
 
+def _clamp_segments(
+    segments: list[dict[str, Any]], duration: float
+) -> list[dict[str, Any]]:
+    """Drop segments starting past the end of the source and trim overruns."""
+    if duration <= 0:
+        return segments
+
+    clamped = []
+    for seg in segments:
+        if seg["start"] >= duration:
+            continue
+        clamped.append({**seg, "end": min(seg["end"], duration)})
+    return clamped
+
+
 # ----------------------------
 # Text cleaning + wrapping
 # ----------------------------
@@ -137,6 +344,9 @@ def _wrap_text(text: str, width: int) -> list[str]:
     )
 
 
+# Every render asks for the same captions several times (line counts, part
+# cache keys, filters), and `video batch` renders often share them.
+@lru_cache(maxsize=4096)
 def _prepare_wrapped_text(raw: str) -> tuple[str, int]:
     clean = _sanitize_caption(raw)
     lines = _wrap_text(clean, WRAP_WIDTH)
@@ -160,18 +370,20 @@ def _escape_filter_path(p: Path) -> str:
 # ----------------------------
 # drawtext
 # ----------------------------
-def _drawtext_filter_from_file(text_path: Path, line_count: int) -> str:
+def _drawtext_filter_from_file(
+    text_path: Path, line_count: int, layout: CaptionLayout
+) -> str:
     offset = _caption_vertical_offset(line_count)
-    margin_v = ASS_MARGIN_V + offset
+    margin_v = layout.px(ASS_MARGIN_V + offset)
     textfile = _escape_filter_path(text_path)
 
     return (
         f"drawtext=textfile='{textfile}':"
         f"font='{FONT}':"
-        f"fontsize={FONT_SIZE}:"
+        f"fontsize={layout.px(FONT_SIZE)}:"
         f"fontcolor={FONT_COLOR}:"
-        f"box=1:boxcolor={BOX_COLOR}:boxborderw={BOX_BORDER}:"
-        f"line_spacing={LINE_SPACING}:"
+        f"box=1:boxcolor={BOX_COLOR}:boxborderw={layout.px(BOX_BORDER)}:"
+        f"line_spacing={layout.px(LINE_SPACING)}:"
         f"x=(w-text_w)/2:"
         f"y=h-text_h-{margin_v}"
     )
@@ -198,117 +410,408 @@ def _escape_ass_text(s: str) -> str:
     )
 
 
-def _write_ass_file(path: Path, duration: float, text: str, line_count: int) -> None:
-    offset = _caption_vertical_offset(line_count)
-    margin_v = ASS_MARGIN_V + offset
+def _ass_time(t: float) -> str:
+    cs = int(round(max(t, 0) * 100))
+    s = cs // 100
+    cs %= 100
+    m, s = divmod(s, 60)
+    h, m = divmod(m, 60)
+    return f"{h}:{m:02d}:{s:02d}.{cs:02d}"
 
-    primary = _ass_color("white", 0)
-    back = _ass_color("black", ASS_BOX_ALPHA)
 
-    def fmt(t: float) -> str:
-        cs = int(round(max(t, 0) * 100))
-        s = cs // 100
-        cs %= 100
-        m, s = divmod(s, 60)
-        h, m = divmod(m, 60)
-        return f"{h}:{m:02d}:{s:02d}.{cs:02d}"
+def _ass_dialogue(
+    start: float, end: float, text: str, line_count: int, layout: CaptionLayout
+) -> str:
+    offset = _caption_vertical_offset(line_count)
+    margin_v = ASS_MARGIN_V + offset
 
     ass_text = _escape_ass_text(text)
 
-    # Compute center of the caption box (assuming PlayResX=1080, PlayResY=1920).
-    box_h = _ACTIVE_CAPTION_BOX_H or CAPTION_BOX_H_DEFAULT
-    box_pad_bottom = _ACTIVE_CAPTION_BOX_PAD_BOTTOM or 0
-    center_x = 540
-    center_y = int(1920 - margin_v - (box_h / 2) + box_pad_bottom)
+    # Compute center of the caption box on the 1080x1920 design frame.
+    box_h = layout.box_h or CAPTION_BOX_H_DEFAULT
+    box_pad_bottom = layout.box_pad_bottom or 0
+    center_y = int(PLAY_RES_Y - margin_v - (box_h / 2) + box_pad_bottom)
 
     # Bias upward based on wrapped line count.
     extra_lines = max(0, line_count - 1)
     center_y += TEXT_Y_BIAS + extra_lines * TEXT_Y_BIAS_PER_EXTRA_LINE
 
+    # Map onto the layout frame, keeping the distance from the bottom edge.
+    center_x = layout.play_res_x // 2
+    center_y = layout.play_res_y - layout.px(PLAY_RES_Y - center_y)
+
     # Force text to anchor at the center position.
     ass_text = f"{{\\an5\\pos({center_x},{center_y})}}{ass_text}"
 
-    content = f"""[Script Info]
+    return (
+        f"Dialogue: 0,{_ass_time(start)},{_ass_time(end)},Default,,0,0,0,,{ass_text}"
+    )
+
+
+def _ass_document(dialogues: list[str], layout: CaptionLayout) -> str:
+    primary = _ass_color("white", 0)
+    back = _ass_color("black", ASS_BOX_ALPHA)
+    font_size = layout.px(FONT_SIZE)
+    margin_h = layout.px(80)
+
+    events = "\n".join(dialogues)
+    return f"""[Script Info]
 ScriptType: v4.00+
-PlayResX: 1080
-PlayResY: 1920
+PlayResX: {layout.play_res_x}
+PlayResY: {layout.play_res_y}
 
 [V4+ Styles]
 Format: Name, Fontname, Fontsize, PrimaryColour, SecondaryColour, OutlineColour, BackColour, Bold, Italic, Underline, StrikeOut, ScaleX, ScaleY, Spacing, Angle, BorderStyle, Outline, Shadow, Alignment, MarginL, MarginR, MarginV, Encoding
-Style: Default,{FONT},{FONT_SIZE},{primary},{primary},{primary},{back},0,0,0,0,100,100,0,0,1,{ASS_OUTLINE},{ASS_SHADOW},5,80,80,0,1
+Style: Default,{FONT},{font_size},{primary},{primary},{primary},{back},0,0,0,0,100,100,0,0,1,{ASS_OUTLINE},{ASS_SHADOW},5,{margin_h},{margin_h},0,1
 
 [Events]
 Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text
-Dialogue: 0,{fmt(0)},{fmt(duration)},Default,,0,0,0,,{ass_text}
+{events}
 """
-    _write_text_utf8(path, content)
+
+
+def _write_ass_document(
+    path: Path, dialogues: list[str], layout: CaptionLayout
+) -> None:
+    _write_text_utf8(path, _ass_document(dialogues, layout))
+
+
+def _write_ass_file(
+    path: Path, duration: float, text: str, line_count: int, layout: CaptionLayout
+) -> None:
+    _write_ass_document(
+        path, [_ass_dialogue(0, duration, text, line_count, layout)], layout
+    )
 
 
 def _subtitles_filter(path: Path) -> str:
     return f"subtitles='{_escape_filter_path(path)}'"
 
 
+# ----------------------------
+# Pre-rasterised captions
+# ----------------------------
+@lru_cache(maxsize=1)
+def _caption_store() -> ArtifactStore:
+    return ArtifactStore(
+        str(CAPTION_CACHE_DIR), max_bytes=CAPTION_CACHE_MAX_MB * 1024 * 1024
+    )
+
+
+def _caption_png(
+    runner: FFmpegRunner,
+    tmp_dir: Path,
+    text: str,
+    line_count: int,
+    layout: CaptionLayout,
+    frame_size: tuple[int, int],
+    cancel: Optional[threading.Event] = None,
+) -> Path:
+    """Rasterise one wrapped caption to a transparent full-frame PNG, once.
+
+    The image is keyed by its ASS document and drawn at `frame_size`, so
+    libass scales the layout to the frame exactly as the `ass` method does
+    and the PNG overlays at 0:0; empty text gives a blank frame.
+    """
+    dialogues = [_ass_dialogue(0, 1, text, line_count, layout)] if text else []
+    content = _ass_document(dialogues, layout)
+
+    store = _caption_store()
+    key = store.make_key("caption", content, *frame_size)
+    if (cached := store.get(key, ".png")) is not None:
+        return cached
+
+    fd, name = tempfile.mkstemp(suffix=".ass", dir=tmp_dir)
+    os.close(fd)
+    doc = Path(name)
+    _write_text_utf8(doc, content)
+    png = doc.with_suffix(".png")
+    runner.run(
+        [
+            "ffmpeg",
+            "-y",
+            "-f",
+            "lavfi",
+            "-i",
+            f"color=c=black@0.0:s={frame_size[0]}x{frame_size[1]}:r=1:d=1,"
+            "format=rgba",
+            "-vf",
+            f"{_subtitles_filter(doc)}:alpha=1",
+            "-frames:v",
+            "1",
+            png.as_posix(),
+        ],
+        label="caption",
+        cancel=cancel,
+        cores=1,
+    )
+    return store.put(key, png, ".png")
+
+
 # ----------------------------
 # Rendering
 # ----------------------------
-def _render_parts(
+def _x264_threads(jobs: int, total: Optional[int] = None) -> int:
+    """Split the host cores (or a CPU budget) evenly across concurrent encoders."""
+    return max(1, (total or os.cpu_count() or 1) // max(1, jobs))
+
+
+def _render_part(
+    runner: FFmpegRunner,
     video_in: Path,
-    segments: list[dict[str, Any]],
+    run: list[dict[str, Any]],
+    index: int,
     tmp_dir: Path,
-    method: Literal["ass", "drawtext"],
+    method: CaptionMethod,
     box_filter: Optional[str],
-) -> list[Path]:
-    outputs: list[Path] = []
+    layout: CaptionLayout,
+    profile: RenderProfile = FINAL_PROFILE,
+    threads: Optional[int] = None,
+    cancel: Optional[threading.Event] = None,
+    sink: Optional[OutputSink] = None,
+    ts_offset: float = 0.0,
+    frame_size: Optional[tuple[int, int]] = None,
+) -> Path:
+    """Encode adjoining segments to one part file, or as MPEG-TS into `sink`.
+
+    A run of several segments is one seek and one encode, with each caption
+    timed to its segment as in the single-pass render. `frame_size` is the
+    frame after `profile`'s crop/scale, which overlay captions are drawn for;
+    it defaults to the layout's frame.
+    """
+    part = tmp_dir / f"part_{index:03d}.mp4"
+    start, duration = run[0]["start"], run[-1]["end"] - run[0]["start"]
+
+    wrapped_text, line_count = _prepare_wrapped_text(run[0]["text"])
+    frame_size = frame_size or (layout.play_res_x, layout.play_res_y)
+
+    filters = [profile.frame_filter, box_filter]
+    caption_input: list[str] = []
+    if len(run) > 1:
+        timeline = _output_timeline(run)
+        tag = f"_{index:03d}"
+        if method == "overlay":
+            playlist = _caption_playlist(
+                runner, run, timeline, tmp_dir, layout, frame_size, tag
+            )
+            caption_input = ["-f", "concat", "-safe", "0", "-i", playlist.as_posix()]
+        else:
+            filters += _caption_filters(run, timeline, tmp_dir, method, layout, tag)
+    elif not wrapped_text:
+        pass
+    elif method == "overlay":
+        caption_png = _caption_png(
+            runner,
+            tmp_dir,
+            wrapped_text,
+            line_count,
+            layout,
+            frame_size,
+            cancel,
+        )
+        caption_input = ["-i", caption_png.as_posix()]
+    elif method == "drawtext":
+        txt = tmp_dir / f"cap_{index:03d}.txt"
+        _write_text_utf8(txt, wrapped_text)
+        filters.append(_drawtext_filter_from_file(txt, line_count, layout))
+    else:
+        ass = tmp_dir / f"cap_{index:03d}.ass"
+        _write_ass_file(ass, duration, wrapped_text, line_count, layout)
+        filters.append(_subtitles_filter(ass))
+
+    vf = ",".join(f for f in filters if f)
+    vf_args = ["-vf", vf] if vf else []
+    if caption_input:
+        graph = f"[0:v]{vf or 'null'}[base];[base][1:v]overlay=0:0[v]"
+        vf_args = ["-filter_complex", graph, "-map", "[v]"]
+    target = [part.as_posix()]
+    if sink is not None:
+        # Shift timestamps to the part's place in the output so consecutive
+        # transport streams join without a gap or overlap.
+        target = ["-f", "mpegts", "-output_ts_offset", f"{ts_offset:.6f}", "pipe:1"]
+    runner.run(
+        [
+            "ffmpeg",
+            "-y",
+            "-ss",
+            str(start),
+            "-i",
+            str(video_in),
+            *caption_input,
+            "-t",
+            str(duration),
+            *vf_args,
+            "-an",
+            *profile.encoder_args(),
+            *target,
+        ],
+        label=f"part {index:03d}",
+        duration=duration,
+        cancel=cancel,
+        cores=threads,
+        sink=sink,
+    )
+    return part
 
-    for i, seg in enumerate(segments):
-        part = tmp_dir / f"part_{i:03d}.mp4"
-        duration = seg["end"] - seg["start"]
 
-        wrapped_text, line_count = _prepare_wrapped_text(seg["text"])
+def _part_runs(
+    segments: list[dict[str, Any]], jobs: int = 1
+) -> list[list[dict[str, Any]]]:
+    """Group segments that pick up where the previous one ended into parts.
 
-        if method == "drawtext":
-            txt = tmp_dir / f"cap_{i:03d}.txt"
-            _write_text_utf8(txt, wrapped_text)
-            vf_text = _drawtext_filter_from_file(txt, line_count)
-            vf = f"{box_filter},{vf_text}" if box_filter else vf_text
-        else:
-            ass = tmp_dir / f"cap_{i:03d}.ass"
-            _write_ass_file(ass, duration, wrapped_text, line_count)
-            vf_sub = _subtitles_filter(ass)
-            vf = f"{box_filter},{vf_sub}" if box_filter else vf_sub
-
-        _run(
-            [
-                "ffmpeg",
-                "-y",
-                "-ss",
-                str(seg["start"]),
-                "-i",
-                str(video_in),
-                "-t",
-                str(duration),
-                "-vf",
-                vf,
-                "-an",
-                "-c:v",
-                "libx264",
-                "-preset",
-                "veryfast",
-                part.as_posix(),
-            ]
+    Each part seeks once and starts one encoder for its whole run. A run
+    stops at PART_MAX_S, and at an even share of the output when `jobs`
+    parts render at once, so every worker still gets a part.
+    """
+    output_s = sum(seg["end"] - seg["start"] for seg in segments)
+    max_s = min(PART_MAX_S, output_s / max(1, jobs))
+    runs: list[list[dict[str, Any]]] = []
+    for seg in segments:
+        if runs:
+            run = runs[-1]
+            adjoining = abs(seg["start"] - run[-1]["end"]) <= SINGLE_PASS_TOLERANCE
+            if adjoining and seg["end"] - run[0]["start"] <= max_s:
+                run.append(seg)
+                continue
+        runs.append([seg])
+    return runs
+
+
+def _run_ordered(
+    tasks: list[Callable[..., Path]], jobs: int, threads: Optional[int] = None
+) -> list[Path]:
+    """Run part tasks on up to `jobs` workers, returning results in task order.
+
+    The first failure cancels queued tasks and kills running ffmpeg processes
+    before it is re-raised.
+    """
+    if jobs <= 1 or len(tasks) <= 1:
+        return [task(threads=threads) for task in tasks]
+
+    # Each worker only waits on its own ffmpeg process, so threads are enough
+    # to keep `jobs` encoders busy; ffmpeg itself is the process pool.
+    cancel = threading.Event()
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        futures = [pool.submit(task, threads=threads, cancel=cancel) for task in tasks]
+        done, pending = wait(futures, return_when=FIRST_EXCEPTION)
+        failed = next((f for f in done if f.exception() is not None), None)
+        if failed is not None:
+            cancel.set()
+            for future in pending:
+                future.cancel()
+            wait(pending)
+            raise failed.exception()  # type: ignore[misc]
+
+    return [future.result() for future in futures]
+
+
+class _PartCache:
+    """Reuses encoded parts across renders, keyed by everything that shapes them."""
+
+    def __init__(self, store: ArtifactStore, source_digest: str) -> None:
+        self.store = store
+        self.source_digest = source_digest
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def key(
+        self,
+        run: list[dict[str, Any]],
+        method: str,
+        box_filter: Optional[str],
+        layout: CaptionLayout,
+        profile: RenderProfile,
+        frame_size: Optional[tuple[int, int]] = None,
+    ) -> str:
+        # A one-segment run keys exactly as parts did before runs existed.
+        captions: list[Any] = []
+        for seg in run:
+            wrapped_text, _ = _prepare_wrapped_text(seg["text"])
+            captions += [seg["start"], seg["end"] - seg["start"], wrapped_text]
+        # Overlay parts used to be composited on a layout-sized canvas
+        # whatever the frame; keying on the frame keeps those out.
+        canvas = (frame_size or ()) if method == "overlay" else ()
+        return self.store.make_key(
+            self.source_digest,
+            "encode",
+            *captions,
+            method,
+            box_filter or "",
+            layout,
+            profile,
+            *canvas,
         )
 
-        outputs.append(part)
+    def wrap(self, key: str, ext: str, task: Callable[..., Path]) -> Callable[..., Path]:
+        suffix = f".{ext}"
+
+        def run(
+            threads: Optional[int] = None, cancel: Optional[threading.Event] = None
+        ) -> Path:
+            cached = self.store.get(key, suffix)
+            with self._lock:
+                if cached is not None:
+                    self.hits += 1
+                else:
+                    self.misses += 1
+            if cached is not None:
+                return cached
+            return self.store.put(key, task(threads=threads, cancel=cancel), suffix)
 
-    return outputs
+        return run
 
 
-def _concat(parts: list[Path], tmp_dir: Path) -> Path:
+def _render_parts(
+    runner: FFmpegRunner,
+    video_in: Path,
+    segments: list[dict[str, Any]],
+    tmp_dir: Path,
+    method: CaptionMethod,
+    box_filter: Optional[str],
+    layout: CaptionLayout,
+    profile: RenderProfile = FINAL_PROFILE,
+    jobs: int = 1,
+    part_cache: Optional[_PartCache] = None,
+    frame_size: Optional[tuple[int, int]] = None,
+) -> list[Path]:
+    tasks: list[Callable[..., Path]] = []
+    for i, run in enumerate(_part_runs(segments, jobs)):
+        task = partial(
+            _render_part,
+            runner,
+            video_in,
+            run,
+            i,
+            tmp_dir,
+            method,
+            box_filter,
+            layout,
+            profile,
+            frame_size=frame_size,
+        )
+        if part_cache:
+            key = part_cache.key(run, method, box_filter, layout, profile, frame_size)
+            task = part_cache.wrap(key, "mp4", task)
+        tasks.append(task)
+    total = runner.budget.total_cores if runner.budget else None
+    threads = _x264_threads(jobs, total) if jobs > 1 else None
+    return _run_ordered(tasks, jobs, threads)
+
+
+def _concat(
+    runner: FFmpegRunner,
+    parts: list[Path],
+    tmp_dir: Path,
+    duration: Optional[float] = None,
+    out: Optional[Path] = None,
+    mp4_layout: Mp4Layout = "standard",
+) -> Path:
     txt = tmp_dir / "concat.txt"
     txt.write_text("\n".join(f"file '{p.as_posix()}'" for p in parts), encoding="utf-8")
 
-    out = tmp_dir / "merged.mp4"
-    _run(
+    out = out or tmp_dir / "merged.mp4"
+    runner.run(
         [
             "ffmpeg",
             "-y",
@@ -320,14 +823,86 @@ def _concat(parts: list[Path], tmp_dir: Path) -> Path:
             txt.as_posix(),
             "-c",
             "copy",
+            *_mp4_layout_args(mp4_layout),
             out.as_posix(),
-        ]
+        ],
+        label="concat",
+        duration=duration,
+        cores=1,
     )
     return out
 
 
-def _mux_audio(merged_video: Path, audio_mp3: Path, video_out: Path) -> None:
-    _run(
+def _atempo_chain(tempo: float) -> str:
+    """atempo filters for `tempo`, split into steps older ffmpeg accepts."""
+    steps = []
+    while tempo > 2.0:
+        steps.append(2.0)
+        tempo /= 2.0
+    while tempo < 0.5:
+        steps.append(0.5)
+        tempo /= 0.5
+    steps.append(tempo)
+    return ",".join(f"atempo={step:.6g}" for step in steps)
+
+
+def speed_up_audio(
+    runner: FFmpegRunner, audio_in: Path, audio_out: Path, tempo: float
+) -> Path:
+    """Write `audio_in` re-timed by `tempo` (pitch kept) to `audio_out`."""
+    runner.run(
+        [
+            "ffmpeg",
+            "-y",
+            "-i",
+            audio_in.as_posix(),
+            "-filter:a",
+            _atempo_chain(tempo),
+            audio_out.as_posix(),
+        ],
+        label="atempo",
+        cores=1,
+    )
+    return audio_out
+
+
+def _audio_codec_args(tempo: float, copy_audio: bool) -> list[str]:
+    if copy_audio and tempo == 1.0:
+        return ["-c:a", "copy"]
+    return ["-c:a", "aac"]
+
+
+def _mp4_layout_args(mp4_layout: Mp4Layout) -> list[str]:
+    """Muxer flags for the final MP4.
+
+    fragmented: moov first and empty, then self-contained moof+mdat pairs at
+    each keyframe or every ~2s, so finished bytes never change again.
+    faststart: one regular moov, moved to the front when the file closes.
+    """
+    if mp4_layout == "fragmented":
+        return [
+            "-movflags",
+            "+frag_keyframe+empty_moov+default_base_moof",
+            "-frag_duration",
+            "2000000",
+        ]
+    if mp4_layout == "faststart":
+        return ["-movflags", "+faststart"]
+    return []
+
+
+def _mux_audio(
+    runner: FFmpegRunner,
+    merged_video: Path,
+    audio_mp3: Path,
+    video_out: Path,
+    duration: Optional[float] = None,
+    tempo: float = 1.0,
+    copy_audio: bool = False,
+    mp4_layout: Mp4Layout = "standard",
+) -> None:
+    tempo_args = ["-filter:a", _atempo_chain(tempo)] if tempo != 1.0 else []
+    runner.run(
         [
             "ffmpeg",
             "-y",
@@ -341,46 +916,350 @@ def _mux_audio(merged_video: Path, audio_mp3: Path, video_out: Path) -> None:
             "1:a:0",
             "-c:v",
             "copy",
-            "-c:a",
-            "aac",
+            *tempo_args,
+            *_audio_codec_args(tempo, copy_audio),
+            *_mp4_layout_args(mp4_layout),
             video_out.as_posix(),
-        ]
+        ],
+        label="mux",
+        duration=duration,
+        cores=1,
     )
 
 
 # ----------------------------
-# Standalone box overlay helper
+# Streamed parts
 # ----------------------------
-def add_box_overlay(
+def _stream_parts(
+    runner: FFmpegRunner,
     video_in: Path,
+    segments: list[dict[str, Any]],
+    tmp_dir: Path,
+    method: CaptionMethod,
+    box_filter: Optional[str],
+    layout: CaptionLayout,
+    audio_in: Optional[Path],
     video_out: Path,
-    box_h: int = 260,
-    alpha: float = 0.75,
-    box_width: Optional[int] = None,
-    align: Literal["left", "center", "right"] = "center",
-    margin_bottom: int = 0,
+    profile: RenderProfile = FINAL_PROFILE,
+    jobs: int = 1,
+    tempo: float = 1.0,
+    copy_audio: bool = False,
+    mp4_layout: Mp4Layout = "standard",
+    frame_size: Optional[tuple[int, int]] = None,
 ) -> None:
-    """Overlay a translucent box at the bottom of a video."""
-    vf = _build_box_filter(
-        box_h=box_h,
-        alpha=alpha,
-        box_width=box_width,
-        align=align,
-        margin_bottom=margin_bottom,
+    """Pipe every encoded part as MPEG-TS into one muxing ffmpeg.
+
+    No part, concat list or merged file is written: the head part streams
+    straight into the muxer's stdin while later parts wait in memory. A part
+    only starts once it is within `jobs` of the part being fed, so at most
+    `jobs` parts are ever buffered.
+    """
+    runs = _part_runs(segments, jobs)
+    chunks: list[queue.Queue[Optional[bytes]]] = [queue.Queue() for _ in runs]
+    stop = threading.Event()
+    window = threading.Condition()
+    fed = 0  # parts written to the muxer in full
+
+    def feed(stdin: IO[bytes]) -> None:
+        nonlocal fed
+        for pending in chunks:
+            while True:
+                try:
+                    chunk = pending.get(timeout=0.2)
+                except queue.Empty:
+                    if stop.is_set():
+                        return
+                    continue
+                if chunk is None:
+                    break
+                stdin.write(chunk)
+            with window:
+                fed += 1
+                window.notify_all()
+
+    def wait_turn(index: int, cancel: Optional[threading.Event]) -> None:
+        with window:
+            while index >= fed + jobs:
+                if stop.is_set() or (cancel is not None and cancel.is_set()):
+                    raise FFmpegCancelled(f"Cancelled: part {index:03d}")
+                window.wait(0.2)
+
+    def encode(
+        index: int,
+        run: list[dict[str, Any]],
+        offset: float,
+        threads: Optional[int] = None,
+        cancel: Optional[threading.Event] = None,
+    ) -> Path:
+        wait_turn(index, cancel)
+        try:
+            return _render_part(
+                runner,
+                video_in,
+                run,
+                index,
+                tmp_dir,
+                method,
+                box_filter,
+                layout,
+                profile,
+                threads,
+                cancel,
+                sink=chunks[index].put,
+                ts_offset=offset,
+                frame_size=frame_size,
+            )
+        finally:
+            chunks[index].put(None)
+
+    timeline = _output_timeline(
+        [{"start": run[0]["start"], "end": run[-1]["end"]} for run in runs]
     )
-    _run(
-        [
-            "ffmpeg",
-            "-y",
-            "-i",
-            str(video_in),
-            "-vf",
-            vf,
-            "-c:a",
-            "copy",
-            str(video_out),
+    tasks: list[Callable[..., Path]] = [
+        partial(encode, i, run, start)
+        for i, (run, (start, _)) in enumerate(zip(runs, timeline))
+    ]
+
+    cmd = ["ffmpeg", "-y", "-f", "mpegts", "-i", "pipe:0"]
+    if audio_in:
+        cmd += ["-i", audio_in.as_posix()]
+    cmd += ["-map", "0:v:0", "-c:v", "copy"]
+    if audio_in:
+        cmd += ["-map", "1:a:0"]
+        if tempo != 1.0:
+            cmd += ["-filter:a", _atempo_chain(tempo)]
+        cmd += _audio_codec_args(tempo, copy_audio)
+    else:
+        cmd += ["-an"]
+    cmd += [*_mp4_layout_args(mp4_layout), video_out.as_posix()]
+
+    mux_errors: list[BaseException] = []
+
+    def mux() -> None:
+        try:
+            # Outside the CPU budget: it idles on the parts, which need the cores.
+            runner.run(
+                cmd,
+                label="mux",
+                duration=timeline[-1][1] if timeline else None,
+                cancel=stop,
+                cores=0,
+                feed=feed,
+            )
+        except BaseException as exc:  # re-raised on the calling thread
+            mux_errors.append(exc)
+            # Parts waiting for the feed to move on would wait forever.
+            stop.set()
+
+    muxer = threading.Thread(target=mux, daemon=True)
+    muxer.start()
+    total = runner.budget.total_cores if runner.budget else None
+    try:
+        _run_ordered(tasks, jobs, _x264_threads(jobs, total) if jobs > 1 else None)
+    except BaseException:
+        stop.set()
+        muxer.join()
+        # A dead muxer cancels the parts; its error is the one worth seeing.
+        if mux_errors:
+            raise mux_errors[0]
+        raise
+    muxer.join()
+    if mux_errors:
+        raise mux_errors[0]
+
+
+# ----------------------------
+# Single-pass rendering
+# ----------------------------
+# Seconds two segments may overlap before they count as overlapping.
+SINGLE_PASS_TOLERANCE = 0.001
+
+
+def _output_timeline(segments: list[dict[str, Any]]) -> list[tuple[float, float]]:
+    """Map each segment to its (start, end) on the stitched output timeline."""
+    timeline: list[tuple[float, float]] = []
+    cursor = 0.0
+    for seg in segments:
+        duration = seg["end"] - seg["start"]
+        timeline.append((cursor, cursor + duration))
+        cursor += duration
+    return timeline
+
+
+def _select_filter(segments: list[dict[str, Any]]) -> str:
+    # Keep only frames inside a segment (same [start, end) window as -ss/-t in
+    # the per-part path) and restamp them so the kept ranges play back to back.
+    terms = "+".join(f"gte(t,{seg['start']})*lt(t,{seg['end']})" for seg in segments)
+    return f"select='{terms}',setpts=N/FRAME_RATE/TB"
+
+
+def _single_pass_drift(
+    segments: list[dict[str, Any]], media: MediaProbe
+) -> Optional[str]:
+    """Why the select timeline would drift from the per-part output, if it would.
+
+    select emits each source frame at most once and in source order, and
+    setpts counts frames at a constant rate; overlapping or reordered
+    segments and variable frame rate sources break those assumptions.
+    """
+    for prev, seg in zip(segments, segments[1:]):
+        if seg["start"] < prev["end"] - SINGLE_PASS_TOLERANCE:
+            return "segments overlap or run out of order"
+    nominal, average = media.nominal_fps, media.fps
+    if nominal and average and abs(nominal - average) > nominal * 0.01:
+        return "the source has a variable frame rate"
+    return None
+
+
+def _enable_expr(start: float, end: float) -> str:
+    return f"enable='gte(t,{start})*lt(t,{end})'"
+
+
+def _caption_filters(
+    segments: list[dict[str, Any]],
+    timeline: list[tuple[float, float]],
+    tmp_dir: Path,
+    method: CaptionMethod,
+    layout: CaptionLayout,
+    tag: str = "",
+) -> list[str]:
+    """Timed caption filters for every segment on the output timeline."""
+    if method == "drawtext":
+        filters = []
+        for i, (seg, (start, end)) in enumerate(zip(segments, timeline)):
+            wrapped_text, line_count = _prepare_wrapped_text(seg["text"])
+            txt = tmp_dir / f"cap{tag}_{i:03d}.txt"
+            _write_text_utf8(txt, wrapped_text)
+            filters.append(
+                f"{_drawtext_filter_from_file(txt, line_count, layout)}:"
+                f"{_enable_expr(start, end)}"
+            )
+        return filters
+
+    dialogues = []
+    for seg, (start, end) in zip(segments, timeline):
+        wrapped_text, line_count = _prepare_wrapped_text(seg["text"])
+        dialogues.append(_ass_dialogue(start, end, wrapped_text, line_count, layout))
+    ass = tmp_dir / f"captions{tag}.ass"
+    _write_ass_document(ass, dialogues, layout)
+    return [_subtitles_filter(ass)]
+
+
+def _caption_playlist(
+    runner: FFmpegRunner,
+    segments: list[dict[str, Any]],
+    timeline: list[tuple[float, float]],
+    tmp_dir: Path,
+    layout: CaptionLayout,
+    frame_size: tuple[int, int],
+    tag: str = "",
+) -> Path:
+    """Concat-demuxer list showing each caption PNG for its output span."""
+    entries = ["ffconcat version 1.0"]
+    for seg, (start, end) in zip(segments, timeline):
+        wrapped_text, line_count = _prepare_wrapped_text(seg["text"])
+        png = _caption_png(
+            runner, tmp_dir, wrapped_text, line_count, layout, frame_size
+        )
+        entries += [f"file '{png.as_posix()}'", f"duration {end - start:.6f}"]
+    playlist = tmp_dir / f"captions{tag}.ffconcat"
+    _write_text_utf8(playlist, "\n".join(entries) + "\n")
+    return playlist
+
+
+def _render_single_pass(
+    runner: FFmpegRunner,
+    video_in: Path,
+    segments: list[dict[str, Any]],
+    tmp_dir: Path,
+    method: CaptionMethod,
+    renditions: Sequence[_Rendition],
+    audio_in: Optional[Path],
+    tempo: float = 1.0,
+    copy_audio: bool = False,
+    mp4_layout: Mp4Layout = "standard",
+) -> None:
+    """Burn every caption and mux audio with a single ffmpeg decode/encode.
+
+    Several renditions branch off the one decoded stream with `split`; each
+    gets its own crop/scale, caption layout and encoder settings.
+    """
+    timeline = _output_timeline(segments)
+    count = len(renditions)
+
+    lines = []
+    if count == 1:
+        heads = [f"[0:v]{_select_filter(segments)},"]
+    else:
+        labels = "".join(f"[s{i}]" for i in range(count))
+        lines.append(f"[0:v]{_select_filter(segments)},split={count}{labels}")
+        heads = [f"[s{i}]" for i in range(count)]
+
+    # Overlay captions arrive as one extra input per rendition, after audio.
+    caption_inputs: list[str] = []
+    first_caption_input = 2 if audio_in else 1
+    for i, (head, rendition) in enumerate(zip(heads, renditions)):
+        filters = [rendition.profile.frame_filter, rendition.box_filter]
+        if method != "overlay":
+            filters += _caption_filters(
+                segments, timeline, tmp_dir, method, rendition.layout, tag=f"_{i}"
+            )
+        chain = ",".join(f for f in filters if f) or "null"
+        if method != "overlay":
+            lines.append(f"{head}{chain}[v{i}]")
+            continue
+
+        playlist = _caption_playlist(
+            runner,
+            segments,
+            timeline,
+            tmp_dir,
+            rendition.layout,
+            rendition.frame_size,
+            tag=f"_{i}",
+        )
+        caption_inputs += ["-f", "concat", "-safe", "0", "-i", playlist.as_posix()]
+        lines.append(f"{head}{chain}[b{i}]")
+        lines.append(f"[b{i}][{first_caption_input + i}:v]overlay=0:0[v{i}]")
+
+    audio_maps = ["1:a:0"] * count
+    if audio_in and tempo != 1.0:
+        if count == 1:
+            lines.append(f"[1:a:0]{_atempo_chain(tempo)}[a0]")
+        else:
+            labels = "".join(f"[a{i}]" for i in range(count))
+            lines.append(f"[1:a:0]{_atempo_chain(tempo)},asplit={count}{labels}")
+        audio_maps = [f"[a{i}]" for i in range(count)]
+
+    # The graph grows with the segment count; a script file keeps it clear of
+    # command-line length limits (notably on Windows).
+    graph = tmp_dir / "graph.txt"
+    _write_text_utf8(graph, ";\n".join(lines))
+
+    cmd = ["ffmpeg", "-y", "-i", str(video_in)]
+    if audio_in:
+        cmd += ["-i", audio_in.as_posix()]
+    cmd += [*caption_inputs, "-filter_complex_script", graph.as_posix()]
+
+    # The runner only sizes the last output's threads; split the cores
+    # between encoders when there are several.
+    total = runner.budget.total_cores if runner.budget else None
+    threads_args = ["-threads", str(_x264_threads(count, total))] if count > 1 else []
+    for i, rendition in enumerate(renditions):
+        # select drops frames, so keep the restamped timestamps as-is instead
+        # of letting the muxer resample to a default frame rate.
+        cmd += ["-map", f"[v{i}]", "-fps_mode", "passthrough"]
+        if audio_in:
+            cmd += ["-map", audio_maps[i], *_audio_codec_args(tempo, copy_audio)]
+        else:
+            cmd += ["-an"]
+        cmd += [
+            *rendition.profile.encoder_args(),
+            *threads_args,
+            *_mp4_layout_args(mp4_layout),
+            rendition.output.as_posix(),
         ]
-    )
+    runner.run(cmd, label="single", duration=timeline[-1][1] if timeline else None)
 
 
 def _build_box_filter(
@@ -411,14 +1290,542 @@ def _build_box_filter(
 
 
 # ----------------------------
-# Typer command
+# Encoder autotuning
+# ----------------------------
+def _calibration_key(cache: Any, width: int, height: int) -> str:
+    return cache.make_key("calibration", host_id(), width, height)
+
+
+def _tune_renditions(
+    cache: Any,
+    renditions: list[_Rendition],
+    media: MediaProbe,
+    target: float,
+    jobs: int,
+    total_cores: Optional[int],
+) -> list[_Rendition]:
+    """Swap in the calibrated preset/CRF that meets `target` x realtime."""
+    data = cache.get(_calibration_key(cache, PLAY_RES_X, PLAY_RES_Y))
+    if data is None:
+        raise typer.BadParameter(
+            "No encoder calibration for this host; run `video calibrate` first"
+        )
+    calibration = Calibration.from_dict(data)
+
+    # Work relative to the calibration clip: output pixels per second summed
+    # over every rendition encoded in the same pass.
+    stream = media.video or {}
+    src_w = int(stream.get("width") or PLAY_RES_X)
+    src_h = int(stream.get("height") or PLAY_RES_Y)
+    pixels = 0
+    for rendition in renditions:
+        w, h = rendition.profile.output_size(src_w, src_h)
+        pixels += w * h
+    cost = pixels / (calibration.width * calibration.height)
+    cost *= (media.fps or calibration.fps) / calibration.fps
+
+    trial, projected = calibration.pick(
+        target, cost, max_threads=_x264_threads(jobs, total_cores)
+    )
+    if trial is None:
+        trial = max(calibration.trials, key=lambda t: t.speed)
+        projected = trial.speed / cost
+        console.print(
+            f"[yellow]No calibrated setting reaches {target:g}x realtime; "
+            f"using the fastest[/yellow]"
+        )
+    console.print(
+        f"[cyan]Encoder:[/cyan] x264 {trial.preset} crf {trial.crf} "
+        f"(projected {projected:.2f}x realtime)"
+    )
+    return [
+        replace(r, profile=replace(r.profile, preset=trial.preset, crf=trial.crf))
+        for r in renditions
+    ]
+
+
 # ----------------------------
+# Render entry point
+# ----------------------------
+@dataclass(frozen=True)
+class RenderOptions:
+    """Everything `video render` takes besides the map key and source video.
+
+    Field names match the CLI flags (dashes as underscores), which is also
+    how `video batch` manifests spell them.
+    """
+
+    audio: Optional[Path] = None
+    tempo: float = 1.0
+    output: Optional[Path] = None
+    method: CaptionMethod = "ass"
+    render_mode: RenderMode = "parts"
+    mp4_layout: Mp4Layout = "standard"
+    rendition: tuple[str, ...] = ()
+    realtime_target: Optional[float] = None
+    draft: bool = False
+    jobs: int = 1
+    part_cache: bool = True
+    part_cache_max_mb: int = PART_CACHE_MAX_MB_DEFAULT
+    cpu_budget: bool = True
+    cpu_budget_cores: Optional[int] = None
+    progress: bool = False
+    timing_report: Optional[Path] = None
+    caption_box: bool = False
+    caption_box_height: int = 260
+    caption_box_alpha: float = 0.75
+    caption_box_width: Optional[int] = None
+    caption_box_align: Literal["left", "center", "right"] = "center"
+    caption_box_margin_bottom: Optional[int] = None
+
+    # Options that change how a render runs but not what it produces.
+    RUNTIME_ONLY = (
+        "jobs",
+        "part_cache",
+        "part_cache_max_mb",
+        "cpu_budget",
+        "cpu_budget_cores",
+        "progress",
+        "timing_report",
+    )
+
+    def output_path(self, video_path: Path) -> Path:
+        suffix = "_draft" if self.draft else "_captioned"
+        return self.output or video_path.with_stem(video_path.stem + suffix)
+
+    def cache_key(self, cache: Any, map_key: str, video_path: Path) -> str:
+        # Drafts live under their own namespace so they never shadow a final.
+        namespace = "video_draft" if self.draft else "video"
+        return cache.make_key(namespace, map_key, self.output_path(video_path).name)
+
+
+def _render_signature(
+    container: AppContainer,
+    segments: list[dict[str, Any]],
+    media: MediaProbe,
+    opts: RenderOptions,
+) -> str:
+    """Identity of a render's inputs and output-affecting options."""
+    settings = {
+        f.name: getattr(opts, f.name)
+        for f in fields(opts)
+        if f.name not in RenderOptions.RUNTIME_ONLY
+    }
+    audio_digest = container.probe.digest(opts.audio) if opts.audio else None
+    return ArtifactStore.make_key(
+        media.digest,
+        audio_digest,
+        json.dumps(segments, ensure_ascii=False, sort_keys=True),
+        json.dumps(settings, default=str, sort_keys=True),
+    )
+
+
+def _load_render_inputs(
+    container: AppContainer, map_key: str, video_path: Path
+) -> tuple[list[dict[str, Any]], MediaProbe]:
+    data = container.cache.get(map_key)
+    if data is None:
+        raise typer.BadParameter("Cache key not found")
+
+    media = container.probe.probe(video_path)
+    segments = _normalize_segments(data)
+    clamped = _clamp_segments(segments, media.duration)
+    if len(clamped) < len(segments):
+        console.print(
+            f"[yellow]Dropped {len(segments) - len(clamped)} segments past the "
+            f"end of the source ({media.duration:.2f}s)[/yellow]"
+        )
+    if not clamped:
+        raise typer.BadParameter("No segments fall inside the source video")
+    return clamped, media
+
+
+def render(
+    container: AppContainer,
+    map_key: str,
+    video_path: Path,
+    opts: RenderOptions = RenderOptions(),
+    trim: bool = True,
+) -> dict[str, Any]:
+    """Render one captioned video, cache its entry and return it.
+
+    With `trim`, the part and caption caches are trimmed to their caps
+    afterwards; `video batch` turns it off and trims once all items finish.
+    """
+    cache = container.cache
+    segments, media = _load_render_inputs(container, map_key, video_path)
+    audio = opts.audio
+    # AAC already fits the MP4 container, so untouched audio is stream-copied.
+    copy_audio = (
+        audio is not None
+        and opts.tempo == 1.0
+        and (container.probe.probe(audio).audio or {}).get("codec_name") == "aac"
+    )
+    # Estimate max line count to align box near the caption area when auto margin is used.
+    max_lines = 1
+    for seg in segments:
+        _, lines = _prepare_wrapped_text(seg["text"])
+        max_lines = max(max_lines, lines)
+
+    rendition_names = list(opts.rendition)
+    unknown = [name for name in rendition_names if name not in RENDITIONS]
+    if unknown:
+        raise typer.BadParameter(
+            f"Unknown rendition {unknown[0]!r}; choose from {', '.join(RENDITIONS)}"
+        )
+    if rendition_names and opts.draft:
+        raise typer.BadParameter("--rendition cannot be combined with --draft")
+    if opts.realtime_target is not None and opts.draft:
+        raise typer.BadParameter("--realtime-target cannot be combined with --draft")
+    if len(rendition_names) > 1 and opts.render_mode != "single":
+        raise typer.BadParameter("Several --rendition values need --render-mode single")
+    render_mode = opts.render_mode
+    if render_mode == "single" and (drift := _single_pass_drift(segments, media)):
+        if len(rendition_names) > 1:
+            raise typer.BadParameter(
+                f"Single-pass render would drift ({drift}); render one "
+                f"--rendition at a time with --render-mode parts"
+            )
+        console.print(
+            f"[yellow]Single-pass render would drift ({drift}); "
+            f"falling back to parts[/yellow]"
+        )
+        render_mode = "parts"
+
+    out = opts.output_path(video_path)
+    if opts.draft:
+        shapes = [("draft", DRAFT_PROFILE)]
+    elif rendition_names:
+        shapes = [(name, RENDITIONS[name]) for name in dict.fromkeys(rendition_names)]
+    else:
+        shapes = [("full", FINAL_PROFILE)]
+
+    auto_margin = max(0, ASS_MARGIN_V + _caption_vertical_offset(max_lines) - 40)
+    src_w, src_h = media.frame_size or (PLAY_RES_X, PLAY_RES_Y)
+    renditions = []
+    for i, (name, shape) in enumerate(shapes):
+        layout = shape.layout(CAPTION_BOX_H_DEFAULT, CAPTION_BOX_PAD_BOTTOM_DEFAULT)
+        box_filter = None
+        if opts.caption_box:
+            margin_bottom = (
+                opts.caption_box_margin_bottom
+                if opts.caption_box_margin_bottom is not None
+                else auto_margin
+            )
+            layout = shape.layout(
+                opts.caption_box_height, opts.caption_box_margin_bottom or 0
+            )
+            box_filter = _build_box_filter(
+                box_h=layout.px(opts.caption_box_height),
+                alpha=opts.caption_box_alpha,
+                box_width=(
+                    layout.px(opts.caption_box_width)
+                    if opts.caption_box_width is not None
+                    else None
+                ),
+                align=opts.caption_box_align,
+                # The box's y resolves from the top edge; shift it so cropped
+                # frames keep it level with the bottom-anchored captions.
+                margin_bottom=layout.px(margin_bottom) - layout.height_delta,
+            )
+        renditions.append(
+            _Rendition(
+                name=name,
+                profile=shape,
+                layout=layout,
+                box_filter=box_filter,
+                output=out if i == 0 else out.with_stem(f"{out.stem}_{name}"),
+                frame_size=shape.output_size(src_w, src_h),
+            )
+        )
+    if opts.realtime_target is not None:
+        renditions = _tune_renditions(
+            cache,
+            renditions,
+            media,
+            opts.realtime_target,
+            jobs=opts.jobs if render_mode != "single" else 1,
+            total_cores=opts.cpu_budget_cores if opts.cpu_budget else None,
+        )
+
+    # Parts and stream modes render the first (only) rendition.
+    primary = renditions[0]
+    profile, layout, box_filter = primary.profile, primary.layout, primary.box_filter
+
+    progress = None
+    if opts.progress:
+        from rich.progress import (
+            BarColumn,
+            Progress,
+            TextColumn,
+            TimeRemainingColumn,
+        )
+
+        progress = Progress(
+            TextColumn("{task.description}"),
+            BarColumn(),
+            TextColumn("{task.percentage:>3.0f}%"),
+            TimeRemainingColumn(),
+            console=console,
+            transient=True,
+        )
+    budget = (
+        CpuBudget(CPU_BUDGET_PATH, opts.cpu_budget_cores) if opts.cpu_budget else None
+    )
+    runner = FFmpegRunner(
+        on_progress=_ProgressView(progress) if progress else None, budget=budget
+    )
+    output_s = sum(seg["end"] - seg["start"] for seg in segments)
+
+    wall_start = time.perf_counter()
+
+    watcher = (
+        FragmentWatcher(
+            [r.output for r in renditions], live=opts.mp4_layout == "fragmented"
+        )
+        if opts.mp4_layout != "standard"
+        else nullcontext()
+    )
+    with tempfile.TemporaryDirectory() as tmp, progress or nullcontext(), watcher:
+        tmp_dir = Path(tmp)
+        if render_mode == "single":
+            _render_single_pass(
+                runner,
+                video_path,
+                segments,
+                tmp_dir,
+                opts.method,
+                renditions,
+                audio,
+                opts.tempo,
+                copy_audio,
+                opts.mp4_layout,
+            )
+        elif render_mode == "stream":
+            _stream_parts(
+                runner,
+                video_path,
+                segments,
+                tmp_dir,
+                opts.method,
+                box_filter,
+                layout,
+                audio,
+                out,
+                profile,
+                opts.jobs,
+                opts.tempo,
+                copy_audio,
+                opts.mp4_layout,
+                primary.frame_size,
+            )
+        else:
+            part_cache = None
+            if opts.part_cache:
+                store = ArtifactStore(
+                    str(PART_CACHE_DIR),
+                    max_bytes=opts.part_cache_max_mb * 1024 * 1024,
+                )
+                part_cache = _PartCache(store, media.digest)
+
+            parts = _render_parts(
+                runner,
+                video_path,
+                segments,
+                tmp_dir,
+                opts.method,
+                box_filter,
+                layout,
+                profile,
+                opts.jobs,
+                part_cache,
+                primary.frame_size,
+            )
+            # Without audio the concat writes the final file itself.
+            merged = _concat(
+                runner,
+                parts,
+                tmp_dir,
+                output_s,
+                out=None if audio else out,
+                mp4_layout=opts.mp4_layout,
+            )
+            if part_cache:
+                if trim:
+                    part_cache.store.evict(keep=parts)
+                console.print(
+                    f"[cyan]Part cache:[/cyan] {part_cache.hits} reused, "
+                    f"{part_cache.misses} encoded"
+                )
+
+            if audio:
+                _mux_audio(
+                    runner,
+                    merged,
+                    audio,
+                    out,
+                    output_s,
+                    opts.tempo,
+                    copy_audio,
+                    opts.mp4_layout,
+                )
+
+    wall_s = time.perf_counter() - wall_start
+    cpu_s = _cpu_seconds(runner)
+    console.print(
+        f"[cyan]Render ({render_mode}, "
+        f"{'+'.join(r.profile.name for r in renditions)}):[/cyan] "
+        f"{len(segments)} segments, wall {wall_s:.2f}s, cpu {cpu_s:.2f}s"
+    )
+    for stage, totals in runner.report()["stages"].items():
+        console.print(
+            f"  {stage}: {totals['count']} runs, wall {totals['wall_s']:.2f}s, "
+            f"cpu {totals['cpu_s']:.2f}s, {totals['frames']} frames, "
+            f"queued {totals['queue_wait_s']:.2f}s"
+        )
+    if opts.timing_report:
+        runner.write_report(
+            opts.timing_report,
+            map_key=map_key,
+            input=str(video_path),
+            output=str(out),
+            profile=profile.name,
+            render_mode=render_mode,
+            renditions=[r.name for r in renditions],
+            tempo=opts.tempo,
+            jobs=opts.jobs,
+            segments=len(segments),
+            output_s=round(output_s, 3),
+            wall_s=round(wall_s, 3),
+            cpu_s=round(cpu_s, 3),
+        )
+
+    if trim and opts.method == "overlay":
+        _caption_store().evict()
+
+    entry = {
+        "input": str(video_path),
+        "output": str(out),
+        "segments": len(segments),
+        "profile": profile.name,
+        "render_mode": render_mode,
+        "mp4_layout": opts.mp4_layout,
+        "tempo": opts.tempo,
+        "outputs": [
+            {
+                "rendition": r.name,
+                "profile": r.profile.name,
+                "output": str(r.output),
+                "bytes": r.output.stat().st_size if r.output.exists() else None,
+            }
+            for r in renditions
+        ],
+        "output_s": round(output_s, 3),
+        "wall_s": round(wall_s, 3),
+        "cpu_s": round(cpu_s, 3),
+        "signature": _render_signature(container, segments, media, opts),
+    }
+    cache.set(opts.cache_key(cache, map_key, video_path), entry)
+    return entry
+
+
+def render_is_current(
+    container: AppContainer, map_key: str, video_path: Path, opts: RenderOptions
+) -> bool:
+    """True when the cached render used the same inputs and its outputs exist."""
+    entry = container.cache.get(opts.cache_key(container.cache, map_key, video_path))
+    if not isinstance(entry, dict) or "signature" not in entry:
+        return False
+    outputs = entry.get("outputs") or [{"output": entry.get("output")}]
+    if not all(o.get("output") and Path(o["output"]).exists() for o in outputs):
+        return False
+    segments, media = _load_render_inputs(container, map_key, video_path)
+    return entry["signature"] == _render_signature(container, segments, media, opts)
+
+
+# ----------------------------
+# Typer commands
+# ----------------------------
+@app.command(name="render")
 def render_video(
     map_key: str = typer.Argument(...),
     video_path: Path = typer.Option(..., "--video", "-v"),
     audio_mp3: Path | None = typer.Option(None, "--audio", "-a"),
+    tempo: float = typer.Option(
+        1.0,
+        "--tempo",
+        min=0.1,
+        max=10.0,
+        help="Speed up (>1) or slow down (<1) --audio while muxing, e.g. 1.4 for the original TTS output",
+    ),
     output: Path | None = typer.Option(None, "--output", "-o"),
-    method: Literal["ass", "drawtext"] = typer.Option("ass"),
+    method: CaptionMethod = typer.Option(
+        "ass",
+        help="ass/drawtext: draw captions during the render; overlay: composite captions pre-rasterised once per text and layout (cached on disk)",
+    ),
+    render_mode: RenderMode = typer.Option(
+        "parts",
+        "--render-mode",
+        help="parts: encode each segment then concat; single: one ffmpeg pass for all captions and audio (falls back to parts for overlapping or out-of-order segments and variable frame rate sources); stream: like parts but piped as MPEG-TS into one mux process, no intermediate files or part cache",
+    ),
+    mp4_layout: Mp4Layout = typer.Option(
+        "standard",
+        "--mp4-layout",
+        help="fragmented: fragmented MP4 with a live <output>.fragments.json listing finished byte ranges, so uploads can start mid-render; faststart: moov at the front (sidecar written when done)",
+    ),
+    rendition_names: Optional[list[str]] = typer.Option(
+        None,
+        "--rendition",
+        help=f"Output shape, repeatable ({', '.join(RENDITIONS)}); extra renditions are written next to --output with the rendition name appended. Single mode only",
+    ),
+    realtime_target: Optional[float] = typer.Option(
+        None,
+        "--realtime-target",
+        min=0.01,
+        help="Use the best-quality x264 settings from `video calibrate` that render at least this many times realtime",
+    ),
+    draft: bool = typer.Option(
+        False,
+        "--draft",
+        help="Fast low-resolution proxy for caption review (same layout as final)",
+    ),
+    jobs: int = typer.Option(
+        1,
+        "--jobs",
+        "-j",
+        min=1,
+        help="Parts rendered concurrently in --render-mode parts/stream",
+    ),
+    part_cache_enabled: bool = typer.Option(
+        True,
+        "--part-cache/--no-part-cache",
+        help="Reuse unchanged encoded parts from earlier renders (parts mode)",
+    ),
+    part_cache_max_mb: int = typer.Option(
+        PART_CACHE_MAX_MB_DEFAULT,
+        "--part-cache-max-mb",
+        min=1,
+        help="Size cap for the part cache; least recently used parts are evicted",
+    ),
+    cpu_budget_enabled: bool = typer.Option(
+        True,
+        "--cpu-budget/--no-cpu-budget",
+        help="Queue ffmpeg jobs behind a machine-wide core budget shared by all renders",
+    ),
+    cpu_budget_cores: Optional[int] = typer.Option(
+        None,
+        "--cpu-budget-cores",
+        min=1,
+        help="Cores in the machine-wide budget (default: all cores)",
+    ),
+    show_progress: bool = typer.Option(
+        False, "--progress", help="Show a live progress bar for ffmpeg jobs"
+    ),
+    timing_report: Optional[Path] = typer.Option(
+        None,
+        "--timing-report",
+        help="Write per-ffmpeg-invocation timings for this render as JSON",
+    ),
     caption_box: bool = typer.Option(
         False,
         "--caption-box/--no-caption-box",
@@ -447,55 +1854,240 @@ def render_video(
     ),
     ctx: typer.Context = typer.Option(None, hidden=True),
 ):
+    """Burn the captions of a map cache entry into a video."""
     if not isinstance(ctx.obj, AppContainer):
         raise typer.BadParameter("App container not initialized")
 
-    cache = ctx.obj.cache
-    data = cache.get(map_key)
-    if data is None:
-        raise typer.BadParameter("Cache key not found")
+    render(
+        ctx.obj,
+        map_key,
+        video_path,
+        RenderOptions(
+            audio=audio_mp3,
+            tempo=tempo,
+            output=output,
+            method=method,
+            render_mode=render_mode,
+            mp4_layout=mp4_layout,
+            rendition=tuple(rendition_names or ()),
+            realtime_target=realtime_target,
+            draft=draft,
+            jobs=jobs,
+            part_cache=part_cache_enabled,
+            part_cache_max_mb=part_cache_max_mb,
+            cpu_budget=cpu_budget_enabled,
+            cpu_budget_cores=cpu_budget_cores,
+            progress=show_progress,
+            timing_report=timing_report,
+            caption_box=caption_box,
+            caption_box_height=caption_box_height,
+            caption_box_alpha=caption_box_alpha,
+            caption_box_width=caption_box_width,
+            caption_box_align=caption_box_align,
+            caption_box_margin_bottom=caption_box_margin_bottom,
+        ),
+    )
 
-    segments = _normalize_segments(data)
-    # Estimate max line count to align box near the caption area when auto margin is used.
-    max_lines = 1
-    for seg in segments:
-        _, lines = _prepare_wrapped_text(seg["text"])
-        max_lines = max(max_lines, lines)
 
-    global _ACTIVE_CAPTION_BOX_H, _ACTIVE_CAPTION_BOX_PAD_BOTTOM
-    _ACTIVE_CAPTION_BOX_H = CAPTION_BOX_H_DEFAULT
-    _ACTIVE_CAPTION_BOX_PAD_BOTTOM = CAPTION_BOX_PAD_BOTTOM_DEFAULT
-
-    out = output or video_path.with_stem(video_path.stem + "_captioned")
-    box_filter = None
-    if caption_box:
-        auto_margin = max(0, ASS_MARGIN_V + _caption_vertical_offset(max_lines) - 40)
-        margin_bottom = (
-            caption_box_margin_bottom
-            if caption_box_margin_bottom is not None
-            else auto_margin
-        )
-        _ACTIVE_CAPTION_BOX_H = caption_box_height
-        _ACTIVE_CAPTION_BOX_PAD_BOTTOM = caption_box_margin_bottom or 0
-        box_filter = _build_box_filter(
-            box_h=caption_box_height,
-            alpha=caption_box_alpha,
-            box_width=caption_box_width,
-            align=caption_box_align,
-            margin_bottom=margin_bottom,
-        )
+@app.command(name="calibrate")
+def calibrate_encoder(
+    presets: Optional[list[str]] = typer.Option(
+        None,
+        "--preset",
+        help=f"x264 preset to try, repeatable (default: {', '.join(X264_PRESETS[:6])})",
+    ),
+    crfs: Optional[list[int]] = typer.Option(
+        None, "--crf", help="CRF to try, repeatable (default: 20, 23, 26)"
+    ),
+    threads: Optional[list[int]] = typer.Option(
+        None,
+        "--threads",
+        help="Encoder thread count to try, repeatable (default: all cores and half)",
+    ),
+    duration: float = typer.Option(
+        5.0, "--duration", min=1.0, help="Length of the synthetic clip (seconds)"
+    ),
+    fps: int = typer.Option(30, "--fps", min=1),
+    cpu_budget_enabled: bool = typer.Option(
+        True,
+        "--cpu-budget/--no-cpu-budget",
+        help="Wait for the machine-wide core budget like renders do",
+    ),
+    ctx: typer.Context = typer.Option(None, hidden=True),
+):
+    """Benchmark x264 settings on this host and cache fps/bitrate per setting."""
+    if not isinstance(ctx.obj, AppContainer):
+        raise typer.BadParameter("App container not initialized")
 
+    unknown = [p for p in presets or [] if p not in X264_PRESETS]
+    if unknown:
+        raise typer.BadParameter(
+            f"Unknown preset {unknown[0]!r}; choose from {', '.join(X264_PRESETS)}"
+        )
+    cores = os.cpu_count() or 1
+    runner = FFmpegRunner(
+        budget=CpuBudget(CPU_BUDGET_PATH) if cpu_budget_enabled else None
+    )
     with tempfile.TemporaryDirectory() as tmp:
-        tmp_dir = Path(tmp)
-        parts = _render_parts(video_path, segments, tmp_dir, method, box_filter)
-        merged = _concat(parts, tmp_dir)
+        result = calibrate(
+            runner,
+            Path(tmp),
+            width=PLAY_RES_X,
+            height=PLAY_RES_Y,
+            fps=fps,
+            duration=duration,
+            presets=presets or X264_PRESETS[:6],
+            crfs=crfs or [20, 23, 26],
+            threads=threads or sorted({cores, max(1, cores // 2)}),
+        )
 
-        if audio_mp3:
-            _mux_audio(merged, audio_mp3, out)
-        else:
-            merged.replace(out)
+    table = Table(title=f"x264 on {result.host} ({result.cpu_count} cores)")
+    for column in ("preset", "crf", "threads", "fps", "x realtime", "kbps"):
+        table.add_column(column, justify="right")
+    for t in result.trials:
+        table.add_row(
+            t.preset,
+            str(t.crf),
+            str(t.threads),
+            f"{t.fps:.1f}",
+            f"{t.speed:.2f}",
+            f"{t.kbps:.0f}",
+        )
+    console.print(table)
 
-    cache.set(
-        cache.make_key("video", map_key, out.name),
-        {"input": str(video_path), "output": str(out), "segments": len(segments)},
+    cache = ctx.obj.cache
+    key = _calibration_key(cache, result.width, result.height)
+    cache.set(key, result.to_dict())
+    print(key)
+
+
+def _batch_item(
+    line: dict[str, Any], base_dir: Path
+) -> tuple[str, Path, RenderOptions]:
+    """Parse one manifest line; relative paths resolve against the manifest."""
+
+    def path(value: Any) -> Optional[Path]:
+        if value in (None, ""):
+            return None
+        p = Path(value)
+        return p if p.is_absolute() else base_dir / p
+
+    known = {f.name for f in fields(RenderOptions)}
+    raw_options = line.get("options") or {}
+    options = {key.replace("-", "_"): value for key, value in raw_options.items()}
+    unknown = sorted(set(options) - known)
+    if unknown:
+        raise ValueError(f"Unknown option {unknown[0]!r}")
+    # Same choices the render command offers; RenderOptions doesn't check.
+    for f in fields(RenderOptions):
+        if get_origin(f.type) is Literal and f.name in options:
+            choices = get_args(f.type)
+            if options[f.name] not in choices:
+                raise ValueError(
+                    f"Option {f.name!r} must be one of {', '.join(choices)}, "
+                    f"not {options[f.name]!r}"
+                )
+    if "rendition" in options:
+        value = options["rendition"]
+        options["rendition"] = (value,) if isinstance(value, str) else tuple(value)
+    if "timing_report" in options:
+        options["timing_report"] = path(options["timing_report"])
+    for key in ("audio", "output"):
+        if key in line:
+            options[key] = path(line[key])
+
+    map_key, video = line.get("map_key"), path(line.get("video"))
+    if not map_key or video is None:
+        raise ValueError("Each line needs map_key and video")
+    return str(map_key), video, RenderOptions(**options)
+
+
+@app.command(name="batch")
+def render_batch(
+    manifest: Path = typer.Argument(
+        ...,
+        help="JSONL, one render per line: {map_key, video, audio?, output?, options?}; options use the render flag names",
+    ),
+    workers: int = typer.Option(
+        2, "--workers", "-w", min=1, help="Videos rendered concurrently"
+    ),
+    report: Optional[Path] = typer.Option(
+        None,
+        "--report",
+        help="Per-item results as JSONL (default: <manifest>.report.jsonl)",
+    ),
+    force: bool = typer.Option(
+        False, "--force", help="Render even when the cached render is current"
+    ),
+    ctx: typer.Context = typer.Option(None, hidden=True),
+):
+    """Render every line of a manifest in one process over a worker pool."""
+    if not isinstance(ctx.obj, AppContainer):
+        raise typer.BadParameter("App container not initialized")
+    if not manifest.exists():
+        raise typer.BadParameter(f"File not found: {manifest}")
+
+    container: AppContainer = ctx.obj
+    report = report or manifest.with_suffix(".report.jsonl")
+    lines = [
+        (number, raw)
+        for number, raw in enumerate(
+            manifest.read_text(encoding="utf-8").splitlines(), start=1
+        )
+        if raw.strip()
+    ]
+    lock = threading.Lock()
+    counts = {"rendered": 0, "skipped": 0, "failed": 0}
+    attempted: list[RenderOptions] = []
+
+    def run(number: int, raw: str) -> None:
+        result: dict[str, Any] = {"line": number}
+        started = time.perf_counter()
+        try:
+            map_key, video, opts = _batch_item(json.loads(raw), manifest.parent)
+            # Items run side by side; live bars would interleave.
+            opts = replace(opts, progress=False)
+            result.update(map_key=map_key, output=str(opts.output_path(video)))
+            if not force and render_is_current(container, map_key, video, opts):
+                result["status"] = "skipped"
+            else:
+                with lock:
+                    attempted.append(opts)
+                # Trimming now could delete a part or caption PNG another
+                # item is about to reuse; the caches are trimmed after the pool.
+                entry = render(container, map_key, video, opts, trim=False)
+                result.update(
+                    status="rendered",
+                    render_wall_s=entry["wall_s"],
+                    output_s=entry["output_s"],
+                )
+        except Exception as exc:
+            result.update(status="failed", error=f"{type(exc).__name__}: {exc}")
+        result["wall_s"] = round(time.perf_counter() - started, 3)
+
+        with lock:
+            counts[result["status"]] += 1
+            with open(report, "a", encoding="utf-8") as f:
+                f.write(json.dumps(result, ensure_ascii=False) + "\n")
+        if result["status"] == "failed":
+            console.print(f"[red]Line {number} failed:[/red] {result['error']}")
+
+    report.parent.mkdir(parents=True, exist_ok=True)
+    report.write_text("", encoding="utf-8")
+    wall_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(lambda item: run(*item), lines))
+    part_caps = [opts.part_cache_max_mb for opts in attempted if opts.part_cache]
+    if part_caps:
+        max_bytes = min(part_caps) * 1024 * 1024
+        ArtifactStore(str(PART_CACHE_DIR), max_bytes=max_bytes).evict()
+    if any(opts.method == "overlay" for opts in attempted):
+        _caption_store().evict()
+
+    console.print(
+        f"[cyan]Batch:[/cyan] {counts['rendered']} rendered, "
+        f"{counts['skipped']} skipped, {counts['failed']} failed in "
+        f"{time.perf_counter() - wall_start:.2f}s; report at {report}"
     )
+    if counts["failed"]:
+        raise typer.Exit(code=1)
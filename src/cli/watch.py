@@ -0,0 +1,317 @@
+import json
+import math
+import os
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Optional
+
+import typer
+from rich.console import Console
+
+from src.application.service.artifacts import file_digest
+from src.application.service.watcher import (
+    OUTPUT_MARKERS,
+    FolderWatcher,
+    ReadyFile,
+    is_candidate,
+)
+from src.cli.container import AppContainer
+from src.cli.pipeline import PipelineOptions, run_pipeline
+from src.cli.video import RENDITIONS
+
+console = Console(stderr=True, legacy_windows=False)
+
+# Latencies kept for the published percentiles.
+LATENCY_WINDOW = 200
+# Extra renditions land next to the rendered video as <stem>_<name>.
+RENDITION_MARKERS = tuple(
+    f"{marker}_{name}"
+    for marker in ("_captioned", "_draft")
+    for name in list(RENDITIONS)[1:]
+)
+
+
+def _accept(path: Path) -> bool:
+    return is_candidate(path, markers=OUTPUT_MARKERS + RENDITION_MARKERS)
+
+
+def _percentile(ordered: list[float], q: float) -> Optional[float]:
+    """Nearest-rank percentile of an ascending list."""
+    if not ordered:
+        return None
+    return round(ordered[max(0, math.ceil(q * len(ordered)) - 1)], 2)
+
+
+@dataclass
+class WatchJob:
+    path: Path
+    digest: str
+    detected_at: float
+    settle_s: float
+    queued_at: float = field(default_factory=time.monotonic)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    video_key: Optional[str] = None
+    error: Optional[str] = None
+
+    @property
+    def latency_s(self) -> float:
+        """Detection to finish: settle + queue wait + pipeline run."""
+        return (self.finished_at or time.monotonic()) - self.detected_at
+
+
+class WatchStats:
+    """Counters and latencies shared by the watcher and workers."""
+
+    def __init__(self, workers: int, mode: str, path: Optional[Path]) -> None:
+        self._lock = threading.Lock()
+        self._publish_lock = threading.Lock()
+        self._path = path
+        self._started = time.time()
+        self.mode = mode
+        self.workers = workers
+        self.queued = 0
+        self.running = 0
+        self.done = 0
+        self.failed = 0
+        self.skipped = 0
+        self._latencies: list[float] = []
+        self._recent: list[dict[str, Any]] = []
+
+    def update(self, job: Optional[WatchJob] = None, **deltas: int) -> None:
+        with self._lock:
+            for name, delta in deltas.items():
+                setattr(self, name, getattr(self, name) + delta)
+            if job is not None and job.finished_at is not None:
+                self._latencies = self._latencies[-LATENCY_WINDOW + 1 :]
+                self._latencies.append(job.latency_s)
+                self._recent = self._recent[-19:]
+                self._recent.append(
+                    {
+                        "path": str(job.path),
+                        "video_key": job.video_key,
+                        "error": job.error,
+                        "settle_s": round(job.settle_s, 2),
+                        "wait_s": round((job.started_at or 0) - job.queued_at, 2),
+                        "run_s": round(job.finished_at - (job.started_at or 0), 2),
+                        "latency_s": round(job.latency_s, 2),
+                    }
+                )
+        self.publish()
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            latencies = sorted(self._latencies)
+            return {
+                "mode": self.mode,
+                "workers": self.workers,
+                "queue_depth": self.queued,
+                "running": self.running,
+                "done": self.done,
+                "failed": self.failed,
+                "skipped": self.skipped,
+                "latency_p50_s": _percentile(latencies, 0.5),
+                "latency_p95_s": _percentile(latencies, 0.95),
+                "uptime_s": round(time.time() - self._started, 1),
+                "recent": list(self._recent),
+            }
+
+    def publish(self) -> None:
+        """Rewrite the stats file atomically, so readers never see half of it."""
+        if self._path is None:
+            return
+        with self._publish_lock:
+            tmp = self._path.with_name(f"{self._path.name}.{os.getpid()}.tmp")
+            tmp.write_text(json.dumps(self.snapshot(), indent=2), encoding="utf-8")
+            os.replace(tmp, self._path)
+
+
+def _work(
+    container: AppContainer,
+    opts: PipelineOptions,
+    jobs: "queue.Queue[Optional[WatchJob]]",
+    inflight: set[str],
+    inflight_lock: threading.Lock,
+    stats: WatchStats,
+) -> None:
+    while (job := jobs.get()) is not None:
+        job.started_at = time.monotonic()
+        stats.update(queued=-1, running=1)
+        console.print(
+            f"[cyan]start[/cyan] {job.path.name} "
+            f"(waited {job.started_at - job.queued_at:.1f}s)"
+        )
+        try:
+            result = run_pipeline(container, job.path, opts)
+            job.video_key = result.video_key
+            container.cache.set(
+                container.cache.make_key("watch", job.digest),
+                {"path": str(job.path), "video_key": job.video_key},
+            )
+        except BaseException as exc:
+            job.error = repr(exc)
+        finally:
+            job.finished_at = time.monotonic()
+            with inflight_lock:
+                inflight.discard(job.digest)
+
+        if job.error is None:
+            stats.update(job, running=-1, done=1)
+            console.print(
+                f"[green]done[/green] {job.path.name} in {job.latency_s:.1f}s "
+                f"(settle {job.settle_s:.1f}s, "
+                f"run {job.finished_at - job.started_at:.1f}s)"
+            )
+            print(job.video_key, flush=True)
+        else:
+            stats.update(job, running=-1, failed=1)
+            console.print(f"[red]failed[/red] {job.path.name}: {job.error}")
+
+
+def watch(
+    directory: Path = typer.Argument(
+        ..., exists=True, file_okay=False, help="Folder new videos land in"
+    ),
+    workers: int = typer.Option(
+        2, "--workers", "-w", min=1, help="Videos processed concurrently"
+    ),
+    max_queue: int = typer.Option(
+        100, "--max-queue", min=1, help="Ready videos held before the watcher waits"
+    ),
+    settle: float = typer.Option(
+        2.0, "--settle", min=0.0, help="Seconds a file must stop changing"
+    ),
+    poll: float = typer.Option(0.5, "--poll", min=0.05, help="Check interval"),
+    existing: bool = typer.Option(
+        False, "--existing", help="Also process videos already in the folder"
+    ),
+    polling: bool = typer.Option(False, "--polling", help="Don't use inotify"),
+    source_language: str = typer.Option("zh", "--from", "-f"),
+    target_language: str = typer.Option("vi", "--to", "-t"),
+    voice: str = typer.Option(
+        PipelineOptions.voice, "--voice", help="ElevenLabs voice id"
+    ),
+    tempo: float = typer.Option(PipelineOptions.tempo, "--tempo", min=0.1, max=10.0),
+    stats_path: Optional[Path] = typer.Option(
+        None, "--stats", help="Keep queue depth and latencies in this JSON file"
+    ),
+    ctx: typer.Context = typer.Option(None, hidden=True),
+):
+    """Run `pipeline run` on every new video dropped into DIRECTORY.
+
+    A file is picked up once its size stops changing; files with content
+    already processed (by hash) and the pipeline's own outputs are skipped.
+    Prints each finished video's cache key. Stop with Ctrl-C; videos in
+    progress finish first.
+    """
+    if not isinstance(ctx.obj, AppContainer):
+        raise typer.BadParameter("App container not initialized")
+
+    container = ctx.obj
+    opts = PipelineOptions(
+        source_language=source_language,
+        target_language=target_language,
+        voice=voice,
+        tempo=tempo,
+    )
+    watcher = FolderWatcher(
+        directory.resolve(),
+        settle_s=settle,
+        poll_s=poll,
+        include_existing=existing,
+        use_inotify=not polling,
+        accept=_accept,
+    )
+    stop = threading.Event()
+    jobs: queue.Queue[Optional[WatchJob]] = queue.Queue(maxsize=max_queue)
+    inflight: set[str] = set()
+    inflight_lock = threading.Lock()
+    stats = WatchStats(workers, "starting", stats_path)
+    threads = [
+        threading.Thread(
+            target=_work,
+            args=(container, opts, jobs, inflight, inflight_lock, stats),
+            name=f"watch-worker-{i}",
+            daemon=True,
+        )
+        for i in range(workers)
+    ]
+    for thread in threads:
+        thread.start()
+
+    def enqueue(ready: ReadyFile) -> None:
+        try:
+            digest = file_digest(ready.path)
+        except FileNotFoundError:
+            return
+        seen = container.cache.get(container.cache.make_key("watch", digest))
+        with inflight_lock:
+            duplicate = seen is not None or digest in inflight
+            if not duplicate:
+                inflight.add(digest)
+        if duplicate:
+            stats.update(skipped=1)
+            reason = (
+                f"already processed as {seen['path']}"
+                if seen
+                else "same content as a queued video"
+            )
+            console.print(f"[yellow]skip[/yellow] {ready.path.name}: {reason}")
+            return
+
+        job = WatchJob(ready.path, digest, ready.detected_at, ready.settle_s)
+        stats.update(queued=1)
+        snapshot = stats.snapshot()
+        console.print(
+            f"[cyan]queued[/cyan] {ready.path.name} "
+            f"(settled {ready.settle_s:.1f}s; queue {snapshot['queue_depth']}, "
+            f"running {snapshot['running']})"
+        )
+        # Backpressure: a full queue holds the watcher, not an unbounded list.
+        queued = False
+        try:
+            while not stop.is_set() and not queued:
+                try:
+                    jobs.put(job, timeout=0.5)
+                    queued = True
+                except queue.Full:
+                    continue
+        finally:
+            if not queued:
+                # No worker will see this job, so nothing else clears it.
+                with inflight_lock:
+                    inflight.discard(digest)
+                stats.update(queued=-1)
+
+    try:
+        with watcher:
+            stats.mode = watcher.mode
+            stats.publish()
+            console.print(
+                f"[green]Watching {watcher.directory}[/green] "
+                f"({watcher.mode}, {workers} workers)"
+            )
+            for ready in watcher.watch(stop):
+                enqueue(ready)
+    except KeyboardInterrupt:
+        console.print("[yellow]Stopping; waiting for videos in progress[/yellow]")
+    finally:
+        stop.set()
+        # Drop what hasn't started; workers exit after their current video.
+        while True:
+            try:
+                dropped = jobs.get_nowait()
+            except queue.Empty:
+                break
+            if dropped is not None:
+                stats.update(queued=-1)
+        for _ in threads:
+            jobs.put(None)
+        for thread in threads:
+            thread.join()
+        summary = stats.snapshot()
+        del summary["recent"]
+        console.print_json(json.dumps(summary))
@@ -4,6 +4,8 @@ from openai import OpenAI
 
 from src.domain.core.translator import Translator
 
+SYSTEM_PROMPT = "You are a precise translator. Keep meaning and tone."
+
 
 class OpenAITranslator(Translator):
     """Translate text using OpenAI chat completions."""
@@ -18,14 +20,11 @@ class OpenAITranslator(Translator):
         target_language: str,
         source_language: Optional[str] = None,
     ) -> str:
-        prompt = self._build_prompt(text, target_language, source_language)
+        prompt = self.build_prompt(text, target_language, source_language)
         response = self._client.chat.completions.create(
             model=self._model,
             messages=[
-                {
-                    "role": "system",
-                    "content": "You are a precise translator. Keep meaning and tone.",
-                },
+                {"role": "system", "content": SYSTEM_PROMPT},
                 {"role": "user", "content": prompt},
             ],
         )
@@ -49,8 +48,9 @@ class OpenAITranslator(Translator):
     #   [short pause], [pause], [long pause]
     #   và thỉnh thoảng dùng: [rushed] hoặc [drawn out] khi cần nhấn mạnh một câu/đoạn.
 
-    def _build_prompt(
-        self, text: str, target_language: str, source_language: Optional[str]
+    @staticmethod
+    def build_prompt(
+        text: str, target_language: str, source_language: Optional[str]
     ) -> str:
         if source_language:
             return f"""
@@ -1,4 +1,14 @@
-from .cli.app import app
+import sys
+
+from .cli.daemon_client import forward
 
 if __name__ == "__main__":
+    # With PMEDIA_DAEMON set, hand the command to a warm `serve` daemon; the
+    # CLI is only imported when it has to run here.
+    exit_code = forward(sys.argv[1:])
+    if exit_code is not None:
+        sys.exit(exit_code)
+
+    from .cli.app import app
+
     app()
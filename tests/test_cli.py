@@ -0,0 +1,36 @@
+"""Every CLI module builds into a click command.
+
+Typer only inspects a command's signature when the app is built, so a
+decorator on the wrong function surfaces here rather than at run time.
+"""
+
+from importlib import import_module
+
+import pytest
+import typer
+import typer.main
+from typer._click import Context
+from typer.core import TyperGroup
+
+from src.cli.app import COMMANDS, app
+
+MODULES = sorted({target.partition(":")[0] for target in COMMANDS.values()})
+
+
+@pytest.mark.parametrize("module", MODULES)
+def test_sub_app_builds(module: str) -> None:
+    sub_app = getattr(import_module(module), "app", None)
+    if not isinstance(sub_app, typer.Typer):
+        pytest.skip(f"{module} has no sub-app")
+    command = typer.main.get_command(sub_app)
+    if isinstance(command, TyperGroup):
+        for name in command.list_commands(Context(command)):
+            assert command.get_command(Context(command), name) is not None
+
+
+@pytest.mark.parametrize("name", sorted(COMMANDS))
+def test_root_command_resolves(name: str) -> None:
+    root = typer.main.get_command(app)
+    assert isinstance(root, TyperGroup)
+    command = root.get_command(Context(root), name)
+    assert command is not None and command.name == name
@@ -0,0 +1,294 @@
+"""JobQueue under concurrent `queue work` workers sharing one sqlite file.
+
+Worker processes run the real worker loop (src.cli.jobqueue._work) with a
+test-only "record" stage that logs every execution, so a job that ran twice
+or never shows up in the log rather than only in the table.
+"""
+
+import json
+import multiprocessing
+import os
+import signal
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+
+from src.application.service.jobqueue import LANES, JobQueue
+
+LEASE_S = 1.0
+POLL_S = 0.05
+
+spawn = multiprocessing.get_context("spawn")
+
+
+def _record(log: str, values: dict[str, Any]) -> str:
+    """Stage body: log the run, optionally hang once or fail, return n."""
+    with open(log, "a", encoding="utf-8") as f:
+        f.write(f"start {values['n']} {os.getpid()}\n")
+    marker = values["hang_once"]
+    if marker and not os.path.exists(marker):
+        Path(marker).touch()
+        time.sleep(3600)
+    if values["fail"]:
+        raise RuntimeError(f"job {values['n']} failed")
+    time.sleep(values["sleep_s"])
+    with open(log, "a", encoding="utf-8") as f:
+        f.write(f"end {values['n']} {os.getpid()}\n")
+    return str(values["n"])
+
+
+def _worker(path: str, log: str, drain: bool) -> None:
+    from src.cli import jobqueue as cli
+
+    cli.STAGES["record"] = cli.Stage(
+        ("n",),
+        lambda _container, values: _record(log, values),
+        {"hang_once": None, "fail": False, "sleep_s": 0.0},
+    )
+    jobs = JobQueue(Path(path), lease_s=LEASE_S, backoff_s=0.05)
+    # The record stage never touches the container.
+    container: Any = None
+    cli._work(container, jobs, LANES, POLL_S, drain, threading.Event())
+
+
+def _start(path: Path, log: Path, drain: bool = True) -> Any:
+    process = spawn.Process(target=_worker, args=(str(path), str(log), drain))
+    process.start()
+    return process
+
+
+def _runs(log: Path, event: str) -> Counter:
+    if not log.exists():
+        return Counter()
+    lines = log.read_text(encoding="utf-8").splitlines()
+    return Counter(int(line.split()[1]) for line in lines if line.startswith(event))
+
+
+def _status(jobs: JobQueue, job_id: int) -> str:
+    job = jobs.get(job_id)
+    return job.status if job else "missing"
+
+
+def _wait_for(condition: Any, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("timed out")
+        time.sleep(POLL_S)
+
+
+@pytest.fixture
+def queue_path(tmp_path: Path) -> Path:
+    return tmp_path / "queue.sqlite3"
+
+
+def test_concurrent_workers_run_every_job_exactly_once(
+    queue_path: Path, tmp_path: Path
+) -> None:
+    jobs = JobQueue(queue_path, lease_s=LEASE_S)
+    ids = {
+        jobs.enqueue("record", {"n": n, "sleep_s": 0.01}, lane=LANES[n % 2]): n
+        for n in range(120)
+    }
+    log = tmp_path / "runs.log"
+
+    workers = [_start(queue_path, log) for _ in range(4)]
+    for worker in workers:
+        worker.join(timeout=120)
+        assert worker.exitcode == 0
+
+    assert _runs(log, "start") == Counter(ids.values())
+    assert _runs(log, "end") == Counter(ids.values())
+    for job_id, n in ids.items():
+        job = jobs.get(job_id)
+        assert job is not None
+        assert (job.status, job.attempts, job.result) == ("done", 1, str(n))
+
+
+def test_job_of_killed_worker_is_released_once_its_lease_expires(
+    queue_path: Path, tmp_path: Path
+) -> None:
+    jobs = JobQueue(queue_path, lease_s=LEASE_S)
+    marker = tmp_path / "hung"
+    job_id = jobs.enqueue("record", {"n": 7, "hang_once": str(marker)})
+    log = tmp_path / "runs.log"
+
+    first = _start(queue_path, log, drain=False)
+    _wait_for(marker.exists)
+    leased = jobs.get(job_id)
+    assert leased is not None and leased.status == "leased"
+    # The heartbeat keeps a live worker's lease well past lease_s.
+    time.sleep(LEASE_S * 2)
+    assert jobs.lease("someone-else") is None
+    os.kill(first.pid, signal.SIGKILL)
+    first.join()
+
+    second = _start(queue_path, log, drain=False)
+    try:
+        _wait_for(lambda: _status(jobs, job_id) == "done")
+    finally:
+        second.kill()
+        second.join()
+
+    job = jobs.get(job_id)
+    assert job is not None
+    assert (job.status, job.attempts, job.result) == ("done", 2, "7")
+    assert _runs(log, "start")[7] == 2
+    assert _runs(log, "end")[7] == 1
+
+
+def test_expired_owner_cannot_complete_or_renew(queue_path: Path) -> None:
+    jobs = JobQueue(queue_path, lease_s=0.1)
+    job_id = jobs.enqueue("record", {"n": 1})
+    first = jobs.lease("a")
+    assert first is not None and first.id == job_id
+    time.sleep(0.2)
+
+    second = jobs.lease("b")
+    assert second is not None and second.id == job_id
+    assert second.error == "lease of a expired"
+    assert not jobs.heartbeat(job_id, "a")
+    assert not jobs.complete(job_id, "a", "stale")
+    assert jobs.fail(job_id, "a", "stale") is None
+    assert jobs.complete(job_id, "b", "fresh")
+
+    job = jobs.get(job_id)
+    assert job is not None and (job.status, job.result) == ("done", "fresh")
+
+
+def test_failed_attempts_back_off_exponentially(queue_path: Path) -> None:
+    jobs = JobQueue(
+        queue_path, lease_s=LEASE_S, max_attempts=5, backoff_s=0.2, max_backoff_s=0.5
+    )
+    job_id = jobs.enqueue("record", {"n": 1})
+    delays = []
+    for _ in range(4):
+        leased = jobs.lease("w")
+        assert leased is not None and leased.id == job_id
+        assert jobs.fail(job_id, "w", "boom") == "queued"
+        job = jobs.get(job_id)
+        assert job is not None
+        delays.append(round(job.run_after - job.updated_at, 3))
+        # Not ready again until the backoff has passed.
+        assert jobs.lease("w") is None
+        time.sleep(delays[-1] + 0.05)
+
+    assert delays == [0.2, 0.4, 0.5, 0.5]
+
+
+def test_job_is_dead_lettered_after_max_attempts_and_can_be_retried(
+    queue_path: Path,
+) -> None:
+    jobs = JobQueue(queue_path, lease_s=LEASE_S, max_attempts=2, backoff_s=0.0)
+    job_id = jobs.enqueue("record", {"n": 1})
+    for expected in ("queued", "dead"):
+        assert jobs.lease("w") is not None
+        assert jobs.fail(job_id, "w", "boom") == expected
+    assert jobs.lease("w") is None
+
+    job = jobs.get(job_id)
+    assert job is not None
+    assert (job.status, job.attempts, job.error) == ("dead", 2, "boom")
+    assert jobs.snapshot()["lanes"]["interactive"]["dead"] == 1
+
+    assert jobs.retry(job_id)
+    assert not jobs.retry(job_id)
+    leased = jobs.lease("w")
+    assert leased is not None and (leased.id, leased.attempts) == (job_id, 1)
+
+
+def test_permanent_failure_skips_remaining_attempts(queue_path: Path) -> None:
+    jobs = JobQueue(queue_path, lease_s=LEASE_S, max_attempts=3)
+    job_id = jobs.enqueue("record", {"n": 1})
+    assert jobs.lease("w") is not None
+    assert jobs.fail(job_id, "w", "bad input", retry=False) == "dead"
+
+
+def test_expired_lease_without_attempts_left_is_dead_lettered(
+    queue_path: Path,
+) -> None:
+    jobs = JobQueue(queue_path, lease_s=0.1, max_attempts=1)
+    job_id = jobs.enqueue("record", {"n": 1})
+    assert jobs.lease("a") is not None
+    time.sleep(0.2)
+
+    assert jobs.lease("b") is None
+    job = jobs.get(job_id)
+    assert job is not None
+    assert (job.status, job.error) == ("dead", "lease of a expired")
+
+
+def test_failing_worker_retries_then_dead_letters(
+    queue_path: Path, tmp_path: Path
+) -> None:
+    jobs = JobQueue(queue_path, lease_s=LEASE_S, max_attempts=3)
+    job_id = jobs.enqueue("record", {"n": 3, "fail": True})
+    log = tmp_path / "runs.log"
+
+    worker = _start(queue_path, log, drain=False)
+    try:
+        _wait_for(lambda: _status(jobs, job_id) == "dead")
+    finally:
+        worker.kill()
+        worker.join()
+
+    job = jobs.get(job_id)
+    assert job is not None
+    assert (job.attempts, job.error) == (3, "job 3 failed")
+    assert _runs(log, "start")[3] == 3
+
+
+def test_submitted_pipeline_job_without_options_runs_with_defaults(
+    queue_path: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    from typer.testing import CliRunner
+
+    from src.application.service.cache import DiskCache
+    from src.cli import jobqueue as cli
+    from src.cli.pipeline import PipelineOptions
+
+    video = tmp_path / "clip.mp4"
+    video.touch()
+    monkeypatch.setattr(cli, "QUEUE_PATH", queue_path)
+    submitted = CliRunner().invoke(
+        cli.app, ["submit", "pipeline"], input=json.dumps({"video": str(video)})
+    )
+    assert submitted.exit_code == 0, submitted.output
+    job_id = int(submitted.stdout.strip())
+
+    jobs = JobQueue(queue_path, lease_s=LEASE_S, backoff_s=0.0)
+    queued = jobs.get(job_id)
+    assert queued is not None and queued.payload["job_id"]
+
+    calls: list[tuple[str, Any]] = []
+
+    def run_pipeline(container: Any, path: Path, opts: Any, manifest_id: str) -> Any:
+        calls.append(("run", (path, opts, manifest_id)))
+        # The first attempt leaves a manifest behind and fails.
+        manifests[manifest_id] = SimpleNamespace(failed_stage=lambda: None)
+        raise ConnectionError("provider timed out")
+
+    def resume_pipeline(container: Any, manifest_id: str) -> Any:
+        calls.append(("resume", manifest_id))
+        return SimpleNamespace(video_key="video:done")
+
+    manifests: dict[str, Any] = {}
+    monkeypatch.setattr(cli, "run_pipeline", run_pipeline)
+    monkeypatch.setattr(cli, "resume_pipeline", resume_pipeline)
+    monkeypatch.setattr(cli, "load_manifest", lambda _cache, key: manifests.get(key))
+    container: Any = SimpleNamespace(cache=DiskCache(str(tmp_path / "cache")))
+    cli._work(container, jobs, LANES, POLL_S, True, threading.Event())
+
+    job = jobs.get(job_id)
+    assert job is not None
+    assert (job.status, job.attempts, job.result) == ("done", 2, "video:done")
+    manifest_id = queued.payload["job_id"]
+    assert calls == [
+        ("run", (video, PipelineOptions(), manifest_id)),
+        ("resume", manifest_id),
+    ]
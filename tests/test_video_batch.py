@@ -0,0 +1,35 @@
+"""`video batch` manifest lines turn into RenderOptions, or fail loudly."""
+
+from pathlib import Path
+
+import pytest
+
+from src.cli.video import RenderOptions, _batch_item
+
+
+def test_options_use_render_flag_names(tmp_path: Path) -> None:
+    line = {
+        "map_key": "map:k",
+        "video": "clip.mp4",
+        "options": {"render-mode": "single", "method": "overlay", "jobs": 3},
+    }
+    map_key, video, opts = _batch_item(line, tmp_path)
+    assert (map_key, video) == ("map:k", tmp_path / "clip.mp4")
+    assert opts == RenderOptions(render_mode="single", method="overlay", jobs=3)
+
+
+@pytest.mark.parametrize(
+    "options",
+    [
+        {"render_mode": "smart"},
+        {"method": "burn"},
+        {"mp4-layout": "dash"},
+        {"caption_box_align": "middle"},
+    ],
+)
+def test_choice_outside_the_render_command_is_an_error(
+    tmp_path: Path, options: dict[str, str]
+) -> None:
+    line = {"map_key": "map:k", "video": "clip.mp4", "options": options}
+    with pytest.raises(ValueError, match="must be one of"):
+        _batch_item(line, tmp_path)